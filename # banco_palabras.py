@@ -0,0 +1,248 @@
+# banco_palabras.py
+# Banco de palabras en disco (índice precompilado + mmap) con categorías y muestreo O(1).
+# Uso:
+#   python banco_palabras.py construir banco.idx es/animales=animales.txt es/comida=comida.txt
+#   python banco_palabras.py info banco.idx
+#
+# Formato del fichero (little endian):
+#   cabecera  : magic "IMPW", versión u16, reservado u16, n_categorías u32, n_palabras u64,
+#               posición de los offsets u64, posición de la tabla de categorías u64
+#   datos     : palabras en UTF-8 concatenadas (empiezan justo tras la cabecera)
+#   offsets   : n_palabras + 1 enteros u64 (inicio de cada palabra relativo a los datos)
+#   categorías: por cada una, longitud del nombre u16, nombre UTF-8, inicio u64, cantidad u64
+
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b"IMPW"
+VERSION = 1
+_CABECERA = struct.Struct("<4sHHIQQQ")
+_CATEGORIA = struct.Struct("<QQ")
+
+
+class VistaCategoria(Sequence):
+    """
+    Secuencia de solo lectura sobre un rango de palabras del banco.
+    Acceder a una palabra lee solo sus bytes del mmap, así que random.choice
+    (y por tanto Partida) elige en O(1) sin cargar ni copiar la lista.
+    """
+    __slots__ = ("banco", "nombre", "_inicio", "_cantidad")
+
+    def __init__(self, banco: "BancoPalabras", nombre: Optional[str], inicio: int, cantidad: int):
+        self.banco = banco
+        self.nombre = nombre
+        self._inicio = inicio
+        self._cantidad = cantidad
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._cantidad))]
+        if i < 0:
+            i += self._cantidad
+        if not 0 <= i < self._cantidad:
+            raise IndexError("índice de palabra fuera de rango")
+        return self.banco._palabra(self._inicio + i)
+
+    def choice(self, rng: Optional[random.Random] = None) -> str:
+        """Palabra al azar en O(1)."""
+        return self[(rng or random).randrange(self._cantidad)]
+
+    def referencia(self) -> Dict[str, Optional[str]]:
+        """Datos para volver a abrir esta vista (usado al serializar partidas)."""
+        return {"banco": self.banco.ruta, "categoria": self.nombre}
+
+    def __repr__(self) -> str:
+        return f"VistaCategoria({self.banco.ruta!r}, {self.nombre!r}, {self._cantidad} palabras)"
+
+
+class BancoPalabras:
+    """
+    Banco de palabras abierto con mmap. Abrirlo solo lee la cabecera y la tabla
+    de categorías, así que el coste no depende del número de palabras.
+
+    - categorias(): nombres de categoría (p. ej. "es/animales")
+    - categoria(nombre): VistaCategoria con sus palabras
+    - todas(): VistaCategoria con todo el banco
+    """
+    def __init__(self, ruta: str):
+        self.ruta = os.path.abspath(ruta)
+        self._f = open(self.ruta, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise ValueError(f"Banco de palabras vacío: {ruta}")
+        try:
+            self._leer_indice(ruta)
+        except ValueError:
+            self.cerrar()
+            raise
+
+    def _leer_indice(self, ruta: str):
+        """Lee cabecera, offsets y categorías comprobando que caben en el fichero (ValueError si no)."""
+        tam = len(self._mm)
+        if tam < _CABECERA.size:
+            raise ValueError(f"Banco de palabras truncado (falta la cabecera): {ruta}")
+        magic, version, _, n_cat, n_pal, pos_offsets, pos_cat = _CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"No es un banco de palabras válido: {ruta}")
+        self._n = n_pal
+        fin_offsets = pos_offsets + 8 * (n_pal + 1)
+        if pos_offsets < _CABECERA.size or fin_offsets > tam or pos_cat > tam:
+            raise ValueError(f"Banco de palabras truncado o corrupto (tabla de offsets): {ruta}")
+        # Vista u64 sobre los offsets, sin copiarlos (formato little endian)
+        self._offsets = memoryview(self._mm)[pos_offsets:fin_offsets].cast("Q")
+        if sys.byteorder != "little":
+            self._offsets = array("Q", self._offsets.tobytes())
+            self._offsets.byteswap()
+        # Las palabras van entre la cabecera y los offsets
+        if self._offsets[0] != 0 or _CABECERA.size + self._offsets[n_pal] > pos_offsets:
+            raise ValueError(f"Banco de palabras corrupto (offsets fuera de los datos): {ruta}")
+        self._categorias: Dict[str, VistaCategoria] = {}
+        pos = pos_cat
+        for _ in range(n_cat):
+            if pos + 2 > tam:
+                raise ValueError(f"Banco de palabras truncado (tabla de categorías): {ruta}")
+            (largo,) = struct.unpack_from("<H", self._mm, pos)
+            if pos + 2 + largo + _CATEGORIA.size > tam:
+                raise ValueError(f"Banco de palabras truncado (tabla de categorías): {ruta}")
+            nombre = self._mm[pos + 2:pos + 2 + largo].decode("utf-8")
+            inicio, cantidad = _CATEGORIA.unpack_from(self._mm, pos + 2 + largo)
+            if inicio + cantidad > n_pal:
+                raise ValueError(f"Banco de palabras corrupto (categoría {nombre!r} fuera de rango): {ruta}")
+            self._categorias[nombre] = VistaCategoria(self, nombre, inicio, cantidad)
+            pos += 2 + largo + _CATEGORIA.size
+
+    def _palabra(self, i: int) -> str:
+        base = _CABECERA.size
+        return self._mm[base + self._offsets[i]:base + self._offsets[i + 1]].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._n
+
+    def categorias(self) -> List[str]:
+        return list(self._categorias)
+
+    def categoria(self, nombre: str) -> VistaCategoria:
+        try:
+            return self._categorias[nombre]
+        except KeyError:
+            raise KeyError(f"Categoría inexistente: {nombre!r}")
+
+    def todas(self) -> VistaCategoria:
+        return VistaCategoria(self, None, 0, self._n)
+
+    def cerrar(self):
+        """Cierra el mmap. Las vistas dejan de ser utilizables."""
+        if getattr(self, "_offsets", None) is not None and isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._offsets = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+_abiertos: Dict[str, BancoPalabras] = {}
+
+
+def abrir_banco(ruta: str) -> BancoPalabras:
+    """Abre un banco reutilizando el mmap si ya estaba abierto en este proceso."""
+    ruta = os.path.abspath(ruta)
+    banco = _abiertos.get(ruta)
+    if banco is None:
+        banco = _abiertos[ruta] = BancoPalabras(ruta)
+    return banco
+
+
+def desde_referencia(ref: Dict[str, Optional[str]]) -> VistaCategoria:
+    """Inversa de VistaCategoria.referencia()."""
+    banco = abrir_banco(ref["banco"])
+    return banco.todas() if ref.get("categoria") is None else banco.categoria(ref["categoria"])
+
+
+def construir_banco(ruta: str, categorias: Dict[str, Iterable[str]]) -> int:
+    """
+    Escribe un banco de palabras en `ruta` a partir de {categoría: palabras}.
+    Las palabras se procesan en flujo (se descartan vacías y se quitan espacios).
+    Devuelve el número total de palabras escritas.
+    """
+    offsets = array("Q", [0])
+    tabla = []
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * _CABECERA.size)
+        for nombre, palabras in categorias.items():
+            inicio = len(offsets) - 1
+            for w in palabras:
+                w = w.strip()
+                if not w:
+                    continue
+                datos = w.encode("utf-8")
+                f.write(datos)
+                offsets.append(offsets[-1] + len(datos))
+            tabla.append((nombre, inicio, len(offsets) - 1 - inicio))
+        # Alinear los offsets a 8 bytes para poder leerlos con memoryview.cast
+        pos = f.tell()
+        if pos % 8:
+            f.write(b"\0" * (8 - pos % 8))
+            pos = f.tell()
+        pos_offsets = pos
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        offsets.tofile(f)
+        pos_cat = f.tell()
+        for nombre, inicio, cantidad in tabla:
+            datos = nombre.encode("utf-8")
+            f.write(struct.pack("<H", len(datos)) + datos + _CATEGORIA.pack(inicio, cantidad))
+        n = len(offsets) - 1
+        f.seek(0)
+        f.write(_CABECERA.pack(MAGIC, VERSION, 0, len(tabla), n, pos_offsets, pos_cat))
+    os.replace(tmp, ruta)
+    return n
+
+
+def _leer_lineas(ruta: str) -> Iterable[str]:
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            yield linea
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) >= 3 and argv[0] == "construir":
+        categorias = {}
+        for arg in argv[2:]:
+            nombre, _, fichero = arg.partition("=")
+            categorias[nombre] = _leer_lineas(fichero)
+        n = construir_banco(argv[1], categorias)
+        print(f"{n} palabras escritas en {argv[1]}")
+        return 0
+    if len(argv) == 2 and argv[0] == "info":
+        with BancoPalabras(argv[1]) as banco:
+            print(f"{len(banco)} palabras")
+            for nombre in banco.categorias():
+                vista = banco.categoria(nombre)
+                print(f" - {nombre}: {len(vista)} (p. ej. {vista.choice()!r})" if len(vista) else f" - {nombre}: 0")
+        return 0
+    print("Uso: banco_palabras.py construir SALIDA CATEGORIA=FICHERO ... | info BANCO", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
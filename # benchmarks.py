@@ -0,0 +1,647 @@
+# benchmarks.py
+# Benchmarks de rendimiento y memoria para la lógica del juego.
+# Uso: python benchmarks.py [nombre ...] [--historial F] [--base F] [--guardar-base] [--umbral 0.2]
+#  - --historial: añade los resultados (con fecha y versión de Python) a un fichero JSON
+#  - --base: compara con una ejecución de referencia y falla si algún tiempo empeora más
+#    que --umbral (fracción); --guardar-base escribe los resultados como nueva referencia
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from partida import Partida, DEFAULT_WORDS
+
+
+class _PartidaLegada:
+    """
+    Réplica de la representación anterior de Partida (dict por jugador, lista
+    de bools, set de impostores y copia propia de las palabras). Solo sirve como
+    referencia para comparar memoria.
+    """
+    def __init__(self, num_players: int):
+        self.num_players = num_players
+        self.player_names = [f"Jugador {i}" for i in range(num_players)]
+        self.words = DEFAULT_WORDS.copy()
+        self.num_impostors = 1
+        self.impostors = set(random.sample(range(num_players), k=1))
+        self.word = random.choice(self.words)
+        self.alive = [True] * num_players
+        self.players = []
+        for i in range(num_players):
+            role = "impostor" if i in self.impostors else "tripulante"
+            self.players.append({
+                "id": i,
+                "name": self.player_names[i],
+                "role": role,
+                "word": None if role == "impostor" else self.word
+            })
+        self.over = False
+        self.winner = None
+
+
+def _bytes_por_sala(factory: Callable[[], object], salas: int) -> float:
+    """Mide con tracemalloc los bytes asignados por sala creando `salas` instancias."""
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        vivas = [factory() for _ in range(salas)]
+        despues = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del vivas
+    return (despues - antes) / salas
+
+
+def bench_memoria(tamanos: List[int] = (10, 100, 1000)) -> Dict[int, Dict[str, float]]:
+    """
+    Compara los bytes por sala de Partida frente a la representación anterior
+    para distintos tamaños de lobby.
+    """
+    resultados = {}
+    for n in tamanos:
+        salas = max(10, 20000 // n)
+        nombres = [f"Jugador {i}" for i in range(n)]
+        compacta = _bytes_por_sala(lambda: Partida(num_players=n), salas)
+        con_nombres = _bytes_por_sala(lambda: Partida(player_names=nombres), salas)
+        legada = _bytes_por_sala(lambda: _PartidaLegada(n), salas)
+        resultados[n] = {"compacta": compacta, "compacta_nombres": con_nombres, "legada": legada}
+        print(f"{n:>6} jugadores: compacta {compacta:>10.0f} B/sala | "
+              f"con nombres {con_nombres:>10.0f} B/sala | legada {legada:>10.0f} B/sala "
+              f"(x{legada / compacta:.1f})")
+    return resultados
+
+
+def _check_win_recuento(p: Partida) -> bool:
+    """Referencia O(n): decide el fin de partida con un recuento completo."""
+    impostores, tripulantes = p.recontar_vivos()
+    return impostores == 0 or impostores >= tripulantes
+
+
+def bench_check_win(tamanos: List[int] = (1000, 10000, 100000), expulsiones: int = 200) -> Dict[int, Dict[str, float]]:
+    """
+    Coste por expulsión (eject + check_win) con contadores incrementales frente
+    al recuento completo, en lobbies de 1k a 100k jugadores. Se expulsan
+    `expulsiones` tripulantes para que la partida no termine durante la medida.
+    """
+    resultados = {}
+    for n in tamanos:
+        p = Partida(num_players=n, num_impostors=max(1, n // 10))
+        tripulantes = [i for i in range(n) if p.get_player_role(i) == "tripulante"][:expulsiones]
+        t0 = time.perf_counter()
+        for pid in tripulantes:
+            p.eject(pid)
+        incremental = (time.perf_counter() - t0) / len(tripulantes)
+
+        t0 = time.perf_counter()
+        for _ in tripulantes:
+            _check_win_recuento(p)
+        recuento = (time.perf_counter() - t0) / len(tripulantes)
+
+        resultados[n] = {"incremental_us": incremental * 1e6, "recuento_us": recuento * 1e6}
+        print(f"{n:>7} jugadores: incremental {incremental * 1e6:>9.2f} us/expulsión | "
+              f"recuento {recuento * 1e6:>11.2f} us/expulsión (x{recuento / incremental:.0f})")
+    return resultados
+
+
+def bench_banco(tamanos: List[int] = (1000, 100000, 1000000), partidas: int = 2000) -> Dict[int, Dict[str, float]]:
+    """
+    Coste de abrir un banco de palabras y de crear partidas con él frente a
+    pasar la lista en memoria, para distintos tamaños de diccionario.
+    """
+    from banco_palabras import BancoPalabras, construir_banco
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in tamanos:
+            palabras = [f" palabra{i} " for i in range(n)]  # con espacios: la lista se limpia en cada partida
+            ruta = os.path.join(tmp, f"banco{n}.idx")
+            construir_banco(ruta, {"es/general": palabras})
+
+            t0 = time.perf_counter()
+            banco = BancoPalabras(ruta)
+            apertura = time.perf_counter() - t0
+            vista = banco.categoria("es/general")
+
+            t0 = time.perf_counter()
+            for _ in range(partidas):
+                Partida(num_players=8, words=vista)
+            con_banco = (time.perf_counter() - t0) / partidas
+
+            repeticiones = max(1, partidas * 1000 // n)
+            t0 = time.perf_counter()
+            for _ in range(repeticiones):
+                Partida(num_players=8, words=palabras)
+            con_lista = (time.perf_counter() - t0) / repeticiones
+            del vista
+            banco.cerrar()
+
+            resultados[n] = {"apertura_us": apertura * 1e6, "banco_us": con_banco * 1e6, "lista_us": con_lista * 1e6}
+            print(f"{n:>8} palabras: apertura {apertura * 1e6:>8.1f} us | partida con banco "
+                  f"{con_banco * 1e6:>7.1f} us | partida con lista {con_lista * 1e6:>10.1f} us")
+    return resultados
+
+
+def bench_adivinanza(tamanos: List[int] = (100, 10000, 100000), intentos: int = 2000) -> Dict[str, float]:
+    """
+    Latencia de Partida.guess: exacta, con erratas (distancia 1) y validando
+    contra listas de palabras grandes (índice de vecindad ya construido).
+    """
+    from coincidencia import Coincidencia, indice_para
+
+    rng = random.Random(0)
+    resultados = {}
+
+    def medir(p: Partida, textos: List[str]) -> float:
+        t0 = time.perf_counter()
+        for t in textos:
+            p.guess(0, t)
+            p.over = False
+        return (time.perf_counter() - t0) / len(textos) * 1e6
+
+    for n in tamanos:
+        palabras = [f"palabrá{i}" for i in range(n)]
+        textos = [f"PALABRA{rng.randrange(n * 2)}" for _ in range(intentos)]
+        exacta = Partida(num_players=8, words=palabras)
+        erratas = Partida(num_players=8, words=palabras, coincidencia=Coincidencia(max_distancia=1))
+        conocidas = Coincidencia(max_distancia=1, solo_conocidas=True)
+        t0 = time.perf_counter()
+        indice_para(palabras, conocidas)
+        construccion = (time.perf_counter() - t0) * 1e3
+        validando = Partida(num_players=8, words=palabras, coincidencia=conocidas)
+        fila = {"exacta_us": medir(exacta, textos), "erratas_us": medir(erratas, textos),
+                "validando_us": medir(validando, textos), "indice_ms": construccion}
+        resultados[n] = fila
+        print(f"{n:>7} palabras: exacta {fila['exacta_us']:>6.2f} us | erratas {fila['erratas_us']:>6.2f} us | "
+              f"validando {fila['validando_us']:>6.2f} us (índice {construccion:.0f} ms, una vez por lista)")
+    return resultados
+
+
+def bench_votacion(tamanos: List[int] = (1000, 10000, 100000)) -> Dict[int, Dict[str, float]]:
+    """
+    Votación completa con Partida.vote (recuento al final) frente a
+    SesionVotacion (voto a voto, con cierre O(1)).
+    """
+    resultados = {}
+    rng = random.Random(0)
+    for n in tamanos:
+        p = Partida(num_players=n, num_impostors=max(1, n // 10), seed=1)
+        votos = {v: rng.randrange(n) for v in range(n)}
+
+        t0 = time.perf_counter()
+        p.vote(votos)
+        recuento = time.perf_counter() - t0
+
+        sesion = p.abrir_votacion()
+        t0 = time.perf_counter()
+        for v, d in votos.items():
+            sesion.votar(v, d)
+        ingesta = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        sesion.cerrar()
+        cierre = time.perf_counter() - t0
+
+        resultados[n] = {"vote_ms": recuento * 1e3, "sesion_por_voto_us": ingesta / n * 1e6, "cierre_us": cierre * 1e6}
+        print(f"{n:>7} votantes: vote() {recuento * 1e3:>8.2f} ms | sesión {ingesta / n * 1e6:>5.2f} us/voto | "
+              f"cierre {cierre * 1e6:>6.2f} us")
+    return resultados
+
+
+def _contar_widgets(widget) -> int:
+    hijos = widget.winfo_children()
+    return len(hijos) + sum(_contar_widgets(h) for h in hijos)
+
+
+def bench_ventana(tamanos: List[int] = (12, 100, 1000)) -> Dict[int, Dict[str, float]]:
+    """
+    Tiempo de abrir la ventana de juego (App.abrir_ventana_juego hasta que Tk
+    termina de dibujarla) y widgets creados, según el número de jugadores.
+    Necesita un display: sin él se omite.
+    """
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Sin display, se omite ({e.__class__.__name__}: {e})")
+        return {}
+    from principal import App
+
+    resultados = {}
+    try:
+        root.withdraw()
+        app = App(root)
+        for n in tamanos:
+            app.partida = Partida(num_players=n, seed=0)
+            t0 = time.perf_counter()
+            app.abrir_ventana_juego()
+            root.update()
+            apertura = time.perf_counter() - t0
+            widgets = _contar_widgets(app.game_window)
+            app.game_window.destroy()
+            root.update()
+            resultados[n] = {"apertura_ms": apertura * 1e3, "widgets": widgets}
+            print(f"{n:>6} jugadores: apertura {apertura * 1e3:>8.1f} ms | {widgets:>5} widgets")
+    finally:
+        root.destroy()
+    return resultados
+
+
+# ================ Microbenchmarks de caminos calientes ================
+def _cronometrar(func: Callable[[], object], repeticiones: int = 5) -> float:
+    """Mejor tiempo por llamada (us) de `repeticiones` tandas calibradas con timeit."""
+    t = timeit.Timer(func)
+    n, _ = t.autorange()
+    return min(t.repeat(repeticiones, n)) / n * 1e6
+
+
+def bench_init(jugadores: List[int] = (10, 1000, 100000), palabras: List[int] = (5, 10000)) -> Dict[str, float]:
+    """Partida.__init__ según número de jugadores y tamaño de la lista de palabras."""
+    resultados = {}
+    for np_ in palabras:
+        lista = DEFAULT_WORDS if np_ <= len(DEFAULT_WORDS) else [f"palabra{i}" for i in range(np_)]
+        for n in jugadores:
+            us = _cronometrar(lambda: Partida(num_players=n, words=lista, num_impostors=max(1, n // 10)))
+            resultados[f"{n}j_{np_}p_us"] = us
+            print(f"{n:>7} jugadores, {np_:>6} palabras: {us:>10.2f} us")
+    return resultados
+
+
+def bench_vote(tamanos: List[int] = (1000, 100000)) -> Dict[str, float]:
+    """Partida.vote con diccionarios de votos grandes (sin expulsión)."""
+    resultados = {}
+    rng = random.Random(0)
+    for n in tamanos:
+        p = Partida(num_players=n, num_impostors=max(1, n // 10), seed=1)
+        votos = {v: rng.randrange(n) for v in range(n)}
+        us = _cronometrar(lambda: p.vote(votos))
+        resultados[f"{n}_us"] = us
+        print(f"{n:>7} votos: {us:>10.2f} us")
+    return resultados
+
+
+def bench_partida_completa(tamanos: List[int] = (10, 1000, 10000), partidas: int = 20) -> Dict[str, float]:
+    """eject + check_win expulsando jugadores al azar hasta que la partida termina."""
+    resultados = {}
+    rng = random.Random(0)
+    for n in tamanos:
+        preparadas = []
+        for i in range(partidas):
+            p = Partida(num_players=n, num_impostors=max(1, n // 10), seed=i)
+            orden = list(range(n))
+            rng.shuffle(orden)
+            preparadas.append((p, orden))
+        t0 = time.perf_counter()
+        expulsiones = 0
+        for p, orden in preparadas:
+            for pid in orden:
+                p.eject(pid)
+                expulsiones += 1
+                if p.over:
+                    break
+        total = time.perf_counter() - t0
+        resultados[f"{n}_partida_us"] = total / partidas * 1e6
+        resultados[f"{n}_expulsion_us"] = total / expulsiones * 1e6
+        print(f"{n:>7} jugadores: {total / partidas * 1e6:>10.1f} us/partida | {total / expulsiones * 1e6:>6.2f} us/expulsión")
+    return resultados
+
+
+def bench_guess() -> Dict[str, float]:
+    """Partida.guess con la configuración por defecto (acierto y fallo)."""
+    p = Partida(num_players=8, seed=0)
+    palabra = p.word
+    tripulante = next(i for i in range(p.num_players) if p.get_player_role(i) == "tripulante")
+
+    def acierto():
+        p.guess(tripulante, palabra)
+        p.over = False
+        p.winner = None
+
+    resultados = {"acierto_us": _cronometrar(acierto), "fallo_us": _cronometrar(lambda: p.guess(tripulante, "zzz"))}
+    print(f"acierto {resultados['acierto_us']:.2f} us | fallo {resultados['fallo_us']:.2f} us")
+    return resultados
+
+
+def _martillear(p: Partida, hilos: int, operaciones: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    `hilos` hilos hacen `operaciones` operaciones cada uno sobre la misma partida
+    (expulsiones, votaciones con expulsión, adivinanzas y lecturas). Devuelve los
+    segundos y las excepciones de los hilos; las invariantes las comprueba
+    test_partida.
+    """
+    import threading
+
+    barrera = threading.Barrier(hilos + 1)
+    errores = []
+
+    def trabajo(i: int):
+        rng = random.Random(seed * 1000 + i)
+        n = p.num_players
+        barrera.wait()
+        try:
+            for _ in range(operaciones):
+                x = rng.random()
+                if x < 0.4:
+                    p.eject(rng.randrange(n))
+                elif x < 0.7:
+                    p.vote({rng.randrange(n): rng.randrange(n) for _ in range(5)}, perform_eject=True)
+                elif x < 0.75:
+                    p.guess(rng.randrange(n), p.word if rng.random() < 0.1 else "zzz")
+                else:
+                    p.get_player_role(rng.randrange(n))
+                    p.is_over()
+        except Exception as e:
+            errores.append(repr(e))
+
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)   # cambios de hilo muy frecuentes, como en la prueba de estrés
+    try:
+        ths = [threading.Thread(target=trabajo, args=(i,)) for i in range(hilos)]
+        for t in ths:
+            t.start()
+        barrera.wait()
+        t0 = time.perf_counter()
+        for t in ths:
+            t.join()
+        segundos = time.perf_counter() - t0
+    finally:
+        sys.setswitchinterval(intervalo)
+    return {"segundos": segundos, "errores": errores}
+
+
+def bench_concurrencia(hilos: int = 64, operaciones: int = 2000, jugadores: int = 5000,
+                       repeticiones: int = 5) -> Dict[str, float]:
+    """
+    PartidaConcurrente martilleada desde `hilos` hilos: coste por operación frente
+    a un solo hilo y frente a Partida sin candado. Las invariantes (sin dobles
+    expulsiones, contadores, un solo ganador) se comprueban en test_partida.
+    """
+    from partida import PartidaConcurrente
+
+    total = hilos * operaciones
+    resultados: Dict[str, float] = {}
+    errores = []
+    mejor = float("inf")
+    for rep in range(repeticiones):
+        p = PartidaConcurrente(num_players=jugadores, num_impostors=jugadores // 10, seed=rep)
+        r = _martillear(p, hilos, operaciones, seed=rep)
+        mejor = min(mejor, r["segundos"])
+        errores += r["errores"]
+    resultados["hilos_op_us"] = mejor / total * 1e6
+    for nombre, cls in (("un_hilo_op_us", PartidaConcurrente), ("sin_candado_op_us", Partida)):
+        p = cls(num_players=jugadores, num_impostors=jugadores // 10, seed=0)
+        r = _martillear(p, 1, total)
+        resultados[nombre] = r["segundos"] / total * 1e6
+        errores += r["errores"]
+    print(f"{hilos} hilos x {operaciones} ops: {resultados['hilos_op_us']:.2f} us/op "
+          f"({1e6 / resultados['hilos_op_us']:.0f} ops/s) | 1 hilo {resultados['un_hilo_op_us']:.2f} us/op | "
+          f"sin candado {resultados['sin_candado_op_us']:.2f} us/op")
+    for e in errores[:5]:
+        print(f"  excepción en un hilo: {e}")
+    return resultados
+
+
+def bench_summary(tamanos: List[int] = (100, 10000)) -> Dict[str, float]:
+    """Partida.summary en lobbies grandes (con y sin nombres propios)."""
+    resultados = {}
+    for n in tamanos:
+        sin_nombres = Partida(num_players=n, seed=0)
+        con_nombres = Partida(player_names=[f"Nombre {i}" for i in range(n)], seed=0)
+        for pid in range(0, n, 3):
+            sin_nombres.alive[pid] = 0
+        resultados[f"{n}_us"] = _cronometrar(sin_nombres.summary)
+        resultados[f"{n}_nombres_us"] = _cronometrar(con_nombres.summary)
+        print(f"{n:>7} jugadores: {resultados[f'{n}_us']:>10.1f} us | con nombres {resultados[f'{n}_nombres_us']:>10.1f} us")
+    return resultados
+
+
+class _LienzoFalso:
+    """Canvas sin display: acepta cualquier create_*/delete/lower y cuenta los items creados."""
+    def __init__(self, width: int = 800, height: int = 600):
+        self.width = width
+        self.height = height
+        self.items = 0
+
+    def winfo_width(self) -> int:
+        return self.width
+
+    def winfo_height(self) -> int:
+        return self.height
+
+    def __getattr__(self, nombre: str):
+        if nombre.startswith("create_"):
+            def crear(*args, **kwargs):
+                self.items += 1
+                return self.items
+            return crear
+        return lambda *args, **kwargs: None
+
+
+def bench_graficos(tamano_fondo=(3000, 2000)) -> Dict[str, float]:
+    """
+    Graficos sobre un canvas falso (sin display). Sin Tk no se pueden crear
+    PhotoImage, así que se mide por separado lo que cuesta cada parte: dibujo con
+    primitivas del canvas, rasterizado de avatares con Pillow y el escalado del
+    fondo que hace draw_background (calidad y vista previa).
+    """
+    import graficos
+
+    resultados = {}
+    lienzo = _LienzoFalso()
+    primitivas = graficos.Graficos(avatar_cache_size=0)
+    resultados["avatar_canvas_us"] = _cronometrar(lambda: primitivas.draw_avatar(lienzo, 50, 50, 100, seed=7))
+    semillas = iter(range(10 ** 9))
+    resultados["avatar_canvas_seed_nueva_us"] = _cronometrar(
+        lambda: primitivas.draw_avatar(lienzo, 50, 50, 100, seed=next(semillas)))
+    print(f"avatar en canvas: {resultados['avatar_canvas_us']:.2f} us "
+          f"(seed nueva {resultados['avatar_canvas_seed_nueva_us']:.2f} us)")
+    if not graficos._pil():
+        print("Sin Pillow: se omite el rasterizado y el fondo")
+        return resultados
+
+    g = graficos.Graficos()
+    resultados["avatar_raster_us"] = _cronometrar(lambda: g.render_avatar(100, seed=7), repeticiones=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "fondo.png")
+        graficos.Image.effect_noise(tamano_fondo, 40).convert("RGB").save(ruta)
+        resultados["fondo_carga_us"] = _cronometrar(lambda: g.set_background(ruta), repeticiones=3)
+    for w, h in ((640, 480), (1280, 720)):
+        resultados[f"fondo_{w}x{h}_us"] = _cronometrar(lambda: g._escalar_fondo(w, h), repeticiones=3)
+        resultados[f"fondo_{w}x{h}_previa_us"] = _cronometrar(lambda: g._escalar_fondo(w, h, calidad=False), repeticiones=3)
+    print(f"avatar rasterizado {resultados['avatar_raster_us']:.0f} us | carga de fondo "
+          f"{resultados['fondo_carga_us'] / 1e3:.1f} ms | escalado 1280x720 {resultados['fondo_1280x720_us'] / 1e3:.1f} ms "
+          f"(previa {resultados['fondo_1280x720_previa_us'] / 1e3:.1f} ms)")
+    return resultados
+
+
+# Presupuesto de importación en frío (ms, import acumulado según -X importtime) y
+# módulos que no deben cargarse al importar cada módulo. Superarlo hace fallar
+# `python benchmarks.py arranque` (código de salida 1) para poder usarlo en CI.
+PRESUPUESTO_ARRANQUE_MS = {"partida": 60.0, "graficos": 60.0, "principal": 150.0}
+PROHIBIDOS_ARRANQUE = {"partida": ("PIL", "tkinter", "numpy"), "graficos": ("PIL", "tkinter", "numpy"),
+                       "principal": ("PIL", "numpy")}
+
+
+def _importtime(modulo: str) -> Dict[str, float]:
+    """Ejecuta `python -X importtime -c "import modulo"` y devuelve {paquete: ms acumulados}."""
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (directorio, env.get("PYTHONPATH")) if p)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                          cwd=directorio, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}: {proc.stderr.strip().splitlines()[-1:]}")
+    tiempos = {}
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, paquete = linea.split("|")
+        tiempos[paquete.strip()] = int(acumulado) / 1000
+    return tiempos
+
+
+def bench_arranque(modulos: List[str] = ("partida", "graficos", "principal"), repeticiones: int = 5,
+                   presupuesto: Dict[str, float] = None) -> Dict[str, object]:
+    """
+    Tiempo de importación en frío de cada módulo (mínimo de `repeticiones`
+    procesos nuevos con -X importtime) frente a PRESUPUESTO_ARRANQUE_MS, y
+    comprobación de que no arrastran dependencias pesadas (PROHIBIDOS_ARRANQUE).
+    """
+    presupuesto = PRESUPUESTO_ARRANQUE_MS if presupuesto is None else presupuesto
+    resultados: Dict[str, object] = {}
+    excedidos = []
+    for modulo in modulos:
+        try:
+            muestras = [_importtime(modulo) for _ in range(repeticiones)]
+        except RuntimeError as e:
+            print(f"{modulo:>10}: se omite ({e})")
+            continue
+        ms = min(m.get(modulo, 0.0) for m in muestras)
+        cargados = [p for p in PROHIBIDOS_ARRANQUE.get(modulo, ()) if p in muestras[0]]
+        limite = presupuesto.get(modulo)
+        ok = (limite is None or ms <= limite) and not cargados
+        if not ok:
+            excedidos.append(modulo)
+        resultados[modulo] = {"import_ms": ms, "presupuesto_ms": limite, "prohibidos": cargados}
+        print(f"{modulo:>10}: {ms:>7.1f} ms (presupuesto {limite} ms)"
+              + (f" | carga {', '.join(cargados)}" if cargados else "") + ("" if ok else "  <-- EXCEDIDO"))
+    resultados["excedidos"] = excedidos
+    return resultados
+
+
+BENCHMARKS = {
+    "memoria": bench_memoria,
+    "check_win": bench_check_win,
+    "banco": bench_banco,
+    "adivinanza": bench_adivinanza,
+    "votacion": bench_votacion,
+    "ventana": bench_ventana,
+    "arranque": bench_arranque,
+    "init": bench_init,
+    "vote": bench_vote,
+    "partida_completa": bench_partida_completa,
+    "guess": bench_guess,
+    "summary": bench_summary,
+    "graficos": bench_graficos,
+    "concurrencia": bench_concurrencia,
+}
+
+# Se ejecutan por defecto (rápidos y sin display); el resto hay que pedirlos por nombre
+MICRO = ["init", "vote", "partida_completa", "guess", "summary", "graficos"]
+
+
+def _aplanar(datos: Any, prefijo: str = "") -> Dict[str, float]:
+    """{"init": {"10j_5p_us": 3.1}} -> {"init.10j_5p_us": 3.1} (solo valores numéricos)."""
+    plano = {}
+    if isinstance(datos, dict):
+        for k, v in datos.items():
+            plano.update(_aplanar(v, f"{prefijo}.{k}" if prefijo else str(k)))
+    elif isinstance(datos, (int, float)) and not isinstance(datos, bool):
+        plano[prefijo] = float(datos)
+    return plano
+
+
+def guardar_historial(ruta: str, resultados: Dict[str, Any]):
+    """Añade una ejecución al historial JSON (lista de ejecuciones)."""
+    historial = []
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            historial = json.load(f)
+    historial.append({
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": _aplanar(resultados),
+    })
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(historial, f, indent=1)
+    os.replace(tmp, ruta)
+
+
+def comparar_con_base(resultados: Dict[str, Any], base: Dict[str, float], umbral: float) -> List[str]:
+    """
+    Métricas de tiempo (terminadas en _us o _ms) que empeoran más de `umbral`
+    (fracción) respecto a la base. Imprime la comparación.
+    """
+    regresiones = []
+    for clave, valor in sorted(_aplanar(resultados).items()):
+        if not clave.endswith(("_us", "_ms")) or clave not in base or base[clave] <= 0:
+            continue
+        cambio = valor / base[clave] - 1
+        marca = ""
+        if cambio > umbral:
+            regresiones.append(clave)
+            marca = "  <-- REGRESIÓN"
+        print(f"{clave:<45} {base[clave]:>12.2f} -> {valor:>12.2f} ({cambio:+.0%}){marca}")
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de El Impostor")
+    parser.add_argument("nombres", nargs="*",
+                        help="benchmarks a ejecutar (por defecto los micro: " + ", ".join(MICRO) + "); "
+                             "disponibles: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--historial", help="fichero JSON al que añadir los resultados")
+    parser.add_argument("--base", help="fichero JSON de referencia con el que comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="escribir los resultados en --base")
+    parser.add_argument("--umbral", type=float, default=0.2, help="empeoramiento tolerado (fracción, por defecto 0.2)")
+    args = parser.parse_args(argv)
+    desconocidos = [n for n in args.nombres if n not in BENCHMARKS]
+    if desconocidos:
+        parser.error(f"benchmark desconocido: {', '.join(desconocidos)}")
+
+    resultados = {}
+    fallo = False
+    for nombre in args.nombres or MICRO:
+        print(f"== {nombre} ==")
+        resultado = BENCHMARKS[nombre]()
+        resultados[nombre] = resultado
+        if isinstance(resultado, dict) and resultado.get("excedidos"):
+            fallo = True
+
+    if args.historial:
+        guardar_historial(args.historial, resultados)
+    if args.base:
+        if args.guardar_base or not os.path.exists(args.base):
+            with open(args.base, "w", encoding="utf-8") as f:
+                json.dump(_aplanar(resultados), f, indent=1, sort_keys=True)
+            print(f"Base guardada en {args.base}")
+        else:
+            with open(args.base, encoding="utf-8") as f:
+                base = json.load(f)
+            print(f"== comparación con {args.base} (umbral {args.umbral:.0%}) ==")
+            if comparar_con_base(resultados, base, args.umbral):
+                fallo = True
+    return 1 if fallo else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
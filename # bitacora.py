@@ -0,0 +1,291 @@
+# bitacora.py
+# Registro binario de eventos (solo se añade) para partidas, con reconstrucción por
+# reproducción y lectura con mmap para auditorías y analítica.
+#
+# Ficheros (little endian):
+#   <base>.ev : registros de tamaño fijo (24 bytes)
+#               partida u32, tipo u8, aux u8, reservado u16, jugador i32, valor i32, cadena i64
+#   <base>.str: tabla de cadenas; cada entrada es longitud u32 + UTF-8. Los registros
+#               apuntan a ella por desplazamiento (cadena = -1 si no hay).
+#
+# Tipos de registro:
+#   CREAR      cadena = estado inicial (Partida.to_dict en JSON), valor = num_players
+#   ADIVINANZA jugador, aux = 1 si acertó, cadena = intento
+#   VOTO       jugador = elegido (-1 si empate o sin votos), valor = votos del máximo
+#   EXPULSION  jugador, aux = 1 si era impostor
+#   FIN        aux = ganador (1 impostores, 2 tripulantes)
+#   SNAPSHOT   cadena = estado completo sin la lista de palabras (Partida.to_dict(palabras=False)
+#              en JSON); las palabras son las del registro CREAR de la partida
+
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from partida import Partida
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+REGISTRO = struct.Struct("<IBBHiiq")
+_LONGITUD = struct.Struct("<I")
+
+CREAR, ADIVINANZA, VOTO, EXPULSION, FIN, SNAPSHOT = 1, 2, 3, 4, 5, 6
+NOMBRES_TIPO = {CREAR: "crear", ADIVINANZA: "adivinanza", VOTO: "voto",
+                EXPULSION: "expulsion", FIN: "fin", SNAPSHOT: "snapshot"}
+_GANADORES = {"impostores": 1, "tripulantes": 2}
+_GANADORES_INV = {v: k for k, v in _GANADORES.items()}
+
+if _HAS_NUMPY:
+    # dtype equivalente a REGISTRO para leer el fichero sin copiarlo
+    DTYPE_REGISTRO = np.dtype([("partida", "<u4"), ("tipo", "u1"), ("aux", "u1"), ("reservado", "<u2"),
+                               ("jugador", "<i4"), ("valor", "<i4"), ("cadena", "<i8")])
+
+
+def _mmap_fichero(ruta: str):
+    """mmap de solo lectura de `ruta`, o None si el fichero está vacío."""
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Bitacora:
+    """
+    Escritor del registro de eventos. registrar(partida) asigna un id de partida,
+    escribe su estado inicial y se suscribe a sus cambios. Cada `cada_snapshot`
+    eventos de una partida se escribe una foto completa para acotar la
+    reproducción.
+    """
+    def __init__(self, base: str, cada_snapshot: int = 64):
+        self.base = base
+        self.cada_snapshot = cada_snapshot
+        self._ev = open(base + ".ev", "ab")
+        self._str = open(base + ".str", "ab")
+        self._pos_str = self._str.tell()
+        self._eventos_desde_snapshot: Dict[int, int] = {}
+        self._siguiente_id = self._ultimo_id() + 1
+
+    def _ultimo_id(self) -> int:
+        """Mayor id de partida ya presente en el registro (-1 si está vacío)."""
+        if self._ev.tell() < REGISTRO.size:
+            return -1
+        lector = LectorBitacora(self.base)
+        try:
+            return lector.max_partida()
+        finally:
+            lector.cerrar()
+
+    def _cadena(self, texto: str) -> int:
+        datos = texto.encode("utf-8")
+        pos = self._pos_str
+        self._str.write(_LONGITUD.pack(len(datos)))
+        self._str.write(datos)
+        self._pos_str += _LONGITUD.size + len(datos)
+        return pos
+
+    def _escribir(self, partida_id: int, tipo: int, aux: int = 0, jugador: int = -1,
+                  valor: int = 0, cadena: int = -1):
+        self._ev.write(REGISTRO.pack(partida_id, tipo, aux, 0, jugador, valor, cadena))
+
+    def registrar(self, partida: Partida) -> int:
+        """Empieza a registrar `partida`. Devuelve su id en el registro."""
+        pid = self._siguiente_id
+        self._siguiente_id += 1
+        estado = json.dumps(partida.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        self._escribir(pid, CREAR, valor=partida.num_players, cadena=self._cadena(estado))
+        self._eventos_desde_snapshot[pid] = 0
+        partida.suscribir(lambda p, evento, datos: self._al_evento(pid, p, evento, datos))
+        return pid
+
+    def _al_evento(self, pid: int, partida: Partida, evento: str, datos: Dict[str, Any]):
+        if evento == "guess":
+            self._escribir(pid, ADIVINANZA, aux=int(datos["correct"]), jugador=datos["player_id"],
+                           cadena=self._cadena(datos["guess"]))
+        elif evento == "vote":
+            elegido = datos["elected"]
+            self._escribir(pid, VOTO, jugador=-1 if elegido is None else elegido, valor=datos["votes"])
+        elif evento == "eject":
+            self._escribir(pid, EXPULSION, aux=int(datos["was_impostor"]), jugador=datos["player_id"])
+        elif evento == "fin":
+            self._escribir(pid, FIN, aux=_GANADORES.get(datos["winner"], 0))
+            self._eventos_desde_snapshot.pop(pid, None)
+            return
+        else:
+            return
+        n = self._eventos_desde_snapshot.get(pid, 0) + 1
+        if n >= self.cada_snapshot:
+            self.snapshot(pid, partida)
+            n = 0
+        self._eventos_desde_snapshot[pid] = n
+
+    def snapshot(self, pid: int, partida: Partida):
+        """Escribe una foto completa de la partida `pid` (sin las palabras, que ya están en CREAR)."""
+        estado = json.dumps(partida.to_dict(palabras=False), ensure_ascii=False, separators=(",", ":"))
+        self._escribir(pid, SNAPSHOT, cadena=self._cadena(estado))
+
+    def flush(self):
+        # Primero las cadenas: un registro nunca apunta a una cadena no escrita
+        self._str.flush()
+        self._ev.flush()
+
+    def cerrar(self):
+        self.flush()
+        self._ev.close()
+        self._str.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class LectorBitacora:
+    """
+    Lector con mmap del registro. Los registros se leen bajo demanda (o como un
+    array estructurado de NumPy sin copia) en lugar de deserializar todo.
+    """
+    def __init__(self, base: str):
+        self.base = base
+        self._mm_ev = _mmap_fichero(base + ".ev")
+        self._mm_str = _mmap_fichero(base + ".str")
+        tam = len(self._mm_ev) if self._mm_ev is not None else 0
+        # Un registro incompleto al final (escritura interrumpida) se ignora
+        self._n = tam // REGISTRO.size
+        self._indice: Optional[Dict[int, List[int]]] = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def registro(self, i: int) -> Tuple[int, int, int, int, int, int]:
+        """(partida, tipo, aux, jugador, valor, cadena) del registro i."""
+        partida, tipo, aux, _, jugador, valor, cadena = REGISTRO.unpack_from(self._mm_ev, i * REGISTRO.size)
+        return partida, tipo, aux, jugador, valor, cadena
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int, int, int, int]]:
+        if not self._n:
+            return
+        for partida, tipo, aux, _, jugador, valor, cadena in REGISTRO.iter_unpack(
+                memoryview(self._mm_ev)[:self._n * REGISTRO.size]):
+            yield partida, tipo, aux, jugador, valor, cadena
+
+    def cadena(self, pos: int) -> Optional[str]:
+        if pos < 0:
+            return None
+        (largo,) = _LONGITUD.unpack_from(self._mm_str, pos)
+        inicio = pos + _LONGITUD.size
+        return self._mm_str[inicio:inicio + largo].decode("utf-8")
+
+    def como_array(self):
+        """Array estructurado de NumPy sobre el mmap (sin copia). Requiere NumPy."""
+        if not _HAS_NUMPY:
+            raise RuntimeError("NumPy no está disponible.")
+        if not self._n:
+            return np.zeros(0, dtype=DTYPE_REGISTRO)
+        return np.frombuffer(self._mm_ev, dtype=DTYPE_REGISTRO, count=self._n)
+
+    def max_partida(self) -> int:
+        if not self._n:
+            return -1
+        if _HAS_NUMPY:
+            return int(self.como_array()["partida"].max())
+        return max(r[0] for r in self)
+
+    def contar_por_tipo(self) -> Dict[str, int]:
+        """Número de registros de cada tipo."""
+        if _HAS_NUMPY:
+            cuenta = np.bincount(self.como_array()["tipo"], minlength=len(NOMBRES_TIPO) + 1)
+            return {nombre: int(cuenta[t]) for t, nombre in NOMBRES_TIPO.items()}
+        cuenta = {nombre: 0 for nombre in NOMBRES_TIPO.values()}
+        for _, tipo, *_ in self:
+            cuenta[NOMBRES_TIPO.get(tipo, "?")] = cuenta.get(NOMBRES_TIPO.get(tipo, "?"), 0) + 1
+        return cuenta
+
+    def victorias(self) -> Dict[str, int]:
+        """Partidas terminadas por bando ganador."""
+        if _HAS_NUMPY:
+            arr = self.como_array()
+            aux = arr["aux"][arr["tipo"] == FIN]
+            return {nombre: int((aux == codigo).sum()) for codigo, nombre in _GANADORES_INV.items()}
+        res = {nombre: 0 for nombre in _GANADORES}
+        for _, tipo, aux, *_ in self:
+            if tipo == FIN and aux in _GANADORES_INV:
+                res[_GANADORES_INV[aux]] += 1
+        return res
+
+    def _indice_partidas(self) -> Dict[int, List[int]]:
+        """Registros de cada partida recorriendo todo el fichero (solo sin NumPy)."""
+        if self._indice is None:
+            indice: Dict[int, List[int]] = {}
+            for i, (partida, *_) in enumerate(self):
+                indice.setdefault(partida, []).append(i)
+            self._indice = indice
+        return self._indice
+
+    def _registros_de(self, partida_id: int) -> List[int]:
+        """Índices de los registros de una partida, en orden."""
+        if not _HAS_NUMPY:
+            return self._indice_partidas().get(partida_id, [])
+        if not isinstance(partida_id, int) or not 0 <= partida_id <= 0xFFFFFFFF:
+            return []
+        # Filtra sobre la vista del mmap sin crear un objeto Python por registro
+        return np.flatnonzero(self.como_array()["partida"] == partida_id).tolist()
+
+    def partidas(self) -> List[int]:
+        if _HAS_NUMPY:
+            return np.unique(self.como_array()["partida"]).tolist()
+        return list(self._indice_partidas())
+
+    def eventos(self, partida_id: int) -> List[Dict[str, Any]]:
+        """Eventos de una partida en orden, decodificados (para auditar una partida concreta)."""
+        res = []
+        for i in self._registros_de(partida_id):
+            _, tipo, aux, jugador, valor, cadena = self.registro(i)
+            res.append({"seq": i, "tipo": NOMBRES_TIPO.get(tipo, tipo), "aux": aux,
+                        "jugador": jugador, "valor": valor, "cadena": self.cadena(cadena)})
+        return res
+
+    def reconstruir(self, partida_id: int, hasta: Optional[int] = None) -> Partida:
+        """
+        Reconstruye la partida reproduciendo su registro desde la última foto
+        (CREAR o SNAPSHOT) anterior a `hasta` (índice de registro, incluido).
+        ValueError si `hasta` es anterior al registro CREAR de la partida.
+        """
+        indices = self._registros_de(partida_id)
+        if not indices:
+            raise KeyError(f"Partida {partida_id} no está en el registro.")
+        crear = next((i for i in indices if self.registro(i)[1] == CREAR), None)
+        if crear is None:
+            raise ValueError(f"Partida {partida_id}: falta el registro CREAR.")
+        if hasta is not None and hasta < crear:
+            raise ValueError(f"Partida {partida_id}: el registro {hasta} es anterior a su creación ({crear}).")
+        if hasta is not None:
+            indices = [i for i in indices if i <= hasta]
+        inicio = max(k for k, i in enumerate(indices) if self.registro(i)[1] in (CREAR, SNAPSHOT))
+        estado = json.loads(self.cadena(self.registro(indices[inicio])[5]))
+        if indices[inicio] != crear:
+            # Las fotos no llevan las palabras: se toman de CREAR
+            estado["words"] = json.loads(self.cadena(self.registro(crear)[5]))["words"]
+        partida = Partida.from_dict(estado)
+        for i in indices[inicio + 1:]:
+            _, tipo, aux, jugador, valor, cadena = self.registro(i)
+            if tipo == EXPULSION:
+                partida.eject(jugador)
+            elif tipo == ADIVINANZA:
+                partida.guess(jugador, self.cadena(cadena))
+            elif tipo == FIN and not partida.over:
+                partida.over = True
+                partida.winner = _GANADORES_INV.get(aux)
+        return partida
+
+    def cerrar(self):
+        for mm in (self._mm_ev, self._mm_str):
+            if mm is not None:
+                mm.close()
+        self._mm_ev = self._mm_str = None
@@ -0,0 +1,257 @@
+# coincidencia.py
+# Comparación de adivinanzas tolerante a acentos, mayúsculas y erratas.
+# - normalizar: plegado de mayúsculas (casefold) y de acentos (NFKD sin marcas combinantes,
+#   salvo la tilde de la ñ: "año" y "ano" son palabras distintas)
+# - distancia_acotada: distancia de edición (con transposiciones) con corte temprano
+# - IndiceVecindad: índice de vecindario por borrados (estilo SymSpell) para buscar
+#   palabras cercanas en listas grandes sin comparar contra todas
+
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterable, List, Optional, Set
+
+
+_TILDE = "\u0303"
+# Erratas máximas admitidas en una configuración: el índice de vecindad crece
+# con C(longitud, max_distancia) entradas por palabra
+MAX_DISTANCIA = 2
+
+
+@lru_cache(maxsize=65536)
+def _plegar_acentos(texto: str) -> str:
+    letras: List[str] = []
+    for c in unicodedata.normalize("NFKD", texto):
+        if not unicodedata.combining(c):
+            letras.append(c)
+        elif c == _TILDE and letras and letras[-1] in "nN":
+            # ñ/Ñ es una letra propia, no una n acentuada
+            letras.append(c)
+    return unicodedata.normalize("NFC", "".join(letras))
+
+
+def normalizar(texto: str, acentos: bool = True, mayusculas: bool = True) -> str:
+    """
+    Forma normalizada de una palabra para compararla.
+    - acentos=True: "avión" -> "avion" (la ñ se conserva: "ñandú" -> "ñandu")
+    - mayusculas=True: casefold ("AVIÓN" -> "avión")
+    """
+    texto = texto.strip()
+    if mayusculas:
+        texto = texto.casefold()
+    if acentos and not texto.isascii():
+        texto = _plegar_acentos(texto)
+    return texto
+
+
+def distancia_acotada(a: str, b: str, max_d: int) -> int:
+    """
+    Distancia de edición entre a y b contando inserción, borrado, sustitución y
+    transposición de letras contiguas. Si supera max_d devuelve max_d + 1 sin
+    terminar el cálculo.
+    """
+    if a == b:
+        return 0
+    # Quitar prefijo y sufijo comunes: no cambian la distancia y acortan la tabla
+    lmin = min(len(a), len(b))
+    pre = 0
+    while pre < lmin and a[pre] == b[pre]:
+        pre += 1
+    suf = 0
+    while suf < lmin - pre and a[-1 - suf] == b[-1 - suf]:
+        suf += 1
+    a = a[pre:len(a) - suf]
+    b = b[pre:len(b) - suf]
+    la, lb = len(a), len(b)
+    if abs(la - lb) > max_d:
+        return max_d + 1
+    if la == 0 or lb == 0:
+        return max(la, lb)
+    anterior2 = None
+    anterior = list(range(lb + 1))
+    for i in range(1, la + 1):
+        actual = [i] + [0] * lb
+        minimo_fila = i
+        ca = a[i - 1]
+        for j in range(1, lb + 1):
+            coste = 0 if ca == b[j - 1] else 1
+            v = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + coste)
+            if anterior2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, anterior2[j - 2] + 1)
+            actual[j] = v
+            if v < minimo_fila:
+                minimo_fila = v
+        if minimo_fila > max_d:
+            return max_d + 1
+        anterior2, anterior = anterior, actual
+    return min(anterior[lb], max_d + 1)
+
+
+def _borrados(palabra: str, max_d: int) -> Set[str]:
+    """Todas las variantes de `palabra` con hasta max_d letras borradas (incluida ella misma)."""
+    resultado = {palabra}
+    frontera = {palabra}
+    # Más allá de len(palabra) borrados no queda nada que borrar
+    for _ in range(min(max_d, len(palabra))):
+        if not frontera:
+            break
+        siguiente = set()
+        for w in frontera:
+            for i in range(len(w)):
+                siguiente.add(w[:i] + w[i + 1:])
+        siguiente -= resultado
+        resultado |= siguiente
+        frontera = siguiente
+    return resultado
+
+
+def entradas_indice(palabras: Iterable[str], max_d: int) -> int:
+    """Cota del número de entradas de IndiceVecindad(palabras, max_d), sin construirlo."""
+    por_longitud = Counter(len(w) for w in set(palabras))
+    return sum(veces * sum(comb(n, k) for k in range(min(max_d, n) + 1))
+               for n, veces in por_longitud.items())
+
+
+class IndiceVecindad:
+    """
+    Índice de vecindario por borrados: cada palabra se registra bajo todas sus
+    variantes con hasta max_d borrados. Una consulta genera sus propios borrados,
+    recoge candidatos y solo verifica esos con distancia_acotada, de modo que el
+    coste no crece con el tamaño de la lista.
+    """
+    def __init__(self, palabras: Iterable[str], max_d: int = 1):
+        self.max_d = max_d
+        self._exactas: Set[str] = set()
+        self._vecinos: Dict[str, List[str]] = {}
+        self._max_len = 0
+        for w in palabras:
+            if w in self._exactas:
+                continue
+            self._exactas.add(w)
+            self._max_len = max(self._max_len, len(w))
+            if max_d > 0:
+                for b in _borrados(w, max_d):
+                    self._vecinos.setdefault(b, []).append(w)
+
+    def __contains__(self, palabra: str) -> bool:
+        return palabra in self._exactas
+
+    def cercanas(self, palabra: str, max_d: Optional[int] = None) -> List[str]:
+        """Palabras del índice a distancia <= max_d (por defecto la del índice)."""
+        max_d = self.max_d if max_d is None else min(max_d, self.max_d)
+        if max_d == 0:
+            return [palabra] if palabra in self._exactas else []
+        if len(palabra) > self._max_len + max_d:
+            # Ninguna palabra del índice está tan cerca: no generar sus borrados
+            return []
+        candidatas = set()
+        for b in _borrados(palabra, max_d):
+            candidatas.update(self._vecinos.get(b, ()))
+        return [w for w in candidatas if distancia_acotada(palabra, w, max_d) <= max_d]
+
+    def contiene_cercana(self, palabra: str, max_d: Optional[int] = None) -> bool:
+        if palabra in self._exactas:
+            return True
+        return bool(self.cercanas(palabra, max_d))
+
+
+class Coincidencia:
+    """
+    Configuración de cómo se compara una adivinanza con la palabra secreta.
+
+    - acentos / mayusculas: plegado de acentos y de mayúsculas
+    - max_distancia: erratas toleradas (0 = coincidencia exacta tras normalizar)
+    - min_longitud: longitud mínima de la palabra secreta para tolerar erratas
+    - solo_conocidas: rechazar adivinanzas que no estén (o no se parezcan) en la
+      lista de palabras de la partida
+    """
+    __slots__ = ("acentos", "mayusculas", "max_distancia", "min_longitud", "solo_conocidas")
+
+    def __init__(self, acentos: bool = True, mayusculas: bool = True, max_distancia: int = 0,
+                 min_longitud: int = 4, solo_conocidas: bool = False):
+        self.acentos = acentos
+        self.mayusculas = mayusculas
+        self.max_distancia = max_distancia
+        self.min_longitud = min_longitud
+        self.solo_conocidas = solo_conocidas
+
+    def normalizar(self, texto: str) -> str:
+        return normalizar(texto, self.acentos, self.mayusculas)
+
+    def coincide(self, intento_norm: str, objetivo_norm: str) -> bool:
+        """Compara formas ya normalizadas."""
+        if intento_norm == objetivo_norm:
+            return True
+        if self.max_distancia <= 0 or len(objetivo_norm) < self.min_longitud:
+            return False
+        return distancia_acotada(intento_norm, objetivo_norm, self.max_distancia) <= self.max_distancia
+
+    def es_conocida(self, intento_norm: str, palabras) -> bool:
+        """True si intento_norm está (o se parece, según max_distancia) a alguna palabra de la lista."""
+        return indice_para(palabras, self).contiene_cercana(intento_norm)
+
+    def como_dict(self) -> Dict[str, object]:
+        return {campo: getattr(self, campo) for campo in Coincidencia.__slots__}
+
+    @classmethod
+    def desde_dict(cls, datos: Optional[Dict[str, object]]) -> "Coincidencia":
+        """
+        Inversa de como_dict. Los datos pueden venir de un cliente: solo se
+        aceptan las opciones conocidas, con su tipo, y max_distancia entre 0 y
+        MAX_DISTANCIA. Lanza ValueError si no.
+        """
+        if not datos:
+            return COINCIDENCIA_POR_DEFECTO
+        if not isinstance(datos, dict):
+            raise ValueError("La coincidencia debe ser un objeto {opción: valor}.")
+        for campo, valor in datos.items():
+            if campo not in cls.__slots__:
+                raise ValueError(f"Opción de coincidencia desconocida: {campo!r}")
+            tipo = int if campo in ("max_distancia", "min_longitud") else bool
+            # bool es subclase de int: se compara el tipo exacto
+            if type(valor) is not tipo:
+                raise ValueError(f"{campo} debe ser {'un entero' if tipo is int else 'true/false'}: {valor!r}")
+        if not 0 <= datos.get("max_distancia", 0) <= MAX_DISTANCIA:
+            raise ValueError(f"max_distancia debe estar entre 0 y {MAX_DISTANCIA}.")
+        if datos.get("min_longitud", 0) < 0:
+            raise ValueError("min_longitud no puede ser negativa.")
+        return cls(**datos)
+
+
+COINCIDENCIA_POR_DEFECTO = Coincidencia()
+
+# Índices por lista de palabras (compartidos por todas las partidas que usan la misma lista)
+_MAX_INDICES = 8
+_indices: "OrderedDict[tuple, IndiceVecindad]" = OrderedDict()
+_indices_lock = threading.Lock()
+
+
+def indice_para(palabras, coincidencia: Coincidencia) -> IndiceVecindad:
+    """
+    Índice de vecindad de `palabras` normalizadas según `coincidencia`. Se
+    construye una vez por contenido de la lista y configuración, y se comparte
+    entre partidas; se guardan los últimos _MAX_INDICES. Seguro entre hilos (dos
+    hilos pueden construir a la vez el mismo índice; se queda uno).
+
+    Las listas se copian a una tupla para la clave: si se editan después, la
+    siguiente consulta construye otro índice. Hashear la tupla es O(n) por
+    consulta, mucho menos que reconstruir el índice. Las vistas de un banco de
+    palabras son de solo lectura y se usan como clave directamente.
+    """
+    contenido = tuple(palabras) if isinstance(palabras, list) else palabras
+    clave = (contenido, coincidencia.acentos, coincidencia.mayusculas, coincidencia.max_distancia)
+    with _indices_lock:
+        indice = _indices.get(clave)
+        if indice is not None:
+            _indices.move_to_end(clave)
+            return indice
+    # Construir fuera del candado: puede tardar con listas grandes
+    indice = IndiceVecindad((coincidencia.normalizar(w) for w in contenido), coincidencia.max_distancia)
+    with _indices_lock:
+        indice = _indices.setdefault(clave, indice)
+        _indices.move_to_end(clave)
+        while len(_indices) > _MAX_INDICES:
+            _indices.popitem(last=False)
+    return indice
@@ -0,0 +1,466 @@
+# difusion.py
+# Difusión en directo de partidas a espectadores: un feed de cambios por sala con
+# números de secuencia, instantáneas para quien llega tarde y reparto (fan-out) que
+# codifica cada cambio una sola vez y comparte los mismos bytes con todos.
+#
+# Mensajes (little endian), cada uno con su longitud delante para escribirlo tal cual:
+#   longitud u32 | tipo u8 | seq u32 | cuerpo
+#   ELIMINADO  cuerpo = jugador u32
+#   FIN        cuerpo = ganador u8 (1 impostores, 2 tripulantes)
+#   SNAPSHOT   cuerpo = num_players u32, over u8, ganador u8 (0 si no hay), vivos (1 bit por
+#              jugador, ceil(n/8) bytes), longitud u32 + nombres en UTF-8 separados por "\n"
+#              (longitud 0 con los nombres por defecto)
+# Como summary(), no revela la palabra ni quiénes son impostores.
+#
+# Protocolo de espectador (Difusor.iniciar, TCP): el cliente envía una línea
+# "sala [seq]" y recibe una instantánea (o, si da la última seq vista y sigue en el
+# historial, solo los cambios posteriores) y después los cambios en directo.
+#
+# Uso:
+#   python difusion.py --espectadores 5000 --jugadores 200     # comparación con reenviar summary()
+
+import asyncio
+import itertools
+import json
+import random
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from partida import Partida
+
+_LONGITUD = struct.Struct("<I")
+_CABECERA = struct.Struct("<BI")
+_JUGADOR = struct.Struct("<I")
+_GANADOR = struct.Struct("<B")
+_ESTADO = struct.Struct("<IBB")
+
+ELIMINADO, FIN, SNAPSHOT = 1, 2, 3
+_GANADORES = {"impostores": 1, "tripulantes": 2}
+_GANADORES_INV = {v: k for k, v in _GANADORES.items()}
+
+# Por encima de este volumen pendiente, un espectador deja de recibir cambios y se
+# resincroniza con una instantánea cuando vacíe la mitad
+LIMITE_PENDIENTE = 256 * 1024
+
+
+def _mensaje(tipo: int, seq: int, cuerpo: bytes) -> bytes:
+    return _LONGITUD.pack(_CABECERA.size + len(cuerpo)) + _CABECERA.pack(tipo, seq) + cuerpo
+
+
+def empaquetar_bits(valores: bytes) -> bytes:
+    """bytearray de 0/1 -> 1 bit por valor (el valor i en el bit i % 8 del byte i // 8)."""
+    n = len(valores)
+    relleno = bytes(valores) + bytes(-n % 8)
+    bits = 0
+    for j in range(8):
+        # Cada byte de relleno[j::8] vale 0 o 1: desplazado j bits sigue en su byte
+        bits |= int.from_bytes(relleno[j::8], "little") << j
+    return bits.to_bytes((n + 7) // 8, "little")
+
+
+def desempaquetar_bits(datos: bytes, n: int) -> bytearray:
+    """Inversa de empaquetar_bits: n valores 0/1."""
+    m = len(datos)
+    bits = int.from_bytes(datos, "little")
+    unos = int.from_bytes(b"\x01" * m, "little")
+    valores = bytearray(m * 8)
+    for j in range(8):
+        valores[j::8] = ((bits >> j) & unos).to_bytes(m, "little")
+    return valores[:n]
+
+
+class FeedCambios:
+    """
+    Feed de cambios de una Partida (se suscribe a sus eventos "eject" y "fin").
+
+    Cada cambio se codifica una vez al producirse y se guarda en un historial
+    circular de `historial` mensajes. desde(seq) devuelve los mensajes posteriores
+    a seq (None si ya salieron del historial) e instantanea() el estado completo,
+    codificado una vez por seq. Los oyentes (añadidos con escuchar) reciben
+    (seq, mensaje) por cada cambio, en orden de seq. Se puede alimentar desde
+    varios hilos (PartidaConcurrente): la asignación de seq y la entrega a los
+    oyentes van con el mismo candado. Una excepción de un oyente no llega a la
+    partida: se cuenta en `errores` y se sigue con los demás. `seq` es la
+    secuencia inicial (la de la primera instantánea).
+    """
+    def __init__(self, partida: Partida, historial: int = 1024, seq: int = 0):
+        self.partida = partida
+        self.seq = seq
+        self.codificados = 0
+        self.errores = 0
+        self._historial: "deque[bytes]" = deque(maxlen=historial)
+        self._instantanea: Tuple[int, bytes] = (-1, b"")
+        self._oyentes: List = []
+        # Reentrante: un oyente puede pedir instantanea() o desde() mientras recibe
+        self._lock = threading.RLock()
+        partida.suscribir(self._al_evento)
+
+    def cerrar(self):
+        self.partida.desuscribir(self._al_evento)
+
+    def escuchar(self, callback):
+        """callback(seq, mensaje) por cada cambio."""
+        self._oyentes.append(callback)
+
+    def _al_evento(self, partida: Partida, evento: str, datos: Dict[str, Any]):
+        if evento == "eject":
+            tipo, cuerpo = ELIMINADO, _JUGADOR.pack(datos["player_id"])
+        elif evento == "fin":
+            tipo, cuerpo = FIN, _GANADOR.pack(_GANADORES[datos["winner"]])
+        else:
+            return
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            mensaje = _mensaje(tipo, seq, cuerpo)
+            self.codificados += 1
+            self._historial.append(mensaje)
+            # Entregar dentro del candado: otro hilo no puede adelantar una seq mayor
+            for callback in list(self._oyentes):
+                try:
+                    callback(seq, mensaje)
+                except Exception:
+                    self.errores += 1
+
+    def desde(self, seq: int) -> Optional[List[bytes]]:
+        """Mensajes con secuencia > seq, o None si alguno ya no está en el historial."""
+        with self._lock:
+            primera = self.seq - len(self._historial) + 1
+            if seq < primera - 1 or seq > self.seq:
+                return None
+            return list(itertools.islice(self._historial, seq - primera + 1, None))
+
+    def instantanea(self) -> Tuple[int, bytes]:
+        """(seq, mensaje SNAPSHOT) del estado actual."""
+        with self._lock:
+            seq = self.seq
+            if self._instantanea[0] == seq:
+                return self._instantanea
+            p = self.partida
+            nombres = "\n".join(p._names).encode("utf-8") if p._names is not None else b""
+            cuerpo = b"".join((_ESTADO.pack(p.num_players, p.over, _GANADORES.get(p.winner, 0)),
+                               empaquetar_bits(p.alive), _LONGITUD.pack(len(nombres)), nombres))
+            self._instantanea = (seq, _mensaje(SNAPSHOT, seq, cuerpo))
+            self.codificados += 1
+            return self._instantanea
+
+
+# ================ Espectador ================
+class EstadoEspectador:
+    """
+    Estado de la sala reconstruido en el lado del espectador a partir de los
+    mensajes. aplicar() lanza ValueError si falta algún cambio (salto de seq):
+    hay que volver a pedir una instantánea. Los cambios ya incluidos en la
+    última instantánea (seq <= la actual) se ignoran.
+    """
+    def __init__(self):
+        self.seq = -1
+        self.num_players = 0
+        self.alive = bytearray()
+        self.names: Optional[List[str]] = None
+        self.over = False
+        self.winner: Optional[str] = None
+        self._buffer = bytearray()
+
+    def alimentar(self, datos: bytes) -> int:
+        """Añade bytes recibidos y aplica los mensajes completos. Devuelve cuántos."""
+        self._buffer += datos
+        pos = 0
+        aplicados = 0
+        try:
+            while len(self._buffer) - pos >= _LONGITUD.size:
+                (largo,) = _LONGITUD.unpack_from(self._buffer, pos)
+                fin = pos + _LONGITUD.size + largo
+                if fin > len(self._buffer):
+                    break
+                cuerpo = bytes(self._buffer[pos + _LONGITUD.size:fin])
+                # El mensaje se consume aunque aplicar() falle
+                pos = fin
+                self.aplicar(cuerpo)
+                aplicados += 1
+        finally:
+            del self._buffer[:pos]
+        return aplicados
+
+    def aplicar(self, cuerpo: bytes):
+        """Aplica un mensaje sin su prefijo de longitud."""
+        tipo, seq = _CABECERA.unpack_from(cuerpo)
+        pos = _CABECERA.size
+        if tipo == SNAPSHOT:
+            n, over, ganador = _ESTADO.unpack_from(cuerpo, pos)
+            pos += _ESTADO.size
+            nbytes = (n + 7) // 8
+            self.alive = desempaquetar_bits(cuerpo[pos:pos + nbytes], n)
+            pos += nbytes
+            (largo,) = _LONGITUD.unpack_from(cuerpo, pos)
+            pos += _LONGITUD.size
+            self.names = cuerpo[pos:pos + largo].decode("utf-8").split("\n") if largo else None
+            self.num_players = n
+            self.over = bool(over)
+            self.winner = _GANADORES_INV.get(ganador)
+            self.seq = seq
+            return
+        if seq <= self.seq:
+            return
+        if seq != self.seq + 1:
+            raise ValueError(f"Falta algún cambio: se esperaba la seq {self.seq + 1} y llegó {seq}.")
+        if tipo == ELIMINADO:
+            (pid,) = _JUGADOR.unpack_from(cuerpo, pos)
+            self.alive[pid] = 0
+        elif tipo == FIN:
+            (ganador,) = _GANADOR.unpack_from(cuerpo, pos)
+            self.over = True
+            self.winner = _GANADORES_INV[ganador]
+        self.seq = seq
+
+
+# ================ Reparto ================
+class _Suscripcion:
+    __slots__ = ("sala", "sumidero", "atrasado")
+
+    def __init__(self, sala: str, sumidero):
+        self.sala = sala
+        self.sumidero = sumidero
+        self.atrasado = False
+
+
+class Difusor:
+    """
+    Reparte los feeds de muchas salas a sus espectadores.
+
+    Un sumidero es cualquier objeto con write(bytes) y get_write_buffer_size()
+    (p. ej. un asyncio.Transport). Cada cambio se escribe como el mismo objeto
+    bytes en todos los sumideros de la sala: difundir cuesta una copia al buffer
+    por espectador, sin volver a serializar. Los espectadores que no leen
+    (buffer por encima de `limite`) dejan de recibir cambios y, cuando vacían
+    la mitad, reciben la instantánea actual (compartida también).
+
+    No es seguro entre hilos: si la partida cambia en otro hilo, pasar `loop`
+    para que el reparto se haga en el bucle de asyncio.
+    """
+    def __init__(self, limite: int = LIMITE_PENDIENTE, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.limite = limite
+        self.loop = loop
+        self.feeds: Dict[str, FeedCambios] = {}
+        self._suscripciones: Dict[str, List[_Suscripcion]] = {}
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        # Contadores
+        self.mensajes = 0          # cambios repartidos
+        self.escrituras = 0        # mensajes escritos en sumideros
+        self.bytes_escritos = 0
+        self.resincronizados = 0
+        # Mayor seq de los feeds ya cerrados: un feed nuevo empieza por encima
+        self._seq_max = -1
+
+    def seguir(self, sala: str, partida: Partida, historial: int = 1024) -> FeedCambios:
+        """
+        Empieza a difundir la partida como `sala`. Si la sala ya se difundía, el
+        feed nuevo sigue la secuencia por encima del anterior (así un espectador
+        que reconecta con una seq vieja recibe la instantánea) y los espectadores
+        que siguen suscritos reciben ya la instantánea de la partida nueva.
+        """
+        self.dejar(sala)
+        feed = FeedCambios(partida, historial, seq=self._seq_max + 1)
+        feed.escuchar(lambda seq, mensaje: self._publicar(sala, mensaje))
+        self.feeds[sala] = feed
+        suscritos = self._suscripciones.setdefault(sala, [])
+        if suscritos:
+            instantanea = feed.instantanea()[1]
+            for s in suscritos:
+                # Los atrasados la recibirán al vaciar su buffer (ver _publicar)
+                if not s.atrasado:
+                    self._escribir(s.sumidero, instantanea)
+        return feed
+
+    def dejar(self, sala: str):
+        """Deja de difundir la sala (los espectadores siguen suscritos hasta que se vayan)."""
+        feed = self.feeds.pop(sala, None)
+        if feed is not None:
+            feed.cerrar()
+            self._seq_max = max(self._seq_max, feed.seq)
+
+    def suscribir(self, sala: str, sumidero, seq: Optional[int] = None) -> _Suscripcion:
+        """
+        Añade un espectador. Si `seq` es la última secuencia que vio y los cambios
+        posteriores siguen en el historial, solo recibe esos; si no, la instantánea.
+        """
+        feed = self.feeds.get(sala)
+        if feed is None:
+            raise KeyError(sala)
+        pendientes = feed.desde(seq) if seq is not None else None
+        if pendientes is None:
+            pendientes = [feed.instantanea()[1]]
+        for mensaje in pendientes:
+            self._escribir(sumidero, mensaje)
+        s = _Suscripcion(sala, sumidero)
+        self._suscripciones[sala].append(s)
+        return s
+
+    def desuscribir(self, s: _Suscripcion):
+        lista = self._suscripciones.get(s.sala)
+        if lista and s in lista:
+            lista.remove(s)
+
+    def espectadores(self, sala: str) -> int:
+        return len(self._suscripciones.get(sala, ()))
+
+    def _escribir(self, sumidero, mensaje: bytes):
+        sumidero.write(mensaje)
+        self.escrituras += 1
+        self.bytes_escritos += len(mensaje)
+
+    def _publicar(self, sala: str, mensaje: bytes):
+        if self.loop is not None and not self._en_bucle():
+            self.loop.call_soon_threadsafe(self._publicar, sala, mensaje)
+            return
+        self.mensajes += 1
+        instantanea = None
+        limite = self.limite
+        for s in self._suscripciones.get(sala, ()):
+            pendiente = s.sumidero.get_write_buffer_size()
+            if s.atrasado:
+                if pendiente > limite // 2:
+                    continue
+                if instantanea is None:
+                    instantanea = self.feeds[sala].instantanea()[1]
+                self._escribir(s.sumidero, instantanea)
+                s.atrasado = False
+                self.resincronizados += 1
+            elif pendiente > limite:
+                s.atrasado = True
+            else:
+                self._escribir(s.sumidero, mensaje)
+
+    def _en_bucle(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {"salas": len(self.feeds),
+                "espectadores": sum(len(v) for v in self._suscripciones.values()),
+                "mensajes": self.mensajes, "escrituras": self.escrituras,
+                "bytes_escritos": self.bytes_escritos, "resincronizados": self.resincronizados,
+                "codificados": sum(f.codificados for f in self.feeds.values())}
+
+    # ---- Red ----
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        s = None
+        try:
+            partes = (await reader.readline()).decode("utf-8", "replace").split()
+            try:
+                seq = int(partes[1]) if len(partes) > 1 else None
+                s = self.suscribir(partes[0], writer.transport, seq)
+            except (IndexError, KeyError, ValueError):
+                return
+            # El espectador no envía nada más: esperar a que cierre
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            if s is not None:
+                self.desuscribir(s)
+            writer.close()
+
+    async def iniciar(self, host: str = "127.0.0.1", port: int = 8766) -> asyncio.AbstractServer:
+        """Escucha espectadores en TCP (port=0 elige uno libre)."""
+        self.loop = asyncio.get_running_loop()
+        self._servidor = await asyncio.start_server(self._atender, host, port)
+        return self._servidor
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+
+# ================ Comparación ================
+class _SumideroMemoria:
+    """Sumidero en memoria que reconstruye el estado (o solo cuenta bytes)."""
+    def __init__(self, reconstruir: bool = True):
+        self.estado = EstadoEspectador() if reconstruir else None
+        self.bytes = 0
+
+    def write(self, datos: bytes):
+        self.bytes += len(datos)
+        if self.estado is not None:
+            self.estado.alimentar(datos)
+
+    def get_write_buffer_size(self) -> int:
+        return 0
+
+
+def _comparar(espectadores: int, jugadores: int, seed: int = 0):
+    """
+    Juega una partida con `espectadores` suscritos y compara el coste por ronda
+    con reenviar summary() y la lista de vivos (JSON) a cada uno. Comprueba que
+    todos, también los que llegan tarde, acaban con el estado de la partida.
+    """
+    rng = random.Random(seed)
+    p = Partida(num_players=jugadores, num_impostors=max(1, jugadores // 10), seed=seed)
+    d = Difusor()
+    d.seguir("sala", p, historial=64)
+    sumideros = [_SumideroMemoria(reconstruir=False) for _ in range(espectadores)]
+    for s in sumideros:
+        d.suscribir("sala", s)
+    verificados = [_SumideroMemoria() for _ in range(3)]
+    d.suscribir("sala", verificados[0])
+    reconectado = d.suscribir("sala", verificados[2])
+    t_feed = t_completo = 0.0
+    bytes_completo = 0
+    rondas = 0
+    muestra = min(espectadores, 5)
+    while not p.over:
+        vivos = [i for i in range(p.num_players) if p.alive[i]]
+        t0 = time.perf_counter()
+        p.vote({v: rng.choice(vivos) for v in vivos}, perform_eject=True)
+        t_feed += time.perf_counter() - t0
+        rondas += 1
+        # Lo que costaría reenviar el estado completo a cada espectador (medido en
+        # una muestra de `muestra` espectadores y escalado)
+        t0 = time.perf_counter()
+        for _ in range(muestra):
+            bytes_completo += len(json.dumps({"summary": p.summary(), "alive": [bool(a) for a in p.alive],
+                                              "over": p.over, "winner": p.winner}).encode())
+        t_completo += (time.perf_counter() - t0) * espectadores / muestra
+        if rondas == 3:
+            # Uno llega tarde (instantánea) y otro se desconecta...
+            d.suscribir("sala", verificados[1])
+            d.desuscribir(reconectado)
+        if rondas == 5:
+            # ...y vuelve con la última seq que vio (solo recibe lo que se perdió)
+            d.suscribir("sala", verificados[2], seq=verificados[2].estado.seq)
+    for s in verificados:
+        e = s.estado
+        if (e.alive, e.over, e.winner, e.seq) != (p.alive, p.over, p.winner, d.feeds["sala"].seq):
+            raise RuntimeError("Un espectador no reconstruyó el estado de la partida.")
+    stats = d.estadisticas()
+    bytes_feed = sum(s.bytes for s in sumideros)
+    print(f"{espectadores} espectadores, {jugadores} jugadores, {rondas} rondas")
+    print(f"  feed:    {t_feed / rondas * 1e3:>9.2f} ms/ronda (juego incluido) | {bytes_feed / espectadores:>10.0f} B/espectador"
+          f" | {stats['codificados']} codificaciones para {stats['escrituras']} escrituras")
+    print(f"  summary: {t_completo / rondas * 1e3:>9.2f} ms/ronda | {bytes_completo / muestra:>10.0f} B/espectador")
+    print("  espectadores verificados (directo, tarde con instantánea, reconexión con seq): ok")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Difusión de partidas a espectadores.")
+    ap.add_argument("--espectadores", type=int, default=5000)
+    ap.add_argument("--jugadores", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    _comparar(args.espectadores, args.jugadores, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
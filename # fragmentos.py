@@ -0,0 +1,515 @@
+# fragmentos.py
+# Salas repartidas entre varios procesos trabajadores (un núcleo cada uno).
+#
+# Un proceso frontal (Fragmentador) enruta cada operación de sala (create, role,
+# guess, vote, eject, state...) al trabajador dueño de la sala según un anillo de
+# hash consistente sobre el id de sala. Cada trabajador es un ServidorPartidas con
+# su propio registro de salas y atiende las mismas operaciones que servidor.py.
+#
+# Protocolo frontal <-> trabajador: socket Unix (socketpair) con tramas binarias
+# [longitud uint32 little-endian][marshal del dict de petición o respuesta].
+# Las respuestas de un trabajador llegan en el orden de sus peticiones.
+#
+# Al añadir o quitar trabajadores, las salas cuyo dueño cambia se trasladan con
+# Partida.to_dict/from_dict (una votación incremental abierta en ellas se cancela).
+# Una sala solo se borra del trabajador de origen cuando el destino la ha importado;
+# si no se puede trasladar se queda en el origen y se sigue enrutando allí.
+#
+# Alcance: Fragmentador es una biblioteca síncrona (bloquea mientras espera a los
+# trabajadores) pensada para lotes de peticiones desde un solo hilo, p. ej. simulaciones
+# o un proceso que agrupa tráfico. No está conectado al frontal asyncio de servidor.py,
+# que sigue alojando todas sus salas en un único proceso.
+#
+# Uso:
+#   python fragmentos.py --trabajadores 1,2,4,8 --salas 4000 --rondas 10   # rendimiento por nº de núcleos
+
+import bisect
+import hashlib
+import itertools
+import marshal
+import multiprocessing
+import os
+import selectors
+import socket
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from partida import Partida
+from salas import RegistroSalas
+from servidor import ErrorProtocolo, ServidorPartidas
+
+# Cabecera de trama: longitud del cuerpo
+_TRAMA = struct.Struct("<I")
+MAX_TRAMA = 16 * 1024 * 1024
+# Operaciones internas entre frontal y trabajadores (los clientes no pueden usarlas)
+_PREFIJO_INTERNO = "frag_"
+# Ids que asigna el frontal ("s" + número): los clientes no pueden elegirlos, porque el
+# frontal no sabe qué salas existen en los trabajadores y podría repetirlos
+_PREFIJO_ID = "s"
+
+
+def codificar(msg: Dict[str, Any]) -> bytes:
+    """Trama completa (cabecera + cuerpo) de un mensaje."""
+    cuerpo = marshal.dumps(msg)
+    if len(cuerpo) > MAX_TRAMA:
+        raise ValueError("Mensaje demasiado grande.")
+    return _TRAMA.pack(len(cuerpo)) + cuerpo
+
+
+def decodificar(buffer: bytearray) -> List[Dict[str, Any]]:
+    """Extrae del buffer los mensajes completos (consume sus bytes) y los devuelve."""
+    mensajes = []
+    pos = 0
+    n = len(buffer)
+    while n - pos >= _TRAMA.size:
+        (largo,) = _TRAMA.unpack_from(buffer, pos)
+        if largo > MAX_TRAMA:
+            raise ValueError("Trama demasiado grande.")
+        fin = pos + _TRAMA.size + largo
+        if fin > n:
+            break
+        mensajes.append(marshal.loads(bytes(buffer[pos + _TRAMA.size:fin])))
+        pos = fin
+    del buffer[:pos]
+    return mensajes
+
+
+# ================ Hash consistente ================
+class AnilloHash:
+    """
+    Anillo de hash consistente con `replicas` puntos virtuales por nodo.
+    Al añadir o quitar un nodo solo cambian de dueño las claves de los arcos
+    afectados (en promedio 1/n de ellas).
+    """
+    def __init__(self, replicas: int = 64):
+        self.replicas = replicas
+        self._puntos: List[int] = []
+        self._nodos: List[str] = []
+
+    @staticmethod
+    def _hash(texto: str) -> int:
+        return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def agregar(self, nodo: str):
+        for i in range(self.replicas):
+            h = self._hash(f"{nodo}#{i}")
+            j = bisect.bisect_left(self._puntos, h)
+            self._puntos.insert(j, h)
+            self._nodos.insert(j, nodo)
+
+    def quitar(self, nodo: str):
+        conservar = [(h, n) for h, n in zip(self._puntos, self._nodos) if n != nodo]
+        self._puntos = [h for h, _ in conservar]
+        self._nodos = [n for _, n in conservar]
+
+    def nodo(self, clave: str) -> str:
+        if not self._puntos:
+            raise RuntimeError("No hay trabajadores.")
+        j = bisect.bisect_right(self._puntos, self._hash(clave))
+        return self._nodos[j if j < len(self._nodos) else 0]
+
+    def __len__(self) -> int:
+        return len(set(self._nodos))
+
+
+def _es_id_reservado(room: str) -> bool:
+    return room.startswith(_PREFIJO_ID) and room[len(_PREFIJO_ID):].isdigit()
+
+
+# ================ Trabajador ================
+class ServidorFragmento(ServidorPartidas):
+    """ServidorPartidas de un trabajador, con las operaciones internas de traslado y estadísticas."""
+    def __init__(self, max_salas: int = 100000, registro: Optional[RegistroSalas] = None):
+        super().__init__(max_salas, registro)
+        self.peticiones = 0
+        self.errores = 0
+        self.segundos = 0.0
+
+    def despachar(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        resp = super().despachar(msg)
+        self.segundos += time.perf_counter() - t0
+        self.peticiones += 1
+        if not resp.get("ok"):
+            self.errores += 1
+        return resp
+
+    def _op_create(self, msg):
+        # El frontal asigna el id para que el enrutado no dependa del trabajador
+        if not msg.get("room"):
+            raise ErrorProtocolo("Falta el id de sala.")
+        return super()._op_create(msg)
+
+    def _op_frag_rooms(self, msg):
+        return list(self.salas)
+
+    def _op_frag_export(self, msg):
+        # Solo copia: la sala se borra con frag_drop cuando el destino la ha importado
+        room = str(msg.get("room"))
+        partida = self.salas.get(room)
+        return {"room": room, "partida": None if partida is None else partida.to_dict()}
+
+    def _op_frag_drop(self, msg):
+        room = str(msg.get("room"))
+        self.votaciones.pop(room, None)
+        return {"room": room, "deleted": self.salas.descartar(room)}
+
+    def _op_frag_import(self, msg):
+        self.salas[str(msg["room"])] = Partida.from_dict(msg["partida"])
+        return {"room": msg["room"]}
+
+    def _op_frag_stats(self, msg):
+        return {"pid": os.getpid(), "salas": len(self.salas), "peticiones": self.peticiones,
+                "errores": self.errores, "segundos": self.segundos, **self.salas.estadisticas()}
+
+
+def _responder(servidor: ServidorFragmento, msg: Any) -> bytes:
+    """Trama de respuesta a un mensaje; cualquier fallo se responde como error y el trabajador sigue."""
+    id_ = msg.get("id") if isinstance(msg, dict) else None
+    try:
+        if not isinstance(msg, dict):
+            raise ErrorProtocolo("La petición debe ser un diccionario.")
+        return codificar(servidor.despachar(msg))
+    except ErrorProtocolo as e:
+        servidor.errores += 1
+        return codificar({"id": id_, "ok": False, "error": str(e)})
+    except Exception as e:
+        # Incluye MemoryError o una respuesta que marshal no sabe codificar
+        servidor.errores += 1
+        return codificar({"id": id_, "ok": False, "error": f"Error interno: {type(e).__name__}"})
+
+
+def _bucle_trabajador(sock: socket.socket, max_salas: int, ajenos: List[socket.socket]):
+    """Proceso trabajador: lee tramas, despacha y responde en lote hasta que el frontal cierra."""
+    # Con fork se heredan los extremos del frontal (el propio y los de otros trabajadores):
+    # cerrarlos para que, al cerrarlos el frontal, recv devuelva fin de fichero
+    for s in ajenos:
+        s.close()
+    servidor = ServidorFragmento(max_salas=max_salas, registro=RegistroSalas(max_salas=max_salas))
+    buffer = bytearray()
+    try:
+        while True:
+            datos = sock.recv(1 << 16)
+            if not datos:
+                break
+            buffer += datos
+            salida = [_responder(servidor, msg) for msg in decodificar(buffer)]
+            if salida:
+                sock.sendall(b"".join(salida))
+    except (ConnectionError, KeyboardInterrupt):
+        pass
+    finally:
+        sock.close()
+
+
+class _Trabajador:
+    """Lado frontal de un trabajador: proceso, socket y contadores de tráfico."""
+    __slots__ = ("nombre", "proceso", "sock", "entrada", "enviadas", "bytes_enviados", "bytes_recibidos")
+
+    def __init__(self, nombre: str, max_salas: int, ajenos: Optional[List[socket.socket]] = None):
+        self.nombre = nombre
+        self.sock, hijo = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.proceso = multiprocessing.Process(target=_bucle_trabajador,
+                                               args=(hijo, max_salas, [self.sock, *(ajenos or [])]),
+                                               name=f"fragmento-{nombre}", daemon=True)
+        self.proceso.start()
+        hijo.close()
+        self.sock.setblocking(False)
+        self.entrada = bytearray()
+        self.enviadas = 0
+        self.bytes_enviados = 0
+        self.bytes_recibidos = 0
+
+    def parar(self, espera: float = 5.0):
+        self.sock.close()
+        self.proceso.join(espera)
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+            self.proceso.join()
+
+
+# ================ Frontal ================
+class Fragmentador:
+    """
+    Enruta operaciones de sala a `trabajadores` procesos (por defecto uno por núcleo).
+
+    - despachar(msg): una petición, misma forma de respuesta que ServidorPartidas.
+    - despachar_lote(msgs): muchas peticiones en tubería; cada trabajador recibe las
+      suyas en una sola escritura y todos trabajan a la vez. Las respuestas vuelven
+      en el orden de `msgs`.
+    - agregar_trabajador() / quitar_trabajador(nombre): cambian el anillo y trasladan
+      las salas afectadas.
+    - estadisticas(): carga por fragmento (op "stats" para los clientes).
+
+    Se usa como context manager o llamando a cerrar().
+    """
+    def __init__(self, trabajadores: Optional[int] = None, replicas: int = 64, max_salas: int = 100000):
+        self.max_salas = max_salas
+        self.anillo = AnilloHash(replicas)
+        self.trabajadores: Dict[str, _Trabajador] = {}
+        self._nombres = itertools.count()
+        self._ids = itertools.count(1)
+        self.trasladadas = 0
+        # Salas que no se pudieron trasladar: siguen en este trabajador, no en el del anillo
+        self._fijas: Dict[str, str] = {}
+        for _ in range(trabajadores or os.cpu_count() or 1):
+            self.agregar_trabajador()
+
+    def __enter__(self) -> "Fragmentador":
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def cerrar(self):
+        for t in self.trabajadores.values():
+            t.parar()
+        self.trabajadores = {}
+
+    # ---- Tubería ----
+    def _ejecutar(self, pares: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Envía cada (trabajador, mensaje) y devuelve las respuestas en el mismo orden.
+        Escribe y lee a la vez (selectors) para que ningún lado se bloquee con el
+        buffer del socket lleno.
+        """
+        respuestas: List[Optional[Dict[str, Any]]] = [None] * len(pares)
+        salida: Dict[str, bytearray] = {}
+        pendientes: Dict[str, List[int]] = {}
+        for i, (nombre, msg) in enumerate(pares):
+            salida.setdefault(nombre, bytearray()).extend(codificar(msg))
+            pendientes.setdefault(nombre, []).append(i)
+        sel = selectors.DefaultSelector()
+        try:
+            for nombre in pendientes:
+                t = self.trabajadores[nombre]
+                t.enviadas += len(pendientes[nombre])
+                sel.register(t.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, t)
+            siguiente = {nombre: 0 for nombre in pendientes}
+            vivos = len(pendientes)
+            while vivos:
+                for clave, eventos in sel.select():
+                    t = clave.data
+                    nombre = t.nombre
+                    if eventos & selectors.EVENT_WRITE and salida[nombre]:
+                        n = t.sock.send(salida[nombre])
+                        t.bytes_enviados += n
+                        del salida[nombre][:n]
+                        if not salida[nombre]:
+                            sel.modify(t.sock, selectors.EVENT_READ, t)
+                    if eventos & selectors.EVENT_READ:
+                        datos = t.sock.recv(1 << 16)
+                        if not datos:
+                            raise ConnectionError(f"El trabajador {nombre} se cerró.")
+                        t.bytes_recibidos += len(datos)
+                        t.entrada += datos
+                        indices = pendientes[nombre]
+                        for resp in decodificar(t.entrada):
+                            respuestas[indices[siguiente[nombre]]] = resp
+                            siguiente[nombre] += 1
+                        if siguiente[nombre] == len(indices):
+                            sel.unregister(t.sock)
+                            vivos -= 1
+        finally:
+            sel.close()
+        return respuestas
+
+    def _interna(self, nombre: str, op: str, **datos) -> Any:
+        resp = self._ejecutar([(nombre, {"op": _PREFIJO_INTERNO + op, **datos})])[0]
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error"))
+        return resp["result"]
+
+    # ---- Enrutado ----
+    def despachar_lote(self, msgs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        respuestas: List[Optional[Dict[str, Any]]] = [None] * len(msgs)
+        pares = []
+        indices = []
+        for i, msg in enumerate(msgs):
+            if not isinstance(msg, dict):
+                respuestas[i] = {"id": None, "ok": False, "error": "La petición debe ser un diccionario."}
+                continue
+            op = msg.get("op")
+            if op == "stats":
+                respuestas[i] = {"id": msg.get("id"), "ok": True, "result": self.estadisticas()}
+                continue
+            if not isinstance(op, str) or op.startswith(_PREFIJO_INTERNO):
+                respuestas[i] = {"id": msg.get("id"), "ok": False, "error": f"Operación desconocida: {op!r}"}
+                continue
+            if op == "create":
+                if not msg.get("room"):
+                    msg = {**msg, "room": f"{_PREFIJO_ID}{next(self._ids)}"}
+                elif _es_id_reservado(str(msg["room"])):
+                    respuestas[i] = {"id": msg.get("id"), "ok": False,
+                                     "error": f"Id de sala reservado: {msg['room']!r}"}
+                    continue
+            pares.append((self.dueno(msg.get("room")), msg))
+            indices.append(i)
+        for i, resp in zip(indices, self._ejecutar(pares)):
+            respuestas[i] = resp
+        return respuestas
+
+    def despachar(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        return self.despachar_lote([msg])[0]
+
+    def dueno(self, room: str) -> str:
+        """Nombre del trabajador que tiene la sala."""
+        room = str(room)
+        return self._fijas.get(room) or self.anillo.nodo(room)
+
+    # ---- Reequilibrado ----
+    def _trasladar(self, origen: str, rooms: List[str]):
+        """
+        Mueve `rooms` de `origen` a su dueño actual según el anillo: las copia, las
+        importa en el destino y solo entonces las borra de `origen`. Las que fallan
+        (al exportar o al importar) se quedan en `origen`, fijadas a él para el
+        enrutado, y se lanza RuntimeError con sus errores al terminar.
+        """
+        if not rooms:
+            return
+        copias = self._ejecutar([(origen, {"op": "frag_export", "room": r}) for r in rooms])
+        errores: Dict[str, str] = {}
+        pares = []
+        for room, resp in zip(rooms, copias):
+            if not resp.get("ok"):
+                errores[room] = f"exportar: {resp.get('error')}"
+            elif resp["result"]["partida"] is not None:
+                pares.append((self.anillo.nodo(room), {"op": "frag_import", **resp["result"]}))
+            else:
+                self._fijas.pop(room, None)
+        movidas = []
+        for (_, msg), resp in zip(pares, self._ejecutar(pares)):
+            if resp.get("ok"):
+                movidas.append(msg["room"])
+            else:
+                errores[msg["room"]] = f"importar: {resp.get('error')}"
+        for room, resp in zip(movidas, self._ejecutar([(origen, {"op": "frag_drop", "room": r})
+                                                        for r in movidas])):
+            self._fijas.pop(room, None)
+            if not resp.get("ok"):
+                # Ya está en el destino: la copia del origen queda huérfana pero no se pierde nada
+                errores[room] = f"borrar del origen: {resp.get('error')}"
+        self.trasladadas += len(movidas)
+        for room, error in errores.items():
+            if not error.startswith("borrar"):
+                self._fijas[room] = origen
+        if errores:
+            detalle = "; ".join(f"{r!r} ({e})" for r, e in list(errores.items())[:10])
+            raise RuntimeError(f"{len(errores)} sala(s) de {origen} sin trasladar: {detalle}")
+
+    def agregar_trabajador(self) -> str:
+        """Arranca un trabajador, lo añade al anillo y le traslada las salas que ahora son suyas."""
+        nombre = f"t{next(self._nombres)}"
+        self.trabajadores[nombre] = _Trabajador(nombre, self.max_salas,
+                                                [t.sock for t in self.trabajadores.values()])
+        self.anillo.agregar(nombre)
+        for otro in list(self.trabajadores):
+            if otro != nombre:
+                rooms = self._interna(otro, "rooms")
+                self._trasladar(otro, [r for r in rooms if self.anillo.nodo(r) == nombre])
+        return nombre
+
+    def quitar_trabajador(self, nombre: str):
+        """
+        Saca al trabajador del anillo, reparte sus salas entre los demás y lo para.
+        Si alguna sala no se puede trasladar, el trabajador no se para (la sala
+        sigue en él) y se lanza RuntimeError; se puede volver a intentar.
+        """
+        if nombre not in self.trabajadores:
+            raise KeyError(nombre)
+        if len(self.trabajadores) == 1:
+            raise ValueError("No se puede quitar el último trabajador.")
+        self.anillo.quitar(nombre)
+        self._trasladar(nombre, self._interna(nombre, "rooms"))
+        self.trabajadores.pop(nombre).parar()
+        self._fijas = {r: n for r, n in self._fijas.items() if n != nombre}
+
+    # ---- Estadísticas ----
+    def estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        """Por trabajador: contadores del proceso (salas, peticiones, segundos ocupados...) y tráfico."""
+        nombres = list(self.trabajadores)
+        resps = self._ejecutar([(n, {"op": "frag_stats"}) for n in nombres])
+        stats = {}
+        for nombre, resp in zip(nombres, resps):
+            t = self.trabajadores[nombre]
+            stats[nombre] = {**resp["result"], "enviadas": t.enviadas,
+                             "bytes_enviados": t.bytes_enviados, "bytes_recibidos": t.bytes_recibidos}
+        return stats
+
+
+# ================ Rendimiento ================
+def _carga(salas: int, rondas: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+    """Peticiones de creación y, por ronda, un guess fallido y una votación sin expulsión por sala."""
+    crear = [{"op": "create", "room": f"r{i}", "num_players": 10, "num_impostors": 2, "seed": seed + i}
+             for i in range(salas)]
+    votos = {str(v): (v + 1) % 10 for v in range(10)}
+    ronda = []
+    for i in range(salas):
+        ronda.append({"op": "guess", "room": f"r{i}", "player": i % 10, "word": "zzz"})
+        ronda.append({"op": "vote", "room": f"r{i}", "votes": votos})
+    return crear, [ronda] * rondas
+
+
+def medir(trabajadores: int, salas: int = 4000, rondas: int = 10) -> float:
+    """Operaciones por segundo con `trabajadores` procesos (creación aparte)."""
+    crear, lotes = _carga(salas, rondas)
+    with Fragmentador(trabajadores) as f:
+        f.despachar_lote(crear)
+        t0 = time.perf_counter()
+        total = 0
+        for lote in lotes:
+            for resp in f.despachar_lote(lote):
+                if not resp.get("ok"):
+                    raise RuntimeError(resp.get("error"))
+            total += len(lote)
+        return total / (time.perf_counter() - t0)
+
+
+def _comprobar(condicion: bool, que: str):
+    if not condicion:
+        raise AssertionError(f"Reequilibrado incorrecto: {que}")
+
+
+def _comprobar_reequilibrado(salas: int = 500):
+    """Crea salas, añade y quita trabajadores y comprueba que el estado de todas se conserva."""
+    crear, _ = _carga(salas, 0)
+    with Fragmentador(2) as f:
+        f.despachar_lote(crear)
+        f.despachar_lote([{"op": "eject", "room": f"r{i}", "player": i % 10} for i in range(salas)])
+        antes = f.despachar_lote([{"op": "state", "room": f"r{i}"} for i in range(salas)])
+        nuevo = f.agregar_trabajador()
+        movidas = f.trasladadas
+        f.quitar_trabajador("t0")
+        despues = f.despachar_lote([{"op": "state", "room": f"r{i}"} for i in range(salas)])
+        _comprobar(antes == despues, "el estado de alguna sala cambió")
+        stats = f.estadisticas()
+        _comprobar(sum(s["salas"] for s in stats.values()) == salas, "el número de salas cambió")
+        print(f"Reequilibrado: +{nuevo} movió {movidas} de {salas} salas, -t0 movió "
+              f"{f.trasladadas - movidas}; reparto {[s['salas'] for s in stats.values()]}: ok")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Salas repartidas entre procesos trabajadores.")
+    ap.add_argument("--trabajadores", default=str(os.cpu_count() or 1),
+                    help="lista separada por comas de números de trabajadores a medir")
+    ap.add_argument("--salas", type=int, default=4000)
+    ap.add_argument("--rondas", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    _comprobar_reequilibrado()
+    print(f"{os.cpu_count()} núcleos")
+    base = None
+    for n in (int(x) for x in args.trabajadores.split(",")):
+        ops = medir(n, args.salas, args.rondas)
+        base = base or ops
+        print(f"{n:>3} trabajadores: {ops:>10.0f} ops/s (x{ops / base:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,51 @@
 # graficos.py
 # Clase Graficos con __init__ y soporte para imagen de fondo (Pillow recomendado)
 
+import queue
 import random
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
 
-try:
-    from PIL import Image, ImageTk
-    _HAS_PIL = True
-except Exception:
-    Image = None
-    ImageTk = None
-    _HAS_PIL = False
+# Pillow se importa en el primer uso (fondo o avatar), no al importar el módulo:
+# las herramientas que solo usan Partida y el arranque de la interfaz no lo pagan.
+Image = None
+ImageDraw = None
+ImageTk = None
+_HAS_PIL: Optional[bool] = None   # None = todavía no se ha intentado importar
+
+
+def _pil() -> bool:
+    """Importa PIL.Image/ImageDraw la primera vez. Devuelve si Pillow está disponible."""
+    global Image, ImageDraw, _HAS_PIL
+    if _HAS_PIL is None:
+        try:
+            from PIL import Image, ImageDraw
+            _HAS_PIL = True
+        except Exception:
+            _HAS_PIL = False
+    return _HAS_PIL
+
+
+def _imagetk():
+    """PIL.ImageTk (importa tkinter), cargado solo cuando hace falta una PhotoImage."""
+    global ImageTk
+    if ImageTk is None and _pil():
+        try:
+            from PIL import ImageTk
+        except Exception:
+            return None
+    return ImageTk
 
 DEFAULT_COLORS = [
     "#e57373", "#64b5f6", "#81c784", "#ffd54f", "#ba68c8", "#4db6ac", "#ff8a65"
 ]
+MOUTH_STYLES = ["smile", "line", "surprised"]
+
+# Los avatares rasterizados se dibujan a este múltiplo del tamaño y se reducen (antialiasing)
+_SUPERMUESTREO = 4
+# La pirámide del fondo se reduce a la mitad mientras el lado menor supere este valor
+_PIRAMIDE_MIN = 64
 
 class Graficos:
     """
@@ -25,19 +56,34 @@ class Graficos:
     - bg: color de fondo por defecto para canvas
     - default_with_border: si los avatares dibujan borde por defecto
     - background_path: ruta al archivo de imagen que se usará como fondo (opcional)
+    - seed: semilla del generador propio para avatares sin seed explícita
+    - avatar_cache_size: avatares rasterizados (PhotoImage) que se guardan (LRU)
+    - resize_delay_ms: espera tras el último redimensionado antes del reescalado de calidad
+    - bg_cache_size: tamaños de fondo ya escalados que se guardan (LRU)
+    - max_background_size: (ancho, alto) máximo que debe cubrir la copia del fondo en memoria
     
     Métodos principales:
     - draw_avatar: dibuja un avatar individual en un canvas
+    - render_avatar: rasteriza un avatar con Pillow (PIL.Image RGBA)
+    - avatar_image: PhotoImage cacheado de un avatar
     - make_avatar_canvas: crea un canvas con un avatar
     - set_background: carga una imagen de fondo
+    - load_background_async: carga el fondo en un hilo y lo dibuja al terminar
     - draw_background: dibuja la imagen en un canvas escalada
+    - schedule_background: redibujado agrupado (debounce) para eventos <Configure>
     - clear_background: elimina la imagen de fondo cargada
     """
     def __init__(self,
                  colors: Optional[List[str]] = None,
                  bg: str = "white",
                  default_with_border: bool = True,
-                 background_path: Optional[str] = None):
+                 background_path: Optional[str] = None,
+                 seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None,
+                 avatar_cache_size: int = 256,
+                 resize_delay_ms: int = 150,
+                 bg_cache_size: int = 4,
+                 max_background_size: Optional[Tuple[int, int]] = (2560, 1600)):
         """
         Inicializa la clase Graficos.
         
@@ -46,15 +92,43 @@ class Graficos:
         - bg: color de fondo para canvas (si no hay imagen de fondo).
         - default_with_border: si los avatares deben tener borde por defecto.
         - background_path: ruta a la imagen de fondo (opcional).
+        - seed: semilla del generador propio de la instancia (avatares con seed=None).
+        - rng: generador random.Random a usar en lugar de crear uno con `seed`.
+        - avatar_cache_size: máximo de avatares rasterizados en caché (0 desactiva la caché).
+        - resize_delay_ms: milisegundos sin redimensionar antes del reescalado de alta calidad.
+        - bg_cache_size: número de tamaños de fondo escalados que se conservan.
+        - max_background_size: la imagen de fondo se decodifica y guarda al tamaño mínimo
+          que cubre este área (None = tamaño original).
         """
         self.colors = colors.copy() if colors else DEFAULT_COLORS.copy()
         self.bg = bg
         self.default_with_border = default_with_border
+        # Generador propio: no se comparte el estado global de random entre hilos
+        self.seed = seed
+        self._rng = rng if rng is not None else random.Random(seed)
+
+        # Caché de avatares: (color, boca, tamaño, borde) -> PhotoImage, en orden LRU.
+        # Los rasgos de cada seed se guardan aparte para no crear un Random por llamada.
+        self.avatar_cache_size = avatar_cache_size
+        self._avatares: "OrderedDict[tuple, object]" = OrderedDict()
+        self._rasgos: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()
+        self._avatares_tk = None   # intérprete Tk al que pertenecen las PhotoImage cacheadas
 
         # Background image attributes
         self.background_path: Optional[str] = None
-        self._bg_pil = None   # PIL.Image (original)
+        self._bg_pil = None   # PIL.Image (copia maestra, acotada por max_background_size)
         self._bg_tk = None    # ImageTk.PhotoImage (resized and displayed)
+        # Pirámide de copias reducidas a la mitad (la primera es el original): cada
+        # reescalado parte del nivel más pequeño que aún cubre el tamaño pedido
+        self._bg_piramide: List = []
+        self.resize_delay_ms = resize_delay_ms
+        self.bg_cache_size = bg_cache_size
+        self._bg_tamanos: "OrderedDict[tuple, object]" = OrderedDict()   # (w, h) -> PhotoImage
+        self._bg_tamanos_tk = None
+        self._bg_pendiente = None   # (canvas, id de after) del reescalado de calidad
+        self.max_background_size = max_background_size
+        self._bg_generacion = 0     # invalida cargas asíncronas anteriores
+        self._bg_version = 0        # cambia con cada cambio de _bg_pil (ver version_fondo)
         if background_path:
             self.set_background(background_path)
 
@@ -70,38 +144,189 @@ class Graficos:
         - True si se cargó correctamente, False en caso contrario.
         """
         self.background_path = path
-        self._bg_pil = None
-        self._bg_tk = None
-        if not _HAS_PIL:
+        self._olvidar_fondo()
+        if not _pil():
             return False
         try:
-            img = Image.open(path).convert("RGBA")
-            self._bg_pil = img
+            self._bg_pil, self._bg_piramide = self._decodificar_fondo(path, self.max_background_size)
+            self._bg_version += 1
             return True
         except Exception:
-            self._bg_pil = None
+            self._olvidar_fondo()
             return False
 
+    @classmethod
+    def _decodificar_fondo(cls, path: str, objetivo: Optional[Tuple[int, int]]):
+        """
+        Decodifica `path` al tamaño mínimo que cubre `objetivo` (modo "cover").
+        En JPEG se usa draft() para que el decodificador escale por DCT; en el resto
+        reduce() antes de convertir. Devuelve (imagen RGBA, pirámide).
+        Se ejecuta en el hilo de carga: no toca el estado de la instancia.
+        """
+        img = Image.open(path)
+        if objetivo:
+            src_w, src_h = img.size
+            scale = max(objetivo[0] / src_w, objetivo[1] / src_h)
+            if scale < 1:
+                dest = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+                if img.format == "JPEG":
+                    # Devuelve un tamaño >= dest en ambas dimensiones
+                    img.draft("RGB", dest)
+                if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                    img = img.convert("RGBA")
+                factor = min(img.size[0] // dest[0], img.size[1] // dest[1])
+                if factor >= 2:
+                    img = img.reduce(factor)
+                if img.size[0] > dest[0] or img.size[1] > dest[1]:
+                    img = img.resize(dest, Image.LANCZOS)
+        img = img.convert("RGBA")
+        return img, cls._construir_piramide(img)
+
+    def load_background_async(self, path: str, canvas, tag: str = "bg",
+                              on_done: Optional[Callable[[bool], None]] = None, poll_ms: int = 50) -> bool:
+        """
+        Carga el fondo en un hilo sin bloquear la interfaz. Mientras tanto se dibuja
+        un marcador en el canvas; al terminar (comprobado con canvas.after cada
+        poll_ms) se dibuja el fondo y se llama a on_done(ok). Una carga posterior o
+        clear_background() descartan el resultado de las anteriores.
+        
+        Devuelve:
+        - True si la carga empezó, False si no hay Pillow.
+        """
+        self.background_path = path
+        self._olvidar_fondo()
+        generacion = self._bg_generacion
+        if not _pil():
+            return False
+        objetivo = self.max_background_size
+        try:
+            # No tiene sentido guardar más de lo que cabe en pantalla
+            pantalla = (int(canvas.winfo_screenwidth()), int(canvas.winfo_screenheight()))
+            objetivo = pantalla if objetivo is None else (min(objetivo[0], pantalla[0]), min(objetivo[1], pantalla[1]))
+        except Exception:
+            pass
+        self.draw_placeholder(canvas, tag=tag)
+
+        resultado = queue.SimpleQueue()
+
+        def cargar():
+            try:
+                resultado.put(self._decodificar_fondo(path, objetivo))
+            except Exception:
+                resultado.put(None)
+
+        threading.Thread(target=cargar, name="carga-fondo", daemon=True).start()
+
+        def comprobar():
+            try:
+                cargado = resultado.get_nowait()
+            except queue.Empty:
+                try:
+                    canvas.after(poll_ms, comprobar)
+                except Exception:
+                    pass
+                return
+            if generacion != self._bg_generacion:
+                return
+            ok = cargado is not None
+            if ok:
+                self._bg_pil, self._bg_piramide = cargado
+                self._bg_version += 1
+                self.draw_background(canvas, tag=tag)
+            if on_done is not None:
+                on_done(ok)
+
+        canvas.after(poll_ms, comprobar)
+        return True
+
+    def draw_placeholder(self, canvas, tag: str = "bg", text: str = "Cargando…"):
+        """Dibuja un marcador (color de fondo y texto) mientras se carga la imagen."""
+        try:
+            w = max(int(canvas.winfo_width()), int(canvas["width"]))
+            h = max(int(canvas.winfo_height()), int(canvas["height"]))
+            canvas.delete(tag)
+            canvas.create_rectangle(0, 0, 10000, 10000, fill=self.bg, outline="", tags=(tag,))
+            canvas.create_text(w / 2, h / 2, text=text, fill="gray40", tags=(tag,))
+            canvas.lower(tag)
+        except Exception:
+            pass
+
     def clear_background(self):
         """Elimina la imagen de fondo cargada."""
         self.background_path = None
+        self._olvidar_fondo()
+
+    def _olvidar_fondo(self):
+        self._bg_generacion += 1
+        self._bg_version += 1
         self._bg_pil = None
         self._bg_tk = None
+        self._bg_piramide = []
+        self._bg_tamanos.clear()
+        self._cancelar_pendiente()
+
+    @property
+    def version_fondo(self) -> int:
+        """Número que cambia cada vez que cambia la imagen de fondo (para cachear lo derivado de ella)."""
+        return self._bg_version
+
+    def fondo_pil(self, width: int, height: int, calidad: bool = True):
+        """
+        Fondo escalado en modo "cover" como PIL.Image RGB de width x height, sin
+        Tk. Devuelve None si no hay imagen de fondo o Pillow no está disponible.
+        """
+        if self._bg_pil is None or not _pil():
+            return None
+        return self._escalar_fondo(width, height, calidad).convert("RGB")
+
+    @staticmethod
+    def _construir_piramide(img) -> List:
+        niveles = [img]
+        while min(niveles[-1].size) >= 2 * _PIRAMIDE_MIN:
+            niveles.append(niveles[-1].reduce(2))
+        return niveles
+
+    def _escalar_fondo(self, width: int, height: int, calidad: bool = True):
+        """
+        Imagen del fondo en modo "cover" (llenar y recortar centro) de width x height.
+        Parte del nivel de la pirámide más pequeño que cubre el tamaño y solo escala
+        la zona recortada. calidad=False usa un filtro rápido (vista previa).
+        """
+        src_w, src_h = self._bg_pil.size
+        scale = max(width / src_w, height / src_h)
+        nivel = self._bg_piramide[0] if self._bg_piramide else self._bg_pil
+        for candidato in reversed(self._bg_piramide):
+            if candidato.size[0] >= src_w * scale and candidato.size[1] >= src_h * scale:
+                nivel = candidato
+                break
+        lw, lh = nivel.size
+        # Zona del nivel que, escalada, ocupa exactamente width x height (centrada)
+        scale_l = max(width / lw, height / lh)
+        # (acotada: el redondeo puede dar desplazamientos mínimamente negativos)
+        box_w = min(lw, width / scale_l)
+        box_h = min(lh, height / scale_l)
+        left = max(0.0, (lw - box_w) / 2)
+        top = max(0.0, (lh - box_h) / 2)
+        filtro = Image.LANCZOS if calidad else Image.NEAREST
+        return nivel.resize((width, height), filtro, box=(left, top, left + box_w, top + box_h))
 
-    def draw_background(self, canvas, width: Optional[int] = None, height: Optional[int] = None, tag: str = "bg") -> bool:
+    def draw_background(self, canvas, width: Optional[int] = None, height: Optional[int] = None, tag: str = "bg",
+                        calidad: bool = True) -> bool:
         """
         Dibuja la imagen de fondo en el canvas escalada para cubrir el área (cover mode).
+        Los últimos bg_cache_size tamaños dibujados en alta calidad se reutilizan.
         
         Parámetros:
         - canvas: tkinter.Canvas donde dibujar.
         - width/height: tamaño destino. Si es None intenta usar canvas.winfo_width/height().
         - tag: etiqueta para el objeto en el canvas (para manipularlo después).
+        - calidad: False dibuja una vista previa rápida (no se guarda en caché).
         
         Devuelve:
         - True si dibujó correctamente, False en caso contrario.
         """
         # Sin PIL o sin imagen cargada
-        if not _HAS_PIL or self._bg_pil is None:
+        if self._bg_pil is None or not _pil():
             return False
 
         # Determinar tamaño
@@ -121,24 +346,11 @@ class Graficos:
         if width <= 0 or height <= 0:
             return False
 
-        # Escalar imagen para "cover" (llenar y recortar centro)
-        img = self._bg_pil
-        src_w, src_h = img.size
-        scale = max(width / src_w, height / src_h)
-        new_w = max(1, int(src_w * scale))
-        new_h = max(1, int(src_h * scale))
-        resized = img.resize((new_w, new_h), Image.LANCZOS)
-
-        # Recortar al centro
-        left = (new_w - width) // 2
-        top = (new_h - height) // 2
-        cropped = resized.crop((left, top, left + width, top + height))
-
-        # Convertir a PhotoImage para tkinter y guardar referencia
-        try:
-            self._bg_tk = ImageTk.PhotoImage(cropped)
-        except Exception:
+        foto = self._fondo_escalado(canvas, width, height, calidad)
+        if foto is None:
             return False
+        # Guardar referencia a la imagen mostrada
+        self._bg_tk = foto
 
         # Dibujar en canvas
         try:
@@ -153,27 +365,227 @@ class Graficos:
             pass
         return True
 
+    def _fondo_escalado(self, canvas, width: int, height: int, calidad: bool):
+        """PhotoImage del fondo a width x height (de la caché si es de calidad y ya existe)."""
+        clave = (width, height)
+        if calidad:
+            interp = getattr(canvas, "tk", None)
+            if interp is not self._bg_tamanos_tk:
+                self._bg_tamanos.clear()
+                self._bg_tamanos_tk = interp
+            foto = self._bg_tamanos.get(clave)
+            if foto is not None:
+                self._bg_tamanos.move_to_end(clave)
+                return foto
+        try:
+            foto = _imagetk().PhotoImage(self._escalar_fondo(width, height, calidad), master=canvas)
+        except Exception:
+            return None
+        if calidad and self.bg_cache_size > 0:
+            self._bg_tamanos[clave] = foto
+            while len(self._bg_tamanos) > self.bg_cache_size:
+                self._bg_tamanos.popitem(last=False)
+        return foto
+
+    def schedule_background(self, canvas, width: Optional[int] = None, height: Optional[int] = None, tag: str = "bg",
+                            delay_ms: Optional[int] = None) -> bool:
+        """
+        Redibujado del fondo pensado para <Configure>: si el tamaño ya está en caché se
+        dibuja en el acto; si no, se muestra una vista previa rápida y el reescalado de
+        calidad se aplaza hasta que pasen `delay_ms` (por defecto resize_delay_ms) sin
+        nuevos cambios de tamaño.
+        
+        Devuelve:
+        - True si se dibujó algo, False en caso contrario.
+        """
+        if self._bg_pil is None or not _pil():
+            return False
+        try:
+            if width is None:
+                width = int(canvas.winfo_width())
+            if height is None:
+                height = int(canvas.winfo_height())
+        except Exception:
+            return False
+        if width <= 1 or height <= 1:
+            return False
+        self._cancelar_pendiente()
+        if (width, height) in self._bg_tamanos and getattr(canvas, "tk", None) is self._bg_tamanos_tk:
+            return self.draw_background(canvas, width, height, tag=tag)
+        dibujado = self.draw_background(canvas, width, height, tag=tag, calidad=False)
+        retraso = self.resize_delay_ms if delay_ms is None else delay_ms
+        try:
+            id_after = canvas.after(retraso, self._fondo_definitivo, canvas, tag)
+        except Exception:
+            return self.draw_background(canvas, width, height, tag=tag)
+        self._bg_pendiente = (canvas, id_after)
+        return dibujado
+
+    def _fondo_definitivo(self, canvas, tag: str):
+        self._bg_pendiente = None
+        # Tamaño actual (puede haber cambiado desde que se programó)
+        self.draw_background(canvas, tag=tag)
+
+    def _cancelar_pendiente(self):
+        if self._bg_pendiente is not None:
+            canvas, id_after = self._bg_pendiente
+            self._bg_pendiente = None
+            try:
+                canvas.after_cancel(id_after)
+            except Exception:
+                pass
+
     # ================ Avatar drawing ================
+    def _rasgos_avatar(self, seed: Optional[int]) -> Tuple[str, str]:
+        """(color, estilo de boca) del avatar. Con seed se memorizan; sin seed usa self._rng."""
+        if seed is None:
+            return self._rng.choice(self.colors), self._rng.choice(MOUTH_STYLES)
+        clave = (seed, tuple(self.colors))
+        rasgos = self._rasgos.get(clave)
+        if rasgos is not None:
+            self._rasgos.move_to_end(clave)
+            return rasgos
+        try:
+            rnd = random.Random(seed)
+        except Exception:
+            rnd = self._rng
+        rasgos = self._rasgos[clave] = (rnd.choice(self.colors), rnd.choice(MOUTH_STYLES))
+        if len(self._rasgos) > max(self.avatar_cache_size, 1) * 4:
+            self._rasgos.popitem(last=False)
+        return rasgos
+
+    def render_avatar(self, size: int, seed: Optional[int] = None, with_border: Optional[bool] = None):
+        """
+        Rasteriza el avatar con Pillow sobre fondo transparente.
+        
+        Devuelve:
+        - PIL.Image RGBA de size x size, o None si Pillow no está disponible.
+        """
+        body_color, style = self._rasgos_avatar(seed)
+        return self.rasterizar_avatar(body_color, style, size, with_border)
+
+    def rasgos_avatar(self, seed: Optional[int]) -> Tuple[str, str]:
+        """(color, estilo de boca) del avatar de `seed`: dos seeds con los mismos rasgos se dibujan igual."""
+        return self._rasgos_avatar(seed)
+
+    def rasterizar_avatar(self, body_color: str, style: str, size: int, with_border: Optional[bool] = None):
+        """
+        Rasteriza con Pillow un avatar de rasgos dados (ver rasgos_avatar).
+
+        Devuelve:
+        - PIL.Image RGBA de size x size, o None si Pillow no está disponible.
+        """
+        if not _pil():
+            return None
+        border = self.default_with_border if with_border is None else with_border
+        return self._rasterizar_avatar(body_color, style, int(round(size)), border)
+
+    def _rasterizar_avatar(self, body_color: str, style: str, size: int, border: bool):
+        # Misma geometría que el dibujo en canvas, a _SUPERMUESTREO veces el tamaño
+        k = _SUPERMUESTREO
+        s = max(1, size) * k
+        img = Image.new("RGBA", (s, s), (0, 0, 0, 0))
+        d = ImageDraw.Draw(img)
+        c = s / 2
+        d.ellipse((0, 0, s - 1, s - 1), fill=body_color, outline="black" if border else None, width=2 * k if border else 0)
+
+        eye = s * 0.12
+        eye_x_offset = s * 0.2
+        eye_y = c - s * 0.08
+        for ex in (c - eye_x_offset, c + eye_x_offset):
+            d.ellipse((ex - eye/2, eye_y - eye/2, ex + eye/2, eye_y + eye/2), fill="black")
+
+        mouth_w = s * 0.4
+        mouth_h = s * 0.15
+        mouth_y = c + s * 0.18
+        if style == "smile":
+            # Tk mide los ángulos en sentido antihorario y Pillow en horario: 200..340 -> 20..160
+            d.arc((c - mouth_w/2, mouth_y - mouth_h/2, c + mouth_w/2, mouth_y + mouth_h/2), 20, 160, fill="black", width=2 * k)
+        elif style == "surprised":
+            d.ellipse((c - mouth_h/2, mouth_y - mouth_h/2, c + mouth_h/2, mouth_y + mouth_h/2), fill="black")
+        else:
+            d.line((c - mouth_w/2, mouth_y, c + mouth_w/2, mouth_y), fill="black", width=2 * k)
+        return img.resize((max(1, size), max(1, size)), Image.LANCZOS)
+
+    def avatar_image(self, master, size: int, seed: Optional[int] = None, with_border: Optional[bool] = None):
+        """
+        PhotoImage del avatar, rasterizado una sola vez por (color, boca, tamaño, borde)
+        y guardado en una caché LRU de avatar_cache_size entradas.
+        
+        Parámetros:
+        - master: widget de tkinter (define el intérprete Tk dueño de la imagen).
+        
+        Devuelve:
+        - (clave, PhotoImage), o None si no hay Pillow o no se pudo crear la imagen.
+        """
+        if not _pil() or self.avatar_cache_size <= 0:
+            return None
+        body_color, style = self._rasgos_avatar(seed)
+        border = self.default_with_border if with_border is None else with_border
+        return self._avatar_cacheado(master, body_color, style, size, border)
+
+    def clear_avatar_cache(self):
+        """Vacía la caché de avatares rasterizados."""
+        self._avatares.clear()
+        self._rasgos.clear()
+        self._avatares_tk = None
+
     def draw_avatar(self, canvas, x: float, y: float, size: float, seed: Optional[int] = None, with_border: Optional[bool] = None):
         """
         Dibuja un avatar sencillo (círculo cabeza, ojos y boca) centrado en (x,y) sobre el canvas.
+        Con Pillow se usa un único item de imagen cacheado; sin Pillow se dibuja con
+        primitivas del canvas.
         
         Parámetros:
         - canvas: tkinter.Canvas donde dibujar.
         - x, y: coordenadas del centro del avatar.
         - size: diámetro del "rostro".
-        - seed: entero para determinismo en la selección de color/rasgos. Si es None usa aleatorio.
+        - seed: entero para determinismo en la selección de color/rasgos. Si es None usa
+          el generador propio de la instancia.
         - with_border: anula self.default_with_border si no es None.
         """
+        body_color, style = self._rasgos_avatar(seed)
+        border = self.default_with_border if with_border is None else with_border
+
+        if self.avatar_cache_size > 0 and _pil():
+            imagen = self._avatar_cacheado(canvas, body_color, style, size, border)
+            if imagen is not None:
+                clave, foto = imagen
+                canvas.create_image(x, y, image=foto, anchor="center")
+                # El canvas guarda su propia referencia: si la caché expulsa la imagen
+                # mientras sigue visible, Tk no la borra
+                try:
+                    refs = canvas._avatar_refs
+                except AttributeError:
+                    refs = canvas._avatar_refs = {}
+                refs[clave] = foto
+                return
+        self._draw_avatar_canvas(canvas, x, y, size, body_color, style, border)
+
+    def _avatar_cacheado(self, master, body_color: str, style: str, size: float, border: bool):
+        size = int(round(size))
+        clave = (body_color, style, size, border)
+        interp = getattr(master, "tk", None)
+        if interp is not self._avatares_tk:
+            # Las PhotoImage solo valen en el intérprete Tk que las creó
+            self._avatares.clear()
+            self._avatares_tk = interp
+        foto = self._avatares.get(clave)
+        if foto is not None:
+            self._avatares.move_to_end(clave)
+            return clave, foto
         try:
-            rnd = random.Random(seed) if seed is not None else random
+            foto = _imagetk().PhotoImage(self._rasterizar_avatar(body_color, style, size, border), master=master)
         except Exception:
-            rnd = random
+            return None
+        self._avatares[clave] = foto
+        while len(self._avatares) > self.avatar_cache_size:
+            self._avatares.popitem(last=False)
+        return clave, foto
 
-        body_color = rnd.choice(self.colors)
+    def _draw_avatar_canvas(self, canvas, x: float, y: float, size: float, body_color: str, style: str, border: bool):
+        """Dibujo del avatar con primitivas del canvas (sin Pillow)."""
         eye_color = "black"
-        border = self.default_with_border if with_border is None else with_border
-
         r = size / 2
         left = x - r
         top = y - r
@@ -191,7 +603,6 @@ class Graficos:
         mouth_w = size * 0.4
         mouth_h = size * 0.15
         mouth_y = y + size * 0.18
-        style = rnd.choice(["smile", "line", "surprised"])
         if style == "smile":
             canvas.create_arc(x - mouth_w/2, mouth_y - mouth_h/2, x + mouth_w/2, mouth_y + mouth_h/2, start=200, extent=140, style="arc", width=2)
         elif style == "surprised":
@@ -221,24 +632,39 @@ class Graficos:
 
 
 # ================ Instancia por defecto (compatibilidad) ================
-_default_graficos = Graficos()
+# Se crea en la primera llamada a las funciones de conveniencia
+_default_graficos: Optional[Graficos] = None
+
+def _por_defecto() -> Graficos:
+    global _default_graficos
+    if _default_graficos is None:
+        _default_graficos = Graficos()
+    return _default_graficos
 
 def draw_avatar(canvas, x, y, size, seed=None, with_border=None):
     """Función de conveniencia que delega en la instancia por defecto."""
-    return _default_graficos.draw_avatar(canvas, x, y, size, seed=seed, with_border=with_border)
+    return _por_defecto().draw_avatar(canvas, x, y, size, seed=seed, with_border=with_border)
 
 def make_avatar_canvas(parent, size, seed=None):
     """Función de conveniencia que delega en la instancia por defecto."""
-    return _default_graficos.make_avatar_canvas(parent, size, seed=seed)
+    return _por_defecto().make_avatar_canvas(parent, size, seed=seed)
 
 def set_background(path: str) -> bool:
     """Conveniencia: carga background en la instancia por defecto."""
-    return _default_graficos.set_background(path)
+    return _por_defecto().set_background(path)
+
+def load_background_async(path: str, canvas, tag: str = "bg", on_done=None) -> bool:
+    """Conveniencia: carga asíncrona del background en la instancia por defecto."""
+    return _por_defecto().load_background_async(path, canvas, tag=tag, on_done=on_done)
 
 def draw_background(canvas, width: Optional[int] = None, height: Optional[int] = None, tag: str = "bg") -> bool:
     """Conveniencia: dibuja background en la instancia por defecto."""
-    return _default_graficos.draw_background(canvas, width=width, height=height, tag=tag)
+    return _por_defecto().draw_background(canvas, width=width, height=height, tag=tag)
+
+def schedule_background(canvas, width: Optional[int] = None, height: Optional[int] = None, tag: str = "bg") -> bool:
+    """Conveniencia: redibujado agrupado del background de la instancia por defecto."""
+    return _por_defecto().schedule_background(canvas, width=width, height=height, tag=tag)
 
 def clear_background():
     """Conveniencia: elimina background de la instancia por defecto."""
-    return _default_graficos.clear_background()
\ No newline at end of file
+    return _por_defecto().clear_background()
\ No newline at end of file
@@ -0,0 +1,348 @@
+# lote.py
+# Motor por lotes: N partidas del mismo tamaño guardadas como arrays de NumPy
+# (estructura de arrays) para bots, simulación y previsualizaciones de emparejamiento.
+# Sigue las mismas reglas que Partida.vote / eject / check_win; verificar_equivalencia()
+# lo comprueba contra la clase escalar.
+#
+# Uso:
+#   python lote.py                 # comprobación de equivalencia y comparación de velocidad
+
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from coincidencia import COINCIDENCIA_POR_DEFECTO
+from partida import Partida, _limpiar_palabras
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+# Códigos de ganador (los mismos que usa la bitácora)
+NINGUNO, IMPOSTORES, TRIPULANTES = 0, 1, 2
+_GANADORES = {None: NINGUNO, "impostores": IMPOSTORES, "tripulantes": TRIPULANTES}
+_GANADORES_INV = {v: k for k, v in _GANADORES.items()}
+
+
+class PartidaBatch:
+    """
+    N partidas de num_players jugadores como arrays:
+
+    - alive: (N, P) bool
+    - impostor: (N, P) bool (rol inicial; como en Partida, no cambia al morir)
+    - word: (N,) índice en self.words
+    - over: (N,) bool, winner: (N,) int8 (NINGUNO / IMPOSTORES / TRIPULANTES)
+    - impostores_vivos / tripulantes_vivos: (N,) contadores incrementales
+
+    Los identificadores de jugador van de 0 a P-1; -1 significa "ninguno"
+    (abstención en vote_many, sin expulsión en eject_many).
+    """
+    def __init__(self,
+                 num_games: int,
+                 num_players: int,
+                 num_impostors: int = 1,
+                 words: Optional[Sequence[str]] = None,
+                 seed: Optional[int] = None):
+        if not _HAS_NUMPY:
+            raise RuntimeError("NumPy no está disponible.")
+        if num_players < 3:
+            raise ValueError("Se recomienda al menos 3 jugadores.")
+        if num_impostors < 1:
+            raise ValueError("Debe haber al menos 1 impostor.")
+        if num_impostors >= num_players - num_impostors:
+            raise ValueError("El número de impostores no puede ser igual o mayor que el número de tripulantes.")
+        self.num_games = int(num_games)
+        self.num_players = int(num_players)
+        self.num_impostors = int(num_impostors)
+        self.words = _limpiar_palabras(words)
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+
+        # Sorteo de roles de todas las partidas a la vez: los K menores de una fila aleatoria
+        claves = rng.random((self.num_games, self.num_players))
+        elegidos = np.argpartition(claves, self.num_impostors - 1, axis=1)[:, :self.num_impostors]
+        self.impostor = np.zeros((self.num_games, self.num_players), dtype=bool)
+        np.put_along_axis(self.impostor, elegidos, True, axis=1)
+        self.word = rng.integers(0, len(self.words), size=self.num_games, dtype=np.int64)
+
+        self.alive = np.ones((self.num_games, self.num_players), dtype=bool)
+        self.impostores_vivos = np.full(self.num_games, self.num_impostors, dtype=np.int32)
+        self.tripulantes_vivos = np.full(self.num_games, self.num_players - self.num_impostors, dtype=np.int32)
+        self.over = np.zeros(self.num_games, dtype=bool)
+        self.winner = np.zeros(self.num_games, dtype=np.int8)
+        # Datos que no intervienen en las reglas, solo para volver a Partida
+        self._extra: List[Optional[Dict[str, Any]]] = [None] * self.num_games
+
+    def __len__(self) -> int:
+        return self.num_games
+
+    # ================ Reglas ================
+    def _validar_ids(self, ids, nombre: str):
+        if ids.size and (ids.min() < -1 or ids.max() >= self.num_players):
+            raise ValueError(f"{nombre}: los ids deben estar entre -1 y {self.num_players - 1}.")
+
+    def vote_many(self, votes, perform_eject: bool = False) -> Dict[str, Any]:
+        """
+        votes: (N, V) ids votados (-1 = abstención); normalmente V = num_players y
+        votes[g, votante] es el voto de ese jugador en la partida g.
+        Igual que Partida.vote: gana el único más votado; empate o sin votos -> -1.
+        Devuelve arrays: elected (N,), is_impostor (N,), counts (N, P) y, con
+        perform_eject, eject_info (el resultado de eject_many).
+        """
+        votes = np.asarray(votes)
+        if votes.ndim != 2 or votes.shape[0] != self.num_games:
+            raise ValueError(f"votes debe tener forma ({self.num_games}, V).")
+        self._validar_ids(votes, "votes")
+        n, p = self.num_games, self.num_players
+        validos = votes >= 0
+        # Recuento de todas las partidas con un único bincount desplazando cada fila
+        planos = (votes + (np.arange(n) * p)[:, None])[validos]
+        counts = np.bincount(planos, minlength=n * p).reshape(n, p)
+        maximo = counts.max(axis=1)
+        en_maximo = (counts == maximo[:, None]).sum(axis=1)
+        elected = np.where((maximo > 0) & (en_maximo == 1), counts.argmax(axis=1), -1)
+
+        filas = np.arange(n)
+        hay = elected >= 0
+        col = np.where(hay, elected, 0)
+        is_impostor = hay & self.impostor[filas, col] & self.alive[filas, col]
+        resultado = {"elected": elected, "is_impostor": is_impostor, "counts": counts, "eject_info": None}
+        if perform_eject:
+            resultado["eject_info"] = self.eject_many(elected)
+        return resultado
+
+    def eject_many(self, player_ids) -> Dict[str, Any]:
+        """
+        Expulsa player_ids[g] en cada partida g (-1 = ninguna). Igual que
+        Partida.eject: expulsar a un muerto no hace nada; si no, actualiza los
+        contadores y comprueba victoria. Devuelve arrays was_alive, was_impostor,
+        game_over y winner.
+        """
+        ids = np.asarray(player_ids)
+        if ids.shape != (self.num_games,):
+            raise ValueError(f"player_ids debe tener forma ({self.num_games},).")
+        self._validar_ids(ids, "player_ids")
+        filas = np.arange(self.num_games)
+        hay = ids >= 0
+        col = np.where(hay, ids, 0)
+        was_alive = hay & self.alive[filas, col]
+        era_impostor = self.impostor[filas, col]
+        was_impostor = was_alive & era_impostor
+
+        g = filas[was_alive]
+        self.alive[g, col[was_alive]] = False
+        self.impostores_vivos -= was_impostor
+        self.tripulantes_vivos -= was_alive & ~era_impostor
+
+        self.check_win_many(was_alive)
+        return {
+            "player_id": ids,
+            "was_alive": was_alive,
+            "was_impostor": was_impostor,
+            # Como en Partida.eject: solo se informa del fin si hubo expulsión
+            "game_over": was_alive & self.over,
+            "winner": np.where(was_alive, self.winner, NINGUNO).astype(np.int8),
+        }
+
+    def check_win_many(self, mascara=None) -> Dict[str, Any]:
+        """
+        Comprueba victoria en las partidas de `mascara` (todas si es None) que no
+        hayan terminado: sin impostores ganan tripulantes; impostores >= tripulantes
+        ganan impostores. Devuelve arrays over y winner (estado tras comprobar).
+        """
+        pendientes = ~self.over if mascara is None else (np.asarray(mascara, dtype=bool) & ~self.over)
+        gana_trip = pendientes & (self.impostores_vivos == 0)
+        gana_imp = pendientes & ~gana_trip & (self.impostores_vivos >= self.tripulantes_vivos)
+        self.winner[gana_trip] = TRIPULANTES
+        self.winner[gana_imp] = IMPOSTORES
+        self.over |= gana_trip | gana_imp
+        return {"over": self.over.copy(), "winner": self.winner.copy()}
+
+    def activas(self):
+        """Índices de las partidas que no han terminado."""
+        return np.flatnonzero(~self.over)
+
+    def votos_aleatorios(self, rng=None, abstencion: float = 0.0):
+        """
+        Votos (N, P) en los que cada jugador vivo vota a un jugador vivo al azar
+        (se puede votar a sí mismo, como en la interfaz); muertos y abstenciones -1.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        # Vivos primero en cada fila; elegir una posición < número de vivos
+        orden = np.argsort(~self.alive, axis=1, kind="stable")
+        vivos = self.alive.sum(axis=1)
+        pos = (rng.random((self.num_games, self.num_players)) * vivos[:, None]).astype(np.int64)
+        pos = np.minimum(pos, np.maximum(vivos - 1, 0)[:, None])
+        votos = np.take_along_axis(orden, pos, axis=1)
+        vota = self.alive.copy()
+        if abstencion > 0:
+            vota &= rng.random(vota.shape) >= abstencion
+        return np.where(vota, votos, -1)
+
+    def ganadores(self) -> List[Optional[str]]:
+        return [_GANADORES_INV[int(w)] for w in self.winner]
+
+    # ================ Conversión ================
+    def to_partida(self, g: int) -> Partida:
+        """Partida equivalente al juego g del lote."""
+        extra = self._extra[g] or {}
+        words = self.words
+        datos = {
+            "num_players": self.num_players,
+            "num_impostors": self.num_impostors,
+            "player_names": extra.get("player_names"),
+            "word": self.words[int(self.word[g])],
+            "seed": extra.get("seed"),
+            "impostors": np.flatnonzero(self.impostor[g]).tolist(),
+            "alive": self.alive[g].astype(np.uint8).tobytes().hex(),
+            "over": bool(self.over[g]),
+            "winner": _GANADORES_INV[int(self.winner[g])],
+            "coincidencia": extra.get("coincidencia"),
+        }
+        return Partida.from_dict(datos, words=words)
+
+    def to_partidas(self) -> List[Partida]:
+        return [self.to_partida(g) for g in range(self.num_games)]
+
+    @classmethod
+    def from_partidas(cls, partidas: Sequence[Partida]) -> "PartidaBatch":
+        """
+        Lote a partir de partidas con el mismo número de jugadores e impostores
+        iniciales. Las palabras se toman de la primera partida (las palabras
+        secretas que no estén en su lista se añaden al final).
+        """
+        if not _HAS_NUMPY:
+            raise RuntimeError("NumPy no está disponible.")
+        if not partidas:
+            raise ValueError("Se necesita al menos una partida.")
+        p0 = partidas[0]
+        if any(p.num_players != p0.num_players or p.num_impostors != p0.num_impostors for p in partidas):
+            raise ValueError("Todas las partidas del lote deben tener los mismos jugadores e impostores.")
+        lote = cls.__new__(cls)
+        lote.num_games = len(partidas)
+        lote.num_players = p0.num_players
+        lote.num_impostors = p0.num_impostors
+        lote.seed = None
+        words = p0.words
+        indice = {w: i for i, w in enumerate(words)}
+        nuevas = []
+        idx = []
+        for p in partidas:
+            i = indice.get(p.word)
+            if i is None:
+                i = indice[p.word] = len(words) + len(nuevas)
+                nuevas.append(p.word)
+            idx.append(i)
+        lote.words = list(words) + nuevas if nuevas else words
+        lote.word = np.array(idx, dtype=np.int64)
+        n, tam = lote.num_games, lote.num_players
+        lote.alive = np.frombuffer(b"".join(bytes(p.alive) for p in partidas), dtype=np.uint8).reshape(n, tam).astype(bool)
+        lote.impostor = np.frombuffer(b"".join(bytes(p._roles) for p in partidas), dtype=np.uint8).reshape(n, tam).astype(bool)
+        lote.impostores_vivos = (lote.alive & lote.impostor).sum(axis=1).astype(np.int32)
+        lote.tripulantes_vivos = (lote.alive & ~lote.impostor).sum(axis=1).astype(np.int32)
+        lote.over = np.array([p.over for p in partidas], dtype=bool)
+        lote.winner = np.array([_GANADORES[p.winner] for p in partidas], dtype=np.int8)
+        lote._extra = [{"player_names": p._names, "seed": p.seed,
+                        "coincidencia": None if p.coincidencia is COINCIDENCIA_POR_DEFECTO
+                        else p.coincidencia.como_dict()} for p in partidas]
+        return lote
+
+
+def _comprobar(condicion: bool, que: str):
+    if not condicion:
+        raise AssertionError(f"El lote no coincide con Partida: {que}")
+
+
+def verificar_equivalencia(juegos: int = 300, seed: int = 0, abstencion: float = 0.2) -> bool:
+    """
+    Juega `juegos` partidas en un PartidaBatch y, en paralelo, las mismas partidas
+    como objetos Partida (obtenidos con to_partidas), aplicando los mismos votos
+    con expulsión en cada ronda. Comprueba elegido, expulsión, vivos, fin y
+    ganador ronda a ronda, y la ida y vuelta from_partidas/to_partidas.
+    Lanza AssertionError si hay alguna diferencia (también con python -O);
+    devuelve True si no.
+    """
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed)
+    for num_players in (3, 5, 8, 13):
+        num_impostors = py_rng.randint(1, (num_players - 1) // 2)
+        lote = PartidaBatch(juegos, num_players, num_impostors, seed=int(rng.integers(1 << 31)))
+        escalares = lote.to_partidas()
+        for _ in range(num_players + 2):
+            votos = lote.votos_aleatorios(rng, abstencion)
+            # Algunos votos a jugadores muertos y expulsiones directas, que también cuentan
+            if py_rng.random() < 0.3:
+                votos[:, 0] = rng.integers(0, num_players, size=juegos)
+            res = lote.vote_many(votos, perform_eject=True)
+            for g, p in enumerate(escalares):
+                dict_votos = {v: int(d) for v, d in enumerate(votos[g]) if d >= 0}
+                r = p.vote(dict_votos, perform_eject=True)
+                elegido = -1 if r["elected"] is None else r["elected"]
+                _comprobar(elegido == res["elected"][g], f"elegido en la partida {g}")
+                _comprobar(r["is_impostor"] == bool(res["is_impostor"][g]), f"is_impostor en la partida {g}")
+                _comprobar(dict(r["counts"]) == {i: int(c) for i, c in enumerate(res["counts"][g]) if c},
+                           f"recuento en la partida {g}")
+                if r["eject_info"] is not None:
+                    e, eb = r["eject_info"], res["eject_info"]
+                    _comprobar(e["was_alive"] == bool(eb["was_alive"][g]), f"was_alive en la partida {g}")
+                    _comprobar(e["was_impostor"] == bool(eb["was_impostor"][g]), f"was_impostor en la partida {g}")
+                    _comprobar(e["game_over"] == bool(eb["game_over"][g]), f"game_over en la partida {g}")
+                    _comprobar(e["winner"] == _GANADORES_INV[int(eb["winner"][g])], f"ganador de la expulsión en la partida {g}")
+                _comprobar(bytes(p.alive) == lote.alive[g].astype(np.uint8).tobytes(), f"vivos en la partida {g}")
+                _comprobar(p.over == bool(lote.over[g]) and p.winner == _GANADORES_INV[int(lote.winner[g])],
+                           f"fin o ganador en la partida {g}")
+            # Expulsión directa de un jugador al azar en algunas partidas
+            ids = np.where(rng.random(juegos) < 0.3, rng.integers(0, num_players, size=juegos), -1)
+            eb = lote.eject_many(ids)
+            for g, p in enumerate(escalares):
+                if ids[g] >= 0:
+                    e = p.eject(int(ids[g]))
+                    _comprobar(e["game_over"] == bool(eb["game_over"][g]), f"game_over (eject) en la partida {g}")
+                    _comprobar(e["was_impostor"] == bool(eb["was_impostor"][g]), f"was_impostor (eject) en la partida {g}")
+        vuelta = PartidaBatch.from_partidas(escalares)
+        for campo in ("alive", "impostor", "over", "winner", "impostores_vivos", "tripulantes_vivos"):
+            _comprobar(np.array_equal(getattr(vuelta, campo), getattr(lote, campo)), f"{campo} tras from_partidas")
+        _comprobar([p.to_dict() for p in vuelta.to_partidas()] == [p.to_dict() for p in escalares],
+                   "ida y vuelta from_partidas/to_partidas")
+    return True
+
+
+def _comparar_velocidad(juegos: int = 10000, num_players: int = 10, seed: int = 0):
+    """Partidas completas (votación con expulsión hasta el final) por lote y una a una."""
+    rng = np.random.default_rng(seed)
+    lote = PartidaBatch(juegos, num_players, 2, seed=seed)
+    escalares = lote.to_partidas()
+    t0 = time.perf_counter()
+    while not lote.over.all():
+        votos = lote.votos_aleatorios(rng)
+        votos[lote.over] = -1
+        lote.vote_many(votos, perform_eject=True)
+    t_lote = time.perf_counter() - t0
+
+    py_rng = random.Random(seed)
+    t0 = time.perf_counter()
+    for p in escalares:
+        while not p.over:
+            vivos = [i for i in range(num_players) if p.alive[i]]
+            p.vote({v: py_rng.choice(vivos) for v in vivos}, perform_eject=True)
+    t_escalar = time.perf_counter() - t0
+    print(f"{juegos} partidas de {num_players} jugadores: lote {t_lote * 1e3:.0f} ms | "
+          f"Partida {t_escalar * 1e3:.0f} ms (x{t_escalar / t_lote:.1f})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if not _HAS_NUMPY:
+        print("NumPy no está disponible.", file=sys.stderr)
+        return 1
+    verificar_equivalencia()
+    print("Equivalencia con Partida: ok")
+    _comparar_velocidad()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
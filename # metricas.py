@@ -0,0 +1,294 @@
+# metricas.py
+# Instrumentación opcional: contadores e histogramas de latencia por operación de
+# Partida y Graficos, exportables en formato de texto de Prometheus.
+#
+# activar() sustituye los métodos de las clases por versiones cronometradas y
+# desactivar() restaura los originales: con la instrumentación apagada no queda
+# ningún envoltorio, así que el coste es cero.
+#
+# Uso:
+#   import metricas
+#   metricas.activar()
+#   ...
+#   metricas.escribir_prometheus("/var/lib/node_exporter/impostor.prom")
+#   servidor = metricas.servir_http(9464)        # GET /metrics
+#   with metricas.perfilar("ronda.prof") as perfil:
+#       ...                                       # una ronda de juego
+#   print(perfil.texto())
+
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Límites superiores (segundos) de los cubos de latencia
+CUBOS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+         1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+# Operaciones instrumentadas: módulo -> clase -> métodos
+OPERACIONES = {
+    "partida": {"Partida": ("__init__", "guess", "vote", "eject", "check_win"),
+                # Sus eject/check_win sustituyen a los de Partida (no llaman a super())
+                "PartidaConcurrente": ("eject", "check_win")},
+    "graficos": {"Graficos": ("draw_avatar", "draw_background", "render_avatar", "set_background")},
+}
+
+
+class Histograma:
+    """Histograma de latencias con cubos fijos (no acumulados), suma, cuenta y errores."""
+    __slots__ = ("cubos", "cuentas", "suma", "cuenta", "errores", "_lock")
+
+    def __init__(self, cubos: Tuple[float, ...] = CUBOS):
+        self.cubos = cubos
+        self.cuentas = [0] * (len(cubos) + 1)   # el último es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+        self.errores = 0
+        self._lock = threading.Lock()
+
+    def observar(self, segundos: float):
+        i = bisect.bisect_left(self.cubos, segundos)
+        with self._lock:
+            self.cuentas[i] += 1
+            self.suma += segundos
+            self.cuenta += 1
+
+    def error(self):
+        with self._lock:
+            self.errores += 1
+
+    def percentil(self, p: float) -> float:
+        """Límite superior del cubo que contiene el percentil p (0..1); inf si cae en +Inf."""
+        if not self.cuenta:
+            return 0.0
+        objetivo = p * self.cuenta
+        acumulado = 0
+        for limite, c in zip(self.cubos + (float("inf"),), self.cuentas):
+            acumulado += c
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+
+class Metricas:
+    """Registro de histogramas por nombre de operación (p. ej. "Partida.guess")."""
+    def __init__(self, cubos: Tuple[float, ...] = CUBOS):
+        self.cubos = cubos
+        self.histogramas: Dict[str, Histograma] = {}
+        self._lock = threading.Lock()
+
+    def histograma(self, nombre: str) -> Histograma:
+        h = self.histogramas.get(nombre)
+        if h is None:
+            with self._lock:
+                h = self.histogramas.setdefault(nombre, Histograma(self.cubos))
+        return h
+
+    def reiniciar(self):
+        with self._lock:
+            self.histogramas = {}
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """Por operación: llamadas, errores, media y p50/p99 (aproximados por cubo) en segundos."""
+        return {nombre: {"llamadas": h.cuenta, "errores": h.errores,
+                         "media": h.suma / h.cuenta if h.cuenta else 0.0,
+                         "p50": h.percentil(0.5), "p99": h.percentil(0.99)}
+                for nombre, h in sorted(self.histogramas.items())}
+
+    def prometheus(self, prefijo: str = "impostor") -> str:
+        """Instantánea en formato de texto de Prometheus (versión 0.0.4)."""
+        lineas = [f"# HELP {prefijo}_operacion_segundos Latencia de las operaciones instrumentadas.",
+                  f"# TYPE {prefijo}_operacion_segundos histogram"]
+        errores = [f"# HELP {prefijo}_operacion_errores_total Operaciones que terminaron con excepción.",
+                   f"# TYPE {prefijo}_operacion_errores_total counter"]
+        for nombre, h in sorted(self.histogramas.items()):
+            with h._lock:
+                cuentas, suma, cuenta, fallos = list(h.cuentas), h.suma, h.cuenta, h.errores
+            etiqueta = f'operacion="{nombre}"'
+            acumulado = 0
+            for limite, c in zip(h.cubos, cuentas):
+                acumulado += c
+                lineas.append(f'{prefijo}_operacion_segundos_bucket{{{etiqueta},le="{limite:g}"}} {acumulado}')
+            lineas.append(f'{prefijo}_operacion_segundos_bucket{{{etiqueta},le="+Inf"}} {cuenta}')
+            lineas.append(f"{prefijo}_operacion_segundos_sum{{{etiqueta}}} {suma!r}")
+            lineas.append(f"{prefijo}_operacion_segundos_count{{{etiqueta}}} {cuenta}")
+            errores.append(f"{prefijo}_operacion_errores_total{{{etiqueta}}} {fallos}")
+        return "\n".join(lineas + errores) + "\n"
+
+
+REGISTRO = Metricas()
+
+# (clase, atributo, original) de los métodos sustituidos por activar()
+_parcheados: List[Tuple[type, str, object]] = []
+
+
+def _cronometrado(nombre: str, func, registro: Metricas):
+    hist = registro.histograma(nombre)
+    reloj = time.perf_counter
+
+    @functools.wraps(func)
+    def envoltorio(*args, **kwargs):
+        t0 = reloj()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            hist.error()
+            raise
+        finally:
+            hist.observar(reloj() - t0)
+    return envoltorio
+
+
+def activar(registro: Optional[Metricas] = None, operaciones: Optional[Dict[str, Dict[str, Tuple[str, ...]]]] = None):
+    """
+    Instrumenta las operaciones (por defecto OPERACIONES) sustituyendo los métodos
+    de las clases. Los módulos que no se puedan importar se omiten. Llamarla de
+    nuevo sin desactivar no hace nada.
+    """
+    if _parcheados:
+        return
+    registro = REGISTRO if registro is None else registro
+    for nombre_modulo, clases in (OPERACIONES if operaciones is None else operaciones).items():
+        try:
+            modulo = __import__(nombre_modulo)
+        except Exception:
+            continue
+        for nombre_clase, metodos in clases.items():
+            cls = getattr(modulo, nombre_clase)
+            for metodo in metodos:
+                original = cls.__dict__.get(metodo)
+                if original is None:
+                    continue
+                _parcheados.append((cls, metodo, original))
+                setattr(cls, metodo, _cronometrado(f"{nombre_clase}.{metodo}", original, registro))
+
+
+def desactivar():
+    """Restaura los métodos originales."""
+    while _parcheados:
+        cls, metodo, original = _parcheados.pop()
+        setattr(cls, metodo, original)
+
+
+def activa() -> bool:
+    return bool(_parcheados)
+
+
+def escribir_prometheus(ruta: str, registro: Optional[Metricas] = None):
+    """Escribe la instantánea en `ruta` de forma atómica (p. ej. para el textfile collector)."""
+    texto = (REGISTRO if registro is None else registro).prometheus()
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(tmp, ruta)
+
+
+def servir_http(puerto: int = 9464, host: str = "127.0.0.1", registro: Optional[Metricas] = None) -> ThreadingHTTPServer:
+    """
+    Sirve GET /metrics en un hilo en segundo plano. Devuelve el servidor
+    (servidor.shutdown() para pararlo; puerto=0 elige uno libre).
+    """
+    registro = REGISTRO if registro is None else registro
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            cuerpo = registro.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return servidor
+
+
+class perfilar:
+    """
+    Context manager que captura un perfil de cProfile del bloque (p. ej. una ronda).
+
+        with perfilar("ronda.prof") as perfil:
+            partida.vote(votos, perform_eject=True)
+        print(perfil.texto(15))
+    """
+    def __init__(self, ruta: Optional[str] = None, orden: str = "cumulative"):
+        self.ruta = ruta
+        self.orden = orden
+        self.perfil = cProfile.Profile()
+
+    def __enter__(self) -> "perfilar":
+        self.perfil.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.perfil.disable()
+        if self.ruta:
+            self.perfil.dump_stats(self.ruta)
+        return False
+
+    def texto(self, lineas: int = 20) -> str:
+        salida = io.StringIO()
+        pstats.Stats(self.perfil, stream=salida).sort_stats(self.orden).print_stats(lineas)
+        return salida.getvalue()
+
+
+def _demo(partidas: int = 200, seed: int = 0):
+    """Juega partidas aleatorias con la instrumentación activa (para probar la exportación)."""
+    from partida import Partida
+
+    rng = random.Random(seed)
+    for _ in range(partidas):
+        p = Partida(num_players=rng.randint(5, 20), num_impostors=rng.randint(1, 2), seed=rng.getrandbits(32))
+        while not p.is_over():
+            vivos = [i for i in range(p.num_players) if p.alive[i]]
+            if rng.random() < 0.2:
+                p.guess(rng.choice(vivos), rng.choice(("python", "manzana", "avion")))
+            else:
+                p.vote({v: rng.choice(vivos) for v in vivos}, perform_eject=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Métricas de El Impostor sobre partidas de prueba")
+    parser.add_argument("--partidas", type=int, default=200)
+    parser.add_argument("--salida", help="fichero .prom donde escribir la instantánea (por defecto, stdout)")
+    parser.add_argument("--perfil", action="store_true", help="mostrar también el perfil de cProfile")
+    args = parser.parse_args(argv)
+
+    activar()
+    try:
+        with perfilar() as perfil:
+            _demo(args.partidas)
+    finally:
+        desactivar()
+    if args.salida:
+        escribir_prometheus(args.salida)
+    else:
+        sys.stdout.write(REGISTRO.prometheus())
+    for nombre, fila in REGISTRO.resumen().items():
+        print(f"# {nombre:<22} {fila['llamadas']:>7} llamadas | media {fila['media'] * 1e6:>8.2f} us | "
+              f"p99 <= {fila['p99'] * 1e6:g} us", file=sys.stderr)
+    if args.perfil:
+        print(perfil.texto(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# paralelo.py
+# Simulación Monte Carlo repartida en un ProcessPoolExecutor con semillas deterministas.
+# Uso: python paralelo.py --procesos 32 --semilla 1 --partidas 10000000 [opciones de simulacion.py]
+
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from simulacion import Resultados, Simulador, config_desde_args, crear_parser
+
+
+def derivar_semilla(semilla_maestra: int, indice_lote: int) -> int:
+    """
+    Semilla de 64 bits para el lote `indice_lote`, derivada de la semilla maestra.
+    Depende solo de ambos números, no del proceso que ejecute el lote.
+    """
+    h = hashlib.blake2b(f"{semilla_maestra}:{indice_lote}".encode(), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+
+def _ejecutar_lote(config: Dict[str, object], semilla: int, indice_lote: int, partidas: int):
+    """
+    Tarea de un proceso trabajador: simula un lote con su propia semilla.
+    Devuelve (indice_lote, pid, segundos, Resultados).
+    """
+    t0 = time.perf_counter()
+    res = Simulador(seed=semilla, **config).simular_lote(partidas)
+    return indice_lote, os.getpid(), time.perf_counter() - t0, res
+
+
+class EstadisticasTrabajador:
+    """Partidas y tiempo acumulados por un proceso trabajador."""
+    __slots__ = ("pid", "lotes", "partidas", "segundos")
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.lotes = 0
+        self.partidas = 0
+        self.segundos = 0.0
+
+    def partidas_por_segundo(self) -> float:
+        return self.partidas / self.segundos if self.segundos else 0.0
+
+    def __str__(self) -> str:
+        return (f"pid {self.pid}: {self.lotes} lotes, {self.partidas} partidas, "
+                f"{self.partidas_por_segundo():.0f} partidas/s")
+
+
+class SimulacionParalela:
+    """
+    Reparte lotes de partidas entre procesos. El lote i usa la semilla
+    derivar_semilla(semilla, i), y los resultados se fusionan en orden de lote:
+    para una misma semilla maestra el resultado es idéntico bit a bit sea cual
+    sea el número de procesos o el orden en que terminen los lotes.
+    """
+    def __init__(self, config: Dict[str, object], semilla: int = 0,
+                 procesos: Optional[int] = None, lote: int = 5000):
+        self.config = config
+        self.semilla = semilla
+        self.procesos = procesos or os.cpu_count() or 1
+        self.lote = lote
+        self.trabajadores: Dict[int, EstadisticasTrabajador] = {}
+
+    def _tamanos_lote(self, total: int) -> List[int]:
+        completos, resto = divmod(total, self.lote)
+        return [self.lote] * completos + ([resto] if resto else [])
+
+    def flujo(self, total: int, tolerancia: Optional[float] = None) -> Iterator[Resultados]:
+        """
+        Produce los resultados acumulados cada vez que avanza el prefijo de lotes
+        terminados. Si se alcanza `tolerancia` se cancelan los lotes pendientes.
+        """
+        tamanos = self._tamanos_lote(total)
+        acumulado = Resultados()
+        pendientes_orden: Dict[int, Resultados] = {}
+        siguiente = 0          # siguiente lote a fusionar
+        enviados = 0
+        # Se mantienen unos pocos lotes por proceso en vuelo para poder parar pronto
+        en_vuelo_max = 2 * self.procesos
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            en_vuelo = set()
+            try:
+                while siguiente < len(tamanos):
+                    while enviados < len(tamanos) and len(en_vuelo) < en_vuelo_max:
+                        en_vuelo.add(pool.submit(_ejecutar_lote, self.config,
+                                                 derivar_semilla(self.semilla, enviados),
+                                                 enviados, tamanos[enviados]))
+                        enviados += 1
+                    hechos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    for fut in hechos:
+                        indice, pid, segundos, res = fut.result()
+                        self._anotar(pid, segundos, res.partidas)
+                        pendientes_orden[indice] = res
+                    avanzado = False
+                    while siguiente in pendientes_orden:
+                        acumulado.fusionar(pendientes_orden.pop(siguiente))
+                        siguiente += 1
+                        avanzado = True
+                    if avanzado:
+                        yield acumulado
+                        if tolerancia is not None and acumulado.precision_alcanzada(tolerancia):
+                            return
+            finally:
+                for fut in en_vuelo:
+                    fut.cancel()
+
+    def ejecutar(self, total: int, tolerancia: Optional[float] = None) -> Resultados:
+        """Ejecuta la simulación completa y devuelve el resultado final."""
+        res = Resultados()
+        for res in self.flujo(total, tolerancia):
+            pass
+        return res
+
+    def _anotar(self, pid: int, segundos: float, partidas: int):
+        est = self.trabajadores.get(pid)
+        if est is None:
+            est = self.trabajadores[pid] = EstadisticasTrabajador(pid)
+        est.lotes += 1
+        est.partidas += partidas
+        est.segundos += segundos
+
+    def informe_trabajadores(self) -> List[Tuple[int, float]]:
+        """Lista (pid, partidas/s) ordenada de más lento a más rápido (rezagados primero)."""
+        return sorted(((pid, est.partidas_por_segundo()) for pid, est in self.trabajadores.items()),
+                      key=lambda x: x[1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = crear_parser()
+    ap.description = "Simulación Monte Carlo paralela de partidas de El Impostor."
+    ap.add_argument("--procesos", type=int, default=None, help="por defecto os.cpu_count()")
+    args = ap.parse_args(argv)
+    sim = SimulacionParalela(config_desde_args(args), semilla=args.semilla or 0,
+                             procesos=args.procesos, lote=args.lote)
+    t0 = time.perf_counter()
+    res = Resultados()
+    try:
+        for res in sim.flujo(args.partidas, args.tolerancia):
+            print(res, flush=True)
+    except KeyboardInterrupt:
+        pass
+    segundos = time.perf_counter() - t0
+    print(f"\nTotal: {res.partidas} partidas en {segundos:.2f} s "
+          f"({res.partidas / segundos if segundos else 0:.0f} partidas/s)")
+    for pid in sorted(sim.trabajadores):
+        print(f" - {sim.trabajadores[pid]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,111 +2,115 @@
 # Lógica y datos de la partida con control de eliminaciones y condiciones de victoria
 
 import random
-from typing import List, Optional, Dict, Any
+import sys
+import threading
+from collections.abc import Sequence
+from typing import Callable, List, Optional, Dict, Any, Tuple
+
+from coincidencia import Coincidencia, COINCIDENCIA_POR_DEFECTO
 
 DEFAULT_WORDS = ["python", "manzana", "guitarra", "estrella", "avion"]
 
+
+class _VistaJugadores:
+    """
+    Vista de compatibilidad sobre Partida.players: construye el dict de cada
+    jugador bajo demanda en lugar de mantener uno por jugador en memoria.
+    """
+    __slots__ = ("_partida",)
+
+    def __init__(self, partida: "Partida"):
+        self._partida = partida
+
+    def __len__(self) -> int:
+        return self._partida.num_players
+
+    def __getitem__(self, player_id: int) -> Dict[str, Any]:
+        p = self._partida
+        player_id = range(p.num_players)[player_id]
+        return {
+            "id": player_id,
+            "name": p.get_player_name(player_id),
+            "role": p.get_player_role(player_id),
+            "word": p.get_player_word(player_id)
+        }
+
+    def __iter__(self):
+        for i in range(self._partida.num_players):
+            yield self[i]
+
+
 class Partida:
     """
     Clase que contiene el estado de la partida:
     - num_players: número de jugadores
     - player_names: lista de nombres de jugadores
     - num_impostors: número inicial de impostores
-    - impostors: set con índices de impostores vivos
+    - impostors: set con índices de impostores vivos (calculado)
     - word: palabra seleccionada para la partida (los tripulantes la conocen)
-    - players: lista de dicts con 'id', 'name', 'role' (estado dinámico) y 'word' (None para impostor)
-    - alive: lista booleana por jugador
+    - words: lista de palabras candidatas (compartida por referencia, no se copia)
+    - players: vista con dicts 'id', 'name', 'role' (estado dinámico) y 'word' (None para impostor)
+    - alive: bytearray con 1 (vivo) / 0 (eliminado) por jugador
     - over: boolean indicando si la partida terminó
     - winner: "impostores" | "tripulantes" | None
-    """
-    def __init__(self,
-                 num_players: Optional[int] = None,
-                 words: Optional[List[str]] = None,
-                 player_names: Optional[List[str]] = None,
-                 num_impostors: Optional[int] = None):
-        # Determinar número de jugadores y nombres
-        if player_names:
-            self.num_players = len(player_names)
-            self.player_names = [name.strip() or f"Jugador {i}" for i, name in enumerate(player_names)]
-        elif num_players:
-            if num_players < 3:
-                raise ValueError("Se recomienda al menos 3 jugadores.")
-            self.num_players = int(num_players)
-            self.player_names = [f"Jugador {i}" for i in range(self.num_players)]
-        else:
-            raise ValueError("Debes especificar num_players o player_names.")
-
-        # Palabras
-        self.words = [w.strip() for w in (words or []) if w and w.strip()]
-        if not self.words:
-            self.words = DEFAULT_WORDS.copy()
-
-        # Número de impostores (por defecto 1)
-        if num_impostors is None:
-            self.num_impostors = 1
-        else:
-            self.num_impostors = int(num_impostors)
+    - seed: semilla con la que se sortearon impostores y palabra (permite recrear la partida)
+    - coincidencia: configuración de comparación de adivinanzas (acentos, mayúsculas, erratas)
 
-        # Validación inicial: debe haber al menos 1 impostor y menos impostores que tripulantes
-        if self.num_impostors < 1:
-            raise ValueError("Debe haber al menos 1 impostor.")
-        if self.num_impostors >= (self.num_players - self.num_impostors):
-            raise ValueError("El número de impostores no puede ser igual o mayor que el número de tripulantes.")
-
-        # Estado de la partida
-        # Elegir impostores aleatoriamente (set de índices vivos)
-        self.impostors = set(random.sample(range(self.num_players), k=self.num_impostors))
-
-        # Elegir palabra objetivo
-        self.word = random.choice(self.words)
+    Se puede observar la partida con suscribir(callback): cada cambio de estado
+    llama a callback(partida, evento, datos) con evento "guess", "vote", "eject"
+    o "fin".
 
-        # Alive flags y construcción de jugadores
-        self.alive = [True] * self.num_players
-        self.players = []
-        for i in range(self.num_players):
-            role = "impostor" if i in self.impostors else "tripulante"
-            assigned_word = None if role == "impostor" else self.word
-            self.players.append({
-                "id": i,
-                "name": self.player_names[i],
-                "role": role,
-                "word": assigned_word
-            })
-
-        # Fin de juego
-        self.over = False
-        self.winner: Optional[str] = None  # "impostores" | "tripulantes" | None
+    El estado se guarda de forma compacta (__slots__, bytearrays y nombres
+    internados) para poder alojar decenas de miles de salas en un proceso.
+    Los contadores de impostores/tripulantes vivos se mantienen en cada
+    expulsión, de modo que check_win es O(1).
+    """
+    __slots__ = ("num_players", "num_impostors", "words", "word",
+                 "alive", "_roles", "_names", "over", "winner",
+                 "_impostores_vivos", "_tripulantes_vivos", "debug", "seed",
+                 "coincidencia", "_word_norm", "_oyentes")
 
     def __init__(self,
                  num_players: Optional[int] = None,
                  words: Optional[List[str]] = None,
                  player_names: Optional[List[str]] = None,
-                 num_impostors: Optional[int] = None):
+                 num_impostors: Optional[int] = None,
+                 debug: bool = False,
+                 rng: Optional[random.Random] = None,
+                 seed: Optional[int] = None,
+                 coincidencia: Optional[Coincidencia] = None):
         """
         Inicializa una partida del juego "El Impostor".
         
         Parámetros:
         - num_players: número de jugadores (alternativo a player_names)
-        - words: lista de palabras candidatas
+        - words: lista de palabras candidatas, o una vista de un banco de palabras
+          (banco_palabras.VistaCategoria), que se usa sin copiar
         - player_names: lista de nombres de jugadores (alternativo a num_players)
         - num_impostors: número de impostores iniciales
+        - debug: si es True, check_win verifica los contadores con un recuento completo
+        - rng: generador (random.Random) del que se deriva la semilla de la partida.
+        - seed: semilla de la partida. Tiene prioridad sobre rng; si ambos son None se
+          toma una del módulo global random. Partida(..., seed=p.seed) con los mismos
+          jugadores y palabras recrea exactamente la partida p.
+        - coincidencia: cómo se comparan las adivinanzas. Por defecto ignora acentos y
+          mayúsculas y no tolera erratas.
         """
         # Determinar número de jugadores y nombres
+        # (los nombres por defecto "Jugador i" no se guardan: se generan al consultarlos)
         if player_names:
             self.num_players = len(player_names)
-            self.player_names = [name.strip() or f"Jugador {i}" for i, name in enumerate(player_names)]
+            self._names = [sys.intern(name.strip() or f"Jugador {i}") for i, name in enumerate(player_names)]
         elif num_players:
             if num_players < 3:
                 raise ValueError("Se recomienda al menos 3 jugadores.")
             self.num_players = int(num_players)
-            self.player_names = [f"Jugador {i}" for i in range(self.num_players)]
+            self._names = None
         else:
             raise ValueError("Debes especificar num_players o player_names.")
 
-        # Palabras
-        self.words = [w.strip() for w in (words or []) if w and w.strip()]
-        if not self.words:
-            self.words = DEFAULT_WORDS.copy()
+        # Palabras: se comparten por referencia si ya vienen limpias
+        self.words = _limpiar_palabras(words)
 
         # Número de impostores (por defecto 1)
         if num_impostors is None:
@@ -121,72 +125,114 @@ class Partida:
             raise ValueError("El número de impostores no puede ser igual o mayor que el número de tripulantes.")
 
         # Estado de la partida
-        # Elegir impostores aleatoriamente (set de índices vivos)
-        self.impostors = set(random.sample(range(self.num_players), k=self.num_impostors))
-
-        # Elegir palabra objetivo
-        self.word = random.choice(self.words)
-
-        # Alive flags y construcción de jugadores
-        self.alive = [True] * self.num_players
-        self.players = []
-        for i in range(self.num_players):
-            role = "impostor" if i in self.impostors else "tripulante"
-            assigned_word = None if role == "impostor" else self.word
-            self.players.append({
-                "id": i,
-                "name": self.player_names[i],
-                "role": role,
-                "word": assigned_word
-            })
+        # Semilla propia de la partida: el sorteo usa un generador local, así que
+        # crear partidas en paralelo no compite por el estado global de random
+        # (el generador no se guarda en la instancia para no inflar cada sala)
+        if seed is None:
+            seed = (rng if rng is not None else random).getrandbits(64)
+        self.seed = seed
+        rnd = random.Random(seed)
+
+        # Roles iniciales (1 = impostor) y flags de vida (1 = vivo), un byte por jugador
+        self._roles = bytearray(self.num_players)
+        for i in rnd.sample(range(self.num_players), k=self.num_impostors):
+            self._roles[i] = 1
+
+        # Elegir palabra objetivo (y precalcular su forma normalizada para guess)
+        self.word = rnd.choice(self.words)
+        self.coincidencia = coincidencia or COINCIDENCIA_POR_DEFECTO
+        self._word_norm = self.coincidencia.normalizar(self.word)
+
+        self.alive = bytearray(b"\x01") * self.num_players
+        self._impostores_vivos = self.num_impostors
+        self._tripulantes_vivos = self.num_players - self.num_impostors
+        self.debug = debug
+        self._oyentes = None  # lista de callbacks, solo si alguien se suscribe
 
         # Fin de juego
         self.over = False
         self.winner: Optional[str] = None  # "impostores" | "tripulantes" | None
 
+    @property
+    def player_names(self) -> List[str]:
+        """Lista de nombres de jugadores (se construye al consultarla)."""
+        if self._names is not None:
+            return list(self._names)
+        return [f"Jugador {i}" for i in range(self.num_players)]
+
+    @property
+    def players(self) -> _VistaJugadores:
+        """Vista de compatibilidad con la antigua lista de dicts por jugador."""
+        return _VistaJugadores(self)
+
+    @property
+    def impostors(self) -> set:
+        """Set con los índices de los impostores vivos."""
+        return {i for i in range(self.num_players) if self._roles[i] and self.alive[i]}
+
     def summary(self) -> str:
         """Resumen textual (no revela la palabra ni quienes son impostores)."""
-        s = f"Partida: {self.num_players} jugadores, {self.num_impostors} impostor(es) inicial(es).\n"
-        s += "Jugadores (estado):\n"
-        for i, p in enumerate(self.players):
+        lines = [f"Partida: {self.num_players} jugadores, {self.num_impostors} impostor(es) inicial(es).\n",
+                 "Jugadores (estado):\n"]
+        for i in range(self.num_players):
             state = "vivo" if self.alive[i] else "eliminado"
-            s += f" - {p['id']}: {p['name']} ({state})\n"
-        return s
+            lines.append(f" - {i}: {self.get_player_name(i)} ({state})\n")
+        return "".join(lines)
+
+    def get_player_name(self, player_id: int) -> str:
+        """Obtiene el nombre del jugador."""
+        if self._names is not None:
+            return self._names[player_id]
+        return f"Jugador {range(self.num_players)[player_id]}"
 
     def get_player_role(self, player_id: int) -> str:
-        """Obtiene el rol del jugador."""
-        return self.players[player_id]["role"]
+        """Obtiene el rol del jugador ("eliminado" si ya fue expulsado)."""
+        if not self.alive[player_id]:
+            return "eliminado"
+        return "impostor" if self._roles[player_id] else "tripulante"
 
     def get_player_word(self, player_id: int) -> Optional[str]:
         """Obtiene la palabra asignada al jugador (None para impostores)."""
-        return self.players[player_id]["word"]
+        return None if self._roles[player_id] else self.word
+
+    def _es_impostor_vivo(self, player_id: int) -> bool:
+        """True si player_id es un impostor que sigue vivo (False si no es un id válido)."""
+        if not isinstance(player_id, int) or not 0 <= player_id < self.num_players:
+            return False
+        return bool(self._roles[player_id] and self.alive[player_id])
 
     def guess(self, player_id: int, guess_word: str) -> Dict[str, Any]:
         """
-        player_id intenta adivinar la palabra.
+        player_id intenta adivinar la palabra. La comparación sigue self.coincidencia
+        (acentos, mayúsculas y erratas toleradas). Si coincidencia.solo_conocidas es
+        True, un intento que no está en la lista de palabras se marca como no válido.
         Retorna dict:
-        { 'player_id', 'player_name', 'guess', 'correct', 'is_impostor', 'game_over', 'winner' }
+        { 'player_id', 'player_name', 'guess', 'correct', 'valid', 'is_impostor', 'game_over', 'winner' }
         """
         guess_norm = guess_word.strip().lower()
-        is_correct = (guess_norm == self.word.lower())
+        intento = self.coincidencia.normalizar(guess_word)
+        is_valid = (not self.coincidencia.solo_conocidas or
+                    self.coincidencia.es_conocida(intento, self.words))
+        is_correct = is_valid and self.coincidencia.coincide(intento, self._word_norm)
         is_impostor = (self.get_player_role(player_id) == "impostor")
         result = {
             "player_id": player_id,
-            "player_name": self.players[player_id]["name"],
+            "player_name": self.get_player_name(player_id),
             "guess": guess_norm,
             "correct": is_correct,
+            "valid": is_valid,
             "is_impostor": is_impostor,
             "game_over": False,
             "winner": None
         }
+        if self._oyentes:
+            self._emitir("guess", {"player_id": player_id, "guess": guess_norm, "correct": is_correct})
         if is_correct:
             # Declarar ganador inmediatamente
             if is_impostor:
-                self.over = True
-                self.winner = "impostores"
+                self._terminar("impostores", f"El impostor (Jugador {player_id}) adivinó la palabra.")
             else:
-                self.over = True
-                self.winner = "tripulantes"
+                self._terminar("tripulantes", f"Jugador {player_id} adivinó la palabra.")
             result["game_over"] = self.over
             result["winner"] = self.winner
         return result
@@ -197,24 +243,39 @@ class Partida:
         Si perform_eject=True, la persona elegida (si la hay) será expulsada (eject).
         Devuelve { 'elected': id_o_None, 'is_impostor': bool, 'counts': {id:count}, 'eject_info': {...} }
         """
+        # Recuento en una sola pasada, siguiendo el máximo y si está empatado
         counts: Dict[int, int] = {}
+        max_votes = 0
+        elected = None
+        empate = False
         for v in votes.values():
-            counts[v] = counts.get(v, 0) + 1
-        if not counts:
+            c = counts.get(v, 0) + 1
+            counts[v] = c
+            if c > max_votes:
+                max_votes, elected, empate = c, v, False
+            elif c == max_votes:
+                empate = True
+        if elected is None or empate:
+            # sin votos o empate
+            if self._oyentes:
+                self._emitir("vote", {"elected": None, "votes": max_votes})
             return {"elected": None, "is_impostor": False, "counts": counts, "eject_info": None}
+        return self._resolver_votacion(elected, counts, perform_eject)
 
-        max_votes = max(counts.values())
-        candidates = [pid for pid, c in counts.items() if c == max_votes]
-        if len(candidates) > 1:
-            # empate
-            return {"elected": None, "is_impostor": False, "counts": counts, "eject_info": None}
-        elected = candidates[0]
-        is_impostor = (elected in self.impostors)
+    def _resolver_votacion(self, elected: int, counts: Dict[int, int], perform_eject: bool) -> Dict[str, Any]:
+        """Resultado de una votación con elegido único (común a vote y SesionVotacion)."""
+        if self._oyentes:
+            self._emitir("vote", {"elected": elected, "votes": counts[elected]})
+        is_impostor = self._es_impostor_vivo(elected)
         eject_info = None
         if perform_eject:
             eject_info = self.eject(elected)
         return {"elected": elected, "is_impostor": is_impostor, "counts": counts, "eject_info": eject_info}
 
+    def abrir_votacion(self) -> "SesionVotacion":
+        """Abre una sesión de votación incremental (votos uno a uno o por lotes)."""
+        return SesionVotacion(self)
+
     def eject(self, player_id: int) -> Dict[str, Any]:
         """
         Expulsa (elimina) a player_id si está vivo.
@@ -225,7 +286,7 @@ class Partida:
         info: Dict[str, Any] = {
             "player_id": player_id,
             "was_alive": bool(self.alive[player_id]),
-            "was_impostor": player_id in self.impostors,
+            "was_impostor": self._es_impostor_vivo(player_id),
             "game_over": False,
             "winner": None,
             "reason": ""
@@ -234,18 +295,19 @@ class Partida:
             info["reason"] = "Jugador ya estaba eliminado."
             return info
 
-        # Marcar eliminado
-        self.alive[player_id] = False
-        # actualizar rol en players (opcional)
-        self.players[player_id]["role"] = "eliminado"
+        # Marcar eliminado (get_player_role pasa a devolver "eliminado")
+        self.alive[player_id] = 0
 
-        # Si era impostor, quitarlo del set
-        if player_id in self.impostors:
-            self.impostors.remove(player_id)
+        if self._roles[player_id]:
+            self._impostores_vivos -= 1
             info["reason"] = "Se expulsó a un impostor."
         else:
+            self._tripulantes_vivos -= 1
             info["reason"] = "Se expulsó a un tripulante."
 
+        if self._oyentes:
+            self._emitir("eject", {"player_id": player_id, "was_impostor": bool(self._roles[player_id])})
+
         # Comprobar condiciones de victoria tras la expulsión
         over_info = self.check_win()
         info["game_over"] = over_info["over"]
@@ -265,25 +327,360 @@ class Partida:
         if self.over:
             return {"over": True, "winner": self.winner, "reason": "Partida ya finalizada."}
 
-        impostors_vivos = len([i for i in self.impostors if self.alive[i]])
-        tripulantes_vivos = len([i for i in range(self.num_players) if self.alive[i] and i not in self.impostors])
+        if self.debug:
+            self._verificar_contadores()
+        fin = self._condicion_victoria()
+        if fin is None:
+            return {"over": False, "winner": None, "reason": "La partida continúa."}
+        self._terminar(*fin)
+        return {"over": True, "winner": self.winner, "reason": fin[1]}
+
+    def _condicion_victoria(self) -> Optional[Tuple[str, str]]:
+        """(ganador, motivo) si los contadores de vivos deciden la partida; None si continúa."""
+        impostors_vivos = self._impostores_vivos
+        tripulantes_vivos = self._tripulantes_vivos
 
         # Si no quedan impostores
         if impostors_vivos == 0:
-            self.over = True
-            self.winner = "tripulantes"
-            reason = "No quedan impostores vivos."
-            return {"over": True, "winner": self.winner, "reason": reason}
+            return "tripulantes", "No quedan impostores vivos."
 
         # Si impostores >= tripulantes => impostores ganan
         if impostors_vivos >= tripulantes_vivos:
-            self.over = True
-            self.winner = "impostores"
-            reason = f"{impostors_vivos} impostor(es) vs {tripulantes_vivos} tripulante(s) => los impostores controlan la partida."
-            return {"over": True, "winner": self.winner, "reason": reason}
-
-        return {"over": False, "winner": None, "reason": "La partida continúa."}
+            return "impostores", (f"{impostors_vivos} impostor(es) vs {tripulantes_vivos} tripulante(s) "
+                                  "=> los impostores controlan la partida.")
+        return None
+
+    def _terminar(self, winner: str, reason: str):
+        """Marca la partida como terminada con `winner` y avisa a los oyentes."""
+        self.over = True
+        self.winner = winner
+        if self._oyentes:
+            self._emitir("fin", {"winner": winner, "reason": reason})
+
+    # ================ Observadores ================
+    def suscribir(self, callback: Callable[["Partida", str, Dict[str, Any]], None]):
+        """Registra callback(partida, evento, datos) para cada cambio de estado."""
+        if self._oyentes is None:
+            self._oyentes = []
+        self._oyentes.append(callback)
+
+    def desuscribir(self, callback):
+        """Quita un callback registrado con suscribir."""
+        if self._oyentes and callback in self._oyentes:
+            self._oyentes.remove(callback)
+
+    def _emitir(self, evento: str, datos: Dict[str, Any]):
+        for callback in list(self._oyentes):
+            callback(self, evento, datos)
+
+    def recontar_vivos(self) -> Tuple[int, int]:
+        """Recuento completo O(n) de (impostores_vivos, tripulantes_vivos)."""
+        impostors_vivos = sum(1 for i in range(self.num_players) if self._roles[i] and self.alive[i])
+        tripulantes_vivos = sum(1 for i in range(self.num_players) if self.alive[i] and not self._roles[i])
+        return impostors_vivos, tripulantes_vivos
+
+    def _verificar_contadores(self):
+        """Modo debug: compara los contadores incrementales con un recuento completo."""
+        esperado = self.recontar_vivos()
+        actual = (self._impostores_vivos, self._tripulantes_vivos)
+        if actual != esperado:
+            raise RuntimeError(f"Contadores desincronizados: {actual} (incremental) != {esperado} (recuento).")
 
     def is_over(self) -> bool:
         """Devuelve True si la partida ha terminado."""
-        return self.over
\ No newline at end of file
+        return self.over
+
+    # ================ Serialización ================
+    def to_dict(self, palabras: bool = True) -> Dict[str, Any]:
+        """
+        Estado completo de la partida como dict serializable a JSON.
+        Las palabras por defecto (DEFAULT_WORDS) no se copian en el dict, y de un
+        banco de palabras solo se guarda la referencia (ruta y categoría). Con
+        palabras=False se omite la lista ("words" = None); from_dict necesitará
+        entonces el argumento `words`.
+        """
+        if not palabras or self.words is DEFAULT_WORDS:
+            words = None
+        elif hasattr(self.words, "referencia"):
+            words = self.words.referencia()
+        else:
+            words = list(self.words)
+        return {
+            "num_players": self.num_players,
+            "num_impostors": self.num_impostors,
+            "player_names": self._names,
+            "words": words,
+            "word": self.word,
+            "seed": self.seed,
+            "impostors": [i for i in range(self.num_players) if self._roles[i]],
+            "alive": self.alive.hex(),
+            "over": self.over,
+            "winner": self.winner,
+            "coincidencia": None if self.coincidencia is COINCIDENCIA_POR_DEFECTO else self.coincidencia.como_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], words: Optional[List[str]] = None) -> "Partida":
+        """
+        Reconstruye una partida a partir de to_dict() sin volver a sortear nada.
+        `words` permite reutilizar una lista de palabras ya cargada en memoria.
+        """
+        p = cls.__new__(cls)
+        p.num_players = data["num_players"]
+        p.num_impostors = data["num_impostors"]
+        names = data.get("player_names")
+        p._names = [sys.intern(n) for n in names] if names is not None else None
+        if words is None:
+            words = data.get("words")
+            if isinstance(words, dict):
+                from banco_palabras import desde_referencia
+                words = desde_referencia(words)
+        p.words = _limpiar_palabras(words)
+        p.word = data["word"]
+        p.seed = data.get("seed")
+        p._roles = bytearray(p.num_players)
+        for i in data["impostors"]:
+            p._roles[i] = 1
+        p.alive = bytearray.fromhex(data["alive"])
+        p.over = data["over"]
+        p.winner = data["winner"]
+        p.debug = False
+        p._oyentes = None
+        p.coincidencia = Coincidencia.desde_dict(data.get("coincidencia"))
+        p._word_norm = p.coincidencia.normalizar(p.word)
+        p._impostores_vivos, p._tripulantes_vivos = p.recontar_vivos()
+        return p
+
+
+class PartidaConcurrente(Partida):
+    """
+    Partida que se puede usar desde varios hilos a la vez (p. ej. manejadores de
+    red que atienden la misma sala).
+
+    Solo las transiciones de estado toman el candado, y durante lo mínimo:
+    - eject: comprobar y marcar al jugador, actualizar contadores y decidir la
+      victoria son una sola sección crítica, así que un jugador no se expulsa dos
+      veces ni los contadores se descuadran.
+    - _terminar (adivinanza correcta, check_win): el primer evento ganador fija
+      over/winner; los siguientes no los sobrescriben.
+    Los avisos a los oyentes se hacen fuera del candado. Las lecturas
+    (get_player_role, summary, is_over...) no lo toman: ven el estado anterior o
+    el posterior de cada transición. SesionVotacion no es segura entre hilos.
+    """
+    __slots__ = ("_lock",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], words: Optional[List[str]] = None) -> "PartidaConcurrente":
+        p = super().from_dict(data, words)
+        p._lock = threading.Lock()
+        return p
+
+    @classmethod
+    def desde(cls, partida: Partida) -> "PartidaConcurrente":
+        """Copia concurrente de una partida (sin sus oyentes)."""
+        return cls.from_dict(partida.to_dict(), words=partida.words)
+
+    def eject(self, player_id: int) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"player_id": player_id, "was_alive": False, "was_impostor": False,
+                                "game_over": False, "winner": None, "reason": "Jugador ya estaba eliminado."}
+        era_impostor = bool(self._roles[player_id])
+        with self._lock:
+            if not self.alive[player_id]:
+                return info
+            self.alive[player_id] = 0
+            if era_impostor:
+                self._impostores_vivos -= 1
+            else:
+                self._tripulantes_vivos -= 1
+            ya_terminada = self.over
+            fin = None if ya_terminada else self._condicion_victoria()
+            if fin is not None:
+                self.over = True
+                self.winner = fin[0]
+            winner = self.winner
+        info["was_alive"] = True
+        info["was_impostor"] = era_impostor
+        info["reason"] = "Se expulsó a un impostor." if era_impostor else "Se expulsó a un tripulante."
+        if self._oyentes:
+            self._emitir("eject", {"player_id": player_id, "was_impostor": era_impostor})
+        if ya_terminada or fin is not None:
+            info["game_over"] = True
+            info["winner"] = winner
+            info["reason"] += " " + ("Partida ya finalizada." if ya_terminada else fin[1])
+            if fin is not None and self._oyentes:
+                self._emitir("fin", {"winner": fin[0], "reason": fin[1]})
+        return info
+
+    def check_win(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.over:
+                return {"over": True, "winner": self.winner, "reason": "Partida ya finalizada."}
+            if self.debug:
+                self._verificar_contadores()
+            fin = self._condicion_victoria()
+            if fin is not None:
+                self.over = True
+                self.winner = fin[0]
+        if fin is None:
+            return {"over": False, "winner": None, "reason": "La partida continúa."}
+        if self._oyentes:
+            self._emitir("fin", {"winner": fin[0], "reason": fin[1]})
+        return {"over": True, "winner": fin[0], "reason": fin[1]}
+
+    def _terminar(self, winner: str, reason: str):
+        with self._lock:
+            if self.over:
+                return
+            self.over = True
+            self.winner = winner
+        if self._oyentes:
+            self._emitir("fin", {"winner": winner, "reason": reason})
+
+
+class SesionVotacion:
+    """
+    Votación incremental sobre una Partida.
+
+    Los votos llegan uno a uno (votar) o por lotes (votar_lote) y se pueden
+    cambiar o retirar. Se mantiene el recuento por candidato, los candidatos
+    agrupados por número de votos y el máximo actual, de modo que cada voto, la
+    consulta del líder y el cierre son O(1). cerrar() devuelve lo mismo que
+    Partida.vote().
+    """
+    __slots__ = ("partida", "_votos", "_conteo", "_por_conteo", "_max", "cerrada")
+
+    def __init__(self, partida: Partida):
+        self.partida = partida
+        self._votos: Dict[int, int] = {}          # votante -> votado
+        self._conteo: Dict[int, int] = {}         # votado -> votos
+        self._por_conteo: Dict[int, set] = {}     # votos -> {votados}
+        self._max = 0
+        self.cerrada = False
+
+    def _validar_jugador(self, player_id: int, que: str):
+        p = self.partida
+        if not isinstance(player_id, int) or not 0 <= player_id < p.num_players:
+            raise ValueError(f"{que} inválido: {player_id!r}")
+        if not p.alive[player_id]:
+            raise ValueError(f"{que} {player_id} está eliminado.")
+
+    def _sumar(self, votado: int, delta: int):
+        c = self._conteo.get(votado, 0)
+        nuevo = c + delta
+        if c:
+            grupo = self._por_conteo[c]
+            grupo.discard(votado)
+            if not grupo:
+                del self._por_conteo[c]
+                if c == self._max and delta < 0:
+                    self._max = nuevo
+        if nuevo:
+            self._conteo[votado] = nuevo
+            self._por_conteo.setdefault(nuevo, set()).add(votado)
+            if nuevo > self._max:
+                self._max = nuevo
+        else:
+            del self._conteo[votado]
+
+    def votar(self, voter_id: int, voted_id: int):
+        """Registra (o cambia) el voto de voter_id. Lanza ValueError si no es válido."""
+        if self.cerrada:
+            raise ValueError("La votación ya está cerrada.")
+        if self.partida.over:
+            raise ValueError("La partida ya terminó.")
+        self._validar_jugador(voter_id, "Votante")
+        self._validar_jugador(voted_id, "Votado")
+        anterior = self._votos.get(voter_id)
+        if anterior == voted_id:
+            return
+        if anterior is not None:
+            self._sumar(anterior, -1)
+        self._votos[voter_id] = voted_id
+        self._sumar(voted_id, 1)
+
+    def retirar(self, voter_id: int):
+        """Retira el voto de voter_id (pasa a abstenerse)."""
+        if self.cerrada:
+            raise ValueError("La votación ya está cerrada.")
+        anterior = self._votos.pop(voter_id, None)
+        if anterior is not None:
+            self._sumar(anterior, -1)
+
+    def votar_lote(self, votos: Dict[int, int]) -> Dict[int, str]:
+        """
+        Registra varios votos {votante: votado}. Los inválidos se ignoran y se
+        devuelven como {votante: motivo}.
+        """
+        rechazados = {}
+        for voter_id, voted_id in votos.items():
+            try:
+                self.votar(voter_id, voted_id)
+            except ValueError as e:
+                rechazados[voter_id] = str(e)
+        return rechazados
+
+    def lider(self) -> Tuple[Optional[int], int]:
+        """(elegido actual o None si no hay votos o hay empate, votos del máximo)."""
+        if not self._max:
+            return None, 0
+        grupo = self._por_conteo[self._max]
+        if len(grupo) > 1:
+            return None, self._max
+        return next(iter(grupo)), self._max
+
+    def hay_empate(self) -> bool:
+        return self._max > 0 and len(self._por_conteo[self._max]) > 1
+
+    @property
+    def num_votos(self) -> int:
+        return len(self._votos)
+
+    def cerrar(self, perform_eject: bool = False) -> Dict[str, Any]:
+        """
+        Cierra la votación. Devuelve lo mismo que Partida.vote():
+        { 'elected': id_o_None, 'is_impostor': bool, 'counts': {id:count}, 'eject_info': {...} }
+        """
+        if self.cerrada:
+            raise ValueError("La votación ya está cerrada.")
+        self.cerrada = True
+        elected, _ = self.lider()
+        # El recuento interno ya no cambia: se entrega sin copiarlo
+        if elected is None:
+            if self.partida._oyentes:
+                self.partida._emitir("vote", {"elected": None, "votes": self._max})
+            return {"elected": None, "is_impostor": False, "counts": self._conteo, "eject_info": None}
+        return self.partida._resolver_votacion(elected, self._conteo, perform_eject)
+
+
+def _limpiar_palabras(words: Optional[List[str]]) -> List[str]:
+    """
+    Devuelve la lista de palabras candidatas sin espacios sobrantes ni vacías.
+    Si la lista ya está limpia se devuelve la misma referencia (sin copia), y si
+    no queda ninguna palabra se usa DEFAULT_WORDS (también compartida).
+    Las vistas de un banco de palabras (secuencias que no son list/tuple) ya se
+    limpiaron al construir el banco y se devuelven tal cual, en O(1).
+    """
+    if not words:
+        return DEFAULT_WORDS
+    if isinstance(words, Sequence) and not isinstance(words, (list, tuple, str)):
+        return words
+    if all(w and w == w.strip() for w in words):
+        return words
+    cleaned = [w.strip() for w in words if w and w.strip()]
+    return cleaned or DEFAULT_WORDS
+
+
+def crear_partidas(n: int, seed: Optional[int] = None, **kwargs) -> List[Partida]:
+    """
+    Crea `n` partidas a partir de un único flujo de semillas sin tocar el estado
+    global de random. Cada partida recibe (y guarda) su propia semilla derivada,
+    por lo que puede recrearse individualmente. kwargs se pasa a Partida.
+    """
+    flujo = random.Random(seed)
+    # Limpiar la lista antes: todas las partidas comparten la misma y la encuentran ya limpia
+    kwargs["words"] = _limpiar_palabras(kwargs.get("words"))
+    return [Partida(seed=flujo.getrandbits(64), **kwargs) for _ in range(n)]
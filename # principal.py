@@ -8,12 +8,224 @@ from tkinter import ttk, simpledialog, messagebox
 from partida import Partida
 import graficos
 import os
+from typing import Callable, Dict, List
+
+# Límite del selector de jugadores (la cuadrícula solo crea las tarjetas visibles)
+MAX_JUGADORES = 1000
+
+
+class _Tarjeta:
+    """Widgets de una tarjeta de jugador; se reutiliza para distintos jugadores al desplazar."""
+    __slots__ = ("frame", "avatar", "nombre", "estado", "item", "pid")
+
+
+class CuadriculaJugadores:
+    """
+    Cuadrícula desplazable de tarjetas de jugador (avatar, nombre, estado y botón).
+    Solo existen las tarjetas de las filas visibles: al desplazar o redimensionar,
+    las que salen de la vista se ocultan y se reutilizan para los jugadores que
+    entran, así que el coste de abrir la ventana no depende del número de jugadores.
+
+    - nombre(pid) / vivo(pid): de dónde sale el contenido de cada tarjeta
+    - on_ver_rol(pid): acción del botón "Ver rol (privado)"
+    - refrescar(pid): vuelve a pintar la tarjeta de pid si está visible
+    """
+    def __init__(self, parent, num_players: int,
+                 nombre: Callable[[int], str],
+                 vivo: Callable[[int], bool],
+                 on_ver_rol: Callable[[int], None],
+                 card_w: int = 150, card_h: int = 200, avatar_size: int = 100):
+        self.num_players = num_players
+        self.nombre = nombre
+        self.vivo = vivo
+        self.on_ver_rol = on_ver_rol
+        self.card_w = card_w
+        self.card_h = card_h
+        self.avatar_size = avatar_size
+        self.cols = 1
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        # Cualquier cambio de la vista (barra, rueda, yview_moveto) pasa por aquí
+        self.canvas.configure(yscrollcommand=self._al_desplazar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self._visibles: Dict[int, _Tarjeta] = {}
+        self._libres: List[_Tarjeta] = []
+        self.canvas.bind("<Configure>", self._al_redimensionar)
+        ventana = self.canvas.winfo_toplevel()
+        ventana.bind("<MouseWheel>", self._rueda, add="+")
+        ventana.bind("<Button-4>", self._rueda, add="+")
+        ventana.bind("<Button-5>", self._rueda, add="+")
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # ---- Tarjetas ----
+    def _crear_tarjeta(self) -> _Tarjeta:
+        t = _Tarjeta()
+        t.pid = -1
+        t.frame = ttk.Frame(self.canvas, relief="ridge", padding=6)
+        t.avatar = tk.Canvas(t.frame, width=self.avatar_size, height=self.avatar_size, bg="white", highlightthickness=0)
+        t.avatar.pack()
+        t.nombre = ttk.Label(t.frame)
+        t.nombre.pack(pady=(6, 0))
+        t.estado = ttk.Label(t.frame)
+        t.estado.pack(pady=2)
+        ttk.Button(t.frame, text="Ver rol (privado)", command=lambda: self.on_ver_rol(t.pid)).pack(pady=4)
+        t.item = self.canvas.create_window(0, 0, window=t.frame, anchor="nw",
+                                           width=self.card_w - 12, height=self.card_h - 12)
+        return t
+
+    def _asignar(self, t: _Tarjeta, pid: int):
+        col, fila = pid % self.cols, pid // self.cols
+        self.canvas.coords(t.item, col * self.card_w + 6, fila * self.card_h + 6)
+        self.canvas.itemconfigure(t.item, state="normal")
+        if t.pid != pid:
+            t.pid = pid
+            size = self.avatar_size
+            t.avatar.delete("all")
+            # Usamos como seed el id para que sea determinista
+            graficos.draw_avatar(t.avatar, size/2, size/2, size, seed=pid)
+            t.nombre.config(text=self.nombre(pid))
+        self._pintar_estado(t)
+
+    def _pintar_estado(self, t: _Tarjeta):
+        if self.vivo(t.pid):
+            t.estado.config(text="Vivo", foreground="green")
+        else:
+            t.estado.config(text="Eliminado", foreground="red")
+
+    def refrescar(self, pid: int):
+        t = self._visibles.get(pid)
+        if t is not None:
+            self._pintar_estado(t)
+
+    # ---- Virtualización ----
+    def _actualizar(self):
+        """Hace visibles exactamente las tarjetas de las filas en pantalla."""
+        alto = max(1, self.canvas.winfo_height())
+        arriba = max(0.0, self.canvas.canvasy(0))
+        primera = int(arriba // self.card_h)
+        ultima = int((arriba + alto) // self.card_h)
+        desde = primera * self.cols
+        hasta = min(self.num_players, (ultima + 1) * self.cols)
+
+        for pid in [p for p in self._visibles if not desde <= p < hasta]:
+            t = self._visibles.pop(pid)
+            self.canvas.itemconfigure(t.item, state="hidden")
+            self._libres.append(t)
+        for pid in range(desde, hasta):
+            if pid not in self._visibles:
+                t = self._libres.pop() if self._libres else self._crear_tarjeta()
+                self._visibles[pid] = t
+                self._asignar(t, pid)
+
+    def _al_desplazar(self, first, last):
+        self.scrollbar.set(first, last)
+        self._actualizar()
+
+    def _al_redimensionar(self, event):
+        cols = max(1, event.width // self.card_w)
+        filas = -(-self.num_players // cols)
+        self.canvas.configure(scrollregion=(0, 0, cols * self.card_w, filas * self.card_h))
+        if cols != self.cols:
+            # Cambia la colocación de todas: se recolocan las visibles
+            self.cols = cols
+            for pid, t in list(self._visibles.items()):
+                self._asignar(t, pid)
+        self._actualizar()
+
+    def _rueda(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+
+
+class VistaPartida:
+    """
+    Modelo de vista de la ventana de juego: escucha los eventos de la Partida y
+    acumula los cambios (expulsiones, fin de partida) para aplicarlos en una sola
+    pasada con after_idle. Muchas expulsiones seguidas (p. ej. una partida
+    reproducida o cambios llegados del servidor) cuestan un único repintado.
+
+    Mantiene referencias directas a los widgets que actualiza: la cuadrícula de
+    tarjetas, la etiqueta de estado y los botones de acción.
+    """
+    def __init__(self, partida: Partida, cuadricula: CuadriculaJugadores, lbl_estado, botones_accion):
+        self.partida = partida
+        self.cuadricula = cuadricula
+        self.lbl_estado = lbl_estado
+        self.botones_accion = botones_accion
+        self._pendientes = set()     # jugadores cuya tarjeta hay que repintar
+        self._fin_pendiente = False
+        self._programado = None      # id de after_idle del repintado
+        self.repintados = 0
+        partida.suscribir(self._al_evento)
+        self._pintar_estado()
+
+    def _al_evento(self, partida: Partida, evento: str, datos):
+        if evento == "eject":
+            self._pendientes.add(datos["player_id"])
+        elif evento == "fin":
+            self._fin_pendiente = True
+        else:
+            return
+        self._programar()
+
+    def marcar(self, player_id: int):
+        """Fuerza el repintado de la tarjeta de un jugador en la próxima pasada."""
+        self._pendientes.add(player_id)
+        self._programar()
+
+    def _programar(self):
+        if self._programado is None:
+            self._programado = self.lbl_estado.after_idle(self._aplicar)
+
+    def _aplicar(self):
+        """Pasada de repintado: aplica todos los cambios acumulados."""
+        self._programado = None
+        pendientes, self._pendientes = self._pendientes, set()
+        for pid in pendientes:
+            self.cuadricula.refrescar(pid)
+        self._pintar_estado()
+        if self._fin_pendiente:
+            self._fin_pendiente = False
+            for boton in self.botones_accion:
+                boton.state(["disabled"])
+        self.repintados += 1
+
+    def _pintar_estado(self):
+        p = self.partida
+        texto = f"Jugadores: {p.num_players} | Vivos: {p.alive.count(1)}"
+        if p.winner == "impostores":
+            texto += " | Ganan los IMPOSTORES"
+        elif p.winner == "tripulantes":
+            texto += " | Ganan los TRIPULANTES"
+        self.lbl_estado.config(text=texto)
+
+    def cerrar(self):
+        """Deja de escuchar la partida y cancela el repintado pendiente."""
+        self.partida.desuscribir(self._al_evento)
+        if self._programado is not None:
+            try:
+                self.lbl_estado.after_cancel(self._programado)
+            except Exception:
+                pass
+            self._programado = None
+
 
 class App:
     def __init__(self, root):
         self.root = root
         self.root.title("El Impostor - Configuración")
         self.partida = None
+        self.vista = None
+        # Caché del texto de palabras ya parseado: (texto, lista)
+        self._palabras_cache = (None, [])
 
         # --- Pantalla de configuración ---
         frm = ttk.Frame(root, padding=10)
@@ -21,7 +233,7 @@ class App:
 
         ttk.Label(frm, text="Número de jugadores:").grid(row=0, column=0, sticky="w")
         self.num_players_var = tk.IntVar(value=4)
-        self.spin_players = ttk.Spinbox(frm, from_=3, to=12, textvariable=self.num_players_var, width=5)
+        self.spin_players = ttk.Spinbox(frm, from_=3, to=MAX_JUGADORES, textvariable=self.num_players_var, width=5)
         self.spin_players.grid(row=0, column=1, sticky="w")
 
         ttk.Label(frm, text="Nombres de jugadores (una por línea):").grid(row=1, column=0, columnspan=2, sticky="w", pady=(8,0))
@@ -68,7 +280,7 @@ class App:
             messagebox.showerror("Error", "Número de impostores inválido.")
             return
 
-        palabras = [w.strip() for w in self.txt_words.get("1.0", "end").splitlines() if w.strip()]
+        palabras = self._leer_palabras()
         try:
             # Partida puede lanzar ValueError si impostors >= tripulantes, lo capturamos
             self.partida = Partida(player_names=names, num_impostors=impostors, words=palabras)
@@ -79,6 +291,13 @@ class App:
         # Abrir ventana de juego
         self.abrir_ventana_juego()
 
+    def _leer_palabras(self):
+        """Lista de palabras del cuadro de texto; solo se vuelve a parsear si el texto cambió."""
+        texto = self.txt_words.get("1.0", "end")
+        if texto != self._palabras_cache[0]:
+            self._palabras_cache = (texto, [w.strip() for w in texto.splitlines() if w.strip()])
+        return self._palabras_cache[1]
+
     def abrir_ventana_juego(self):
         w = tk.Toplevel(self.root)
         w.title("El Impostor - Partida")
@@ -97,49 +316,28 @@ class App:
         topfrm = ttk.Frame(left_panel)
         topfrm.pack(fill="x", pady=(0, 10))
 
-        ttk.Label(topfrm, text=f"Jugadores: {self.partida.num_players}").pack(side="left")
+        lbl_estado = ttk.Label(topfrm)
+        lbl_estado.pack(side="left")
         ttk.Button(topfrm, text="Mostrar mi rol", command=self.mostrar_rol).pack(side="right", padx=4)
-        ttk.Button(topfrm, text="Votar", command=self.iniciar_votacion).pack(side="right", padx=4)
-        ttk.Button(topfrm, text="Adivinar palabra", command=self.adivinar_palabra).pack(side="right", padx=4)
+        btn_votar = ttk.Button(topfrm, text="Votar", command=self.iniciar_votacion)
+        btn_votar.pack(side="right", padx=4)
+        btn_adivinar = ttk.Button(topfrm, text="Adivinar palabra", command=self.adivinar_palabra)
+        btn_adivinar.pack(side="right", padx=4)
         ttk.Button(topfrm, text="Terminar partida", command=lambda: self.terminar_partida(w)).pack(side="right", padx=4)
 
-        # Contenedor de avatares (grid)
-        self.canvas_frame = ttk.Frame(left_panel)
-        self.canvas_frame.pack(fill="both", expand=True)
-
-        # Mostrar avatares en una grilla
-        cols = 2  # reducir a 2 columnas para que quepan mejor en el lado izquierdo
-        size = 100
-        self.avatar_cards = []  # guardar referencias para actualizar después
-        for i in range(self.partida.num_players):
-            r = i // cols
-            c = i % cols
-            card = ttk.Frame(self.canvas_frame, relief="ridge", padding=6)
-            card.grid(row=r, column=c, padx=6, pady=6, sticky="n")
-            self.avatar_cards.append(card)
-
-            # Crear Canvas para dibujar avatar usando graficos.draw_avatar
-            c_canvas = tk.Canvas(card, width=size, height=size, bg="white", highlightthickness=0)
-            c_canvas.pack()
-            # Usamos como seed el id para que sea determinista
-            graficos.draw_avatar(c_canvas, size/2, size/2, size, seed=i)
-            
-            # Nombre del jugador
-            name_label = ttk.Label(card, text=f"{self.partida.players[i]['name']}")
-            name_label.pack(pady=(6,0))
-            name_label.tag = name_label
-            
-            # Estado (vivo/eliminado)
-            state_label = ttk.Label(card, text="Vivo", foreground="green")
-            state_label.pack(pady=2)
-            state_label.player_id = i
-            state_label.tag = state_label
-            
-            ttk.Button(card, text="Ver rol (privado)", command=lambda pid=i: self.mostrar_rol_privado(pid)).pack(pady=4)
-
-        # Ajustes de grid
-        for col in range(cols):
-            self.canvas_frame.grid_columnconfigure(col, weight=1)
+        # Cuadrícula de avatares (solo se crean las tarjetas visibles)
+        self.cuadricula = CuadriculaJugadores(
+            left_panel, self.partida.num_players,
+            nombre=self.partida.get_player_name,
+            vivo=lambda pid: bool(self.partida.alive[pid]),
+            on_ver_rol=self.mostrar_rol_privado)
+        self.cuadricula.pack(fill="both", expand=True)
+
+        # Los cambios de la partida llegan por eventos y se repintan por lotes
+        if self.vista is not None:
+            self.vista.cerrar()
+        vista = self.vista = VistaPartida(self.partida, self.cuadricula, lbl_estado, [btn_votar, btn_adivinar])
+        w.bind("<Destroy>", lambda e: self._al_cerrar_ventana(e, w, vista), add="+")
 
         # --- LADO DERECHO: Fondo de imagen ---
         right_panel = ttk.Frame(main_container)
@@ -164,9 +362,8 @@ class App:
                 break
 
         if bg_found:
-            graficos.set_background(bg_found)
-            # Dibujar fondo tras esperar a que el canvas tenga tamaño
-            w.after(200, self._draw_bg_on_resize)
+            # Decodificar en segundo plano; se muestra un marcador hasta que termine
+            graficos.load_background_async(bg_found, self.bg_canvas, tag="bg")
         else:
             # Si no encuentra imagen, mostrar degradado simple (opcional)
             self.bg_canvas.create_rectangle(0, 0, 500, 500, fill="#FF6B9D", outline="#FF6B9D")
@@ -174,16 +371,9 @@ class App:
         # Bind para redibujar fondo si la ventana se redimensiona
         self.bg_canvas.bind("<Configure>", self._on_canvas_resize)
 
-    def _draw_bg_on_resize(self, event=None):
-        """Redibujar el fondo cuando cambia el tamaño del canvas."""
-        w = self.bg_canvas.winfo_width()
-        h = self.bg_canvas.winfo_height()
-        if w > 1 and h > 1:
-            graficos.draw_background(self.bg_canvas, width=w, height=h, tag="bg")
-
     def _on_canvas_resize(self, event):
-        """Callback cuando el canvas se redimensiona."""
-        self._draw_bg_on_resize()
+        """Callback cuando el canvas se redimensiona: vista previa y reescalado agrupado."""
+        graficos.schedule_background(self.bg_canvas, width=event.width, height=event.height, tag="bg")
 
     def mostrar_rol(self):
         if not self.partida:
@@ -206,14 +396,14 @@ class App:
         if not self.partida:
             return
         if not self.partida.alive[pid]:
-            messagebox.showinfo("Rol", f"{self.partida.players[pid]['name']}: estás eliminado.", parent=self.game_window)
+            messagebox.showinfo("Rol", f"{self.partida.get_player_name(pid)}: estás eliminado.", parent=self.game_window)
             return
         role = self.partida.get_player_role(pid)
         if role == "impostor":
-            msg = f"{self.partida.players[pid]['name']} (Jugador {pid}): ERES EL IMPOSTOR.\n(No tienes palabra)."
+            msg = f"{self.partida.get_player_name(pid)} (Jugador {pid}): ERES EL IMPOSTOR.\n(No tienes palabra)."
         else:
             word = self.partida.get_player_word(pid)
-            msg = f"{self.partida.players[pid]['name']} (Jugador {pid}): Tripulante.\nTu palabra: {word}"
+            msg = f"{self.partida.get_player_name(pid)} (Jugador {pid}): Tripulante.\nTu palabra: {word}"
         t = tk.Toplevel(self.game_window)
         t.title(f"Jugador {pid} - Rol")
         ttk.Label(t, text=msg, padding=12).pack()
@@ -224,17 +414,23 @@ class App:
             messagebox.showinfo("Votación", "No hay partida activa o la partida ya terminó.", parent=self.game_window)
             return
 
-        votes = {}
+        # Cada voto se registra en la sesión en cuanto se introduce
+        sesion = self.partida.abrir_votacion()
         for voter in range(self.partida.num_players):
             if not self.partida.alive[voter]:
                 continue
-            prompt = f"{self.partida.players[voter]['name']} (Jugador {voter}), ¿a quién votas? (0..{self.partida.num_players-1})\nSi quieres abstenerte, pulsa Cancelar."
-            voted = simpledialog.askinteger("Votación", prompt, parent=self.game_window, minvalue=0, maxvalue=self.partida.num_players-1)
-            if voted is None:
-                continue
-            votes[voter] = voted
-
-        resultado = self.partida.vote(votes, perform_eject=True)
+            prompt = f"{self.partida.get_player_name(voter)} (Jugador {voter}), ¿a quién votas? (0..{self.partida.num_players-1})\nSi quieres abstenerte, pulsa Cancelar."
+            while True:
+                voted = simpledialog.askinteger("Votación", prompt, parent=self.game_window, minvalue=0, maxvalue=self.partida.num_players-1)
+                if voted is None:
+                    break
+                try:
+                    sesion.votar(voter, voted)
+                    break
+                except ValueError as e:
+                    messagebox.showerror("Votación", str(e), parent=self.game_window)
+
+        resultado = sesion.cerrar(perform_eject=True)
         counts = resultado["counts"]
         elected = resultado["elected"]
         eject_info = resultado.get("eject_info")
@@ -244,7 +440,7 @@ class App:
             texto += "No se emitieron votos.\n"
         else:
             for pid in range(self.partida.num_players):
-                texto += f"Jugador {pid} ({self.partida.players[pid]['name']}): {counts.get(pid,0)}\n"
+                texto += f"Jugador {pid} ({self.partida.get_player_name(pid)}): {counts.get(pid,0)}\n"
 
         if elected is None:
             texto += "\nNo hay un elegido (empate o nadie)."
@@ -253,7 +449,7 @@ class App:
 
         # Mostrar info de expulsión
         if eject_info:
-            texto += f"\nElegido: Jugador {elected} ({self.partida.players[elected]['name']}).\n"
+            texto += f"\nElegido: Jugador {elected} ({self.partida.get_player_name(elected)}).\n"
             texto += eject_info["reason"] + "\n"
             if eject_info["was_impostor"]:
                 texto += "Se expulsó a un impostor.\n"
@@ -266,24 +462,18 @@ class App:
                 elif eject_info["winner"] == "tripulantes":
                     texto += "\n¡Los TRIPULANTES han ganado!\n"
 
-            # Actualizar estado visual del jugador eliminado
-            self.actualizar_estado_jugador(elected)
-
         messagebox.showinfo("Votación", texto, parent=self.game_window)
 
         # Si la partida terminó, deshabilitar botones
         if self.partida.is_over():
             self.mostrar_fin_partida()
 
-    def actualizar_estado_jugador(self, player_id: int):
-        """Actualiza la etiqueta de estado (vivo/eliminado) del jugador en la UI."""
-        if player_id < len(self.avatar_cards):
-            card = self.avatar_cards[player_id]
-            # Buscar la etiqueta de estado dentro del card (la segunda Label)
-            labels = [w for w in card.winfo_children() if isinstance(w, ttk.Label)]
-            if len(labels) >= 2:
-                state_label = labels[1]
-                state_label.config(text="Eliminado", foreground="red")
+    def _al_cerrar_ventana(self, event, window, vista):
+        # <Destroy> también llega por cada hijo; solo interesa la ventana
+        if event.widget is window:
+            vista.cerrar()
+            if self.vista is vista:
+                self.vista = None
 
     def adivinar_palabra(self):
         if not self.partida or self.partida.is_over():
@@ -299,6 +489,9 @@ class App:
         if not guess:
             return
         resultado = self.partida.guess(pid, guess)
+        if not resultado["valid"]:
+            messagebox.showinfo("Adivinanza", f"'{resultado['guess']}' no está en la lista de palabras.", parent=self.game_window)
+            return
         if resultado["correct"]:
             if resultado["is_impostor"]:
                 messagebox.showinfo("Adivinanza", f"El impostor (Jugador {pid}) adivinó correctamente. ¡Impostores ganan!", parent=self.game_window)
@@ -0,0 +1,420 @@
+# probabilidades.py
+# Probabilidades exactas de victoria por programación dinámica (sin muestreo).
+#
+# Las reglas de Partida.check_win y Partida.vote solo dependen del número de
+# impostores vivos (I) y tripulantes vivos (C): cada ronda los impostores pueden
+# adivinar la palabra y después se vota (expulsión de un impostor, de un tripulante
+# o de nadie por empate/abstención). Con modelos de adivinanza y de voto que den
+# esas probabilidades por estado (I, C), la probabilidad de victoria sale de una
+# recurrencia sobre una tabla (I+1) x (C+1).
+#
+# Uso:
+#   python probabilidades.py --jugadores 50 --impostores 5
+#   python probabilidades.py --jugadores 50 --impostores 5 --abstencion 0.1 --palabras 20
+#   python probabilidades.py --jugadores 200 --impostores 20 --tabla odds.tab   # precalcular / cargar
+#   python probabilidades.py --jugadores 10 --impostores 2 --verificar 100000  # contra Monte Carlo
+
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from partida import Partida
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+
+# Probabilidad por debajo de la cual ModeloVotoAleatorio omite términos
+_DESPRECIABLE = 1e-20
+
+
+# ================ Modelos ================
+class ModeloVoto:
+    """
+    probabilidades(I, C) -> (p_expulsar_impostor, p_expulsar_tripulante) en una
+    votación con I impostores y C tripulantes vivos; el resto es que no se expulse
+    a nadie (empate, abstenciones). clave() identifica el modelo y sus parámetros
+    (se guarda en las tablas precalculadas).
+    """
+    def probabilidades(self, impostores: int, tripulantes: int) -> Tuple[float, float]:
+        raise NotImplementedError
+
+    def clave(self) -> str:
+        raise NotImplementedError
+
+    def preparar(self, max_vivos: int):
+        """Aviso de que se consultarán estados de hasta max_vivos jugadores vivos."""
+
+
+class ModeloVotoUniforme(ModeloVoto):
+    """
+    Con probabilidad 1 - prob_nadie se expulsa a un jugador vivo elegido
+    uniformemente (un impostor con probabilidad I / (I + C)).
+    """
+    def __init__(self, prob_nadie: float = 0.0):
+        if not 0.0 <= prob_nadie <= 1.0:
+            raise ValueError("prob_nadie debe estar entre 0 y 1.")
+        self.prob_nadie = prob_nadie
+
+    def probabilidades(self, impostores, tripulantes):
+        vivos = impostores + tripulantes
+        expulsa = 1.0 - self.prob_nadie
+        return expulsa * impostores / vivos, expulsa * tripulantes / vivos
+
+    def clave(self) -> str:
+        return f"uniforme(prob_nadie={self.prob_nadie!r})"
+
+
+class ModeloVotoAleatorio(ModeloVoto):
+    """
+    Modelo exacto del voto al azar de PartidaBatch.votos_aleatorios: cada jugador
+    vivo se abstiene con probabilidad `abstencion` y si no vota a un jugador vivo
+    al azar (puede votarse a sí mismo); se expulsa al único más votado, así que
+    los empates cuentan como "nadie".
+
+    Por simetría todos los vivos tienen la misma probabilidad de ser el único más
+    votado, y basta P(máximo único) para n vivos. Se calcula con la recurrencia
+    G(c, r, b) = P(r votos al azar entre c jugadores dejan a todos con <= b), que
+    se va añadiendo jugador a jugador, solo para cuentas de votos hasta una cota K
+    (_max_votos, unas decenas) por encima de la cual la probabilidad es
+    despreciable (< 1e-20). Necesita NumPy; coste O(n^2 K^2) vectorizado.
+    """
+    def __init__(self, abstencion: float = 0.0):
+        if not _HAS_NUMPY:
+            raise RuntimeError("NumPy no está disponible.")
+        if not 0.0 <= abstencion < 1.0:
+            raise ValueError("abstencion debe estar en [0, 1).")
+        self.abstencion = abstencion
+        self._unico: List[float] = [0.0]     # índice n -> P(máximo único con n vivos)
+
+    def clave(self) -> str:
+        return f"aleatorio(abstencion={self.abstencion!r})"
+
+    def preparar(self, max_vivos: int):
+        if max_vivos >= len(self._unico):
+            self._calcular_unicos(max_vivos)
+
+    def probabilidades(self, impostores, tripulantes):
+        vivos = impostores + tripulantes
+        if vivos >= len(self._unico):
+            self._calcular_unicos(vivos)
+        u = self._unico[vivos]
+        return u * impostores / vivos, u * tripulantes / vivos
+
+    @staticmethod
+    def _binomiales(n: int, p: float, lg, columnas: Optional[int] = None, fila: Optional[int] = None):
+        """
+        Matriz (n+1, columnas) con pmf[r, t] = P(Binomial(r, p) = t) (por defecto
+        n+1 columnas); con `fila`, solo la fila r = fila (forma (1, columnas)).
+        """
+        r = np.arange(n + 1)[:, None] if fila is None else np.array([[fila]])
+        t = np.arange(n + 1 if columnas is None else columnas)[None, :]
+        validos = t <= r
+        if p >= 1.0:
+            return (t == r).astype(float)
+        with np.errstate(invalid="ignore"):
+            log_pmf = (lg[r] - lg[np.minimum(t, n)] - lg[np.maximum(r - t, 0)]
+                       + t * math.log(p) + (r - t) * math.log1p(-p))
+        return np.where(validos, np.exp(np.where(validos, log_pmf, 0.0)), 0.0)
+
+    @staticmethod
+    def _max_votos(n_max: int) -> int:
+        """
+        Cota K de votos por jugador: con r <= n votos entre c >= n - 1 jugadores,
+        P(alguno recibe más de K) <= n * (n / c)^K / K! <= n * 2^K / K!. Por
+        encima de K los términos suman menos de _DESPRECIABLE y se omiten.
+        """
+        k = 1
+        while k < n_max and n_max * 2.0 ** k / math.factorial(k) >= _DESPRECIABLE:
+            k += 1
+        return k
+
+    def _calcular_unicos(self, n_max: int):
+        """Rellena self._unico hasta n_max vivos."""
+        N = n_max
+        # Solo hacen falta cuentas de votos por jugador hasta K (exacto si K = N)
+        K = self._max_votos(N)
+        lg = np.array([math.lgamma(i + 1) for i in range(N + 1)])
+        filas = np.arange(N + 1)
+        # G[r, b] para c = 0 jugadores: solo es posible no repartir ningún voto
+        G = np.zeros((N + 1, K + 1))
+        G[0, :] = 1.0
+        unico = [0.0]
+        pmf_c = None
+        for n in range(1, N + 1):
+            c = n - 1
+            if c >= 1:
+                # Añadir el jugador c: recibe t ~ Binomial(r, 1/c) de los r votos
+                nuevo = np.zeros_like(G)
+                for t in range(K + 1):
+                    nuevo[t:, t:] += pmf_c[t:, t, None] * G[:N + 1 - t, t:]
+                G = nuevo
+            pmf_n = self._binomiales(N, 1.0 / n, lg, K + 2)
+            # Con m votos: el jugador 0 recibe k y los otros n-1 como mucho k-1
+            m = filas[:n + 1, None]
+            k = filas[None, 1:min(n, K + 1) + 1]
+            posibles = k <= m
+            sumandos = np.where(posibles, pmf_n[m, np.minimum(k, m)] * G[np.maximum(m - k, 0), k - 1], 0.0)
+            unico_m = n * sumandos.sum(axis=1)
+            votantes = self._binomiales(n, 1.0 - self.abstencion, lg, fila=n)[0]
+            unico.append(float(min(1.0, (votantes * unico_m).sum())))
+            pmf_c = pmf_n
+        self._unico = unico
+
+
+class ModeloAdivinanza:
+    """
+    Fase de adivinanza de cada ronda (antes de votar): cada impostor vivo intenta
+    adivinar con probabilidad `prob_intento` y acierta con `prob_acierto`
+    (por defecto 1 / palabras, una palabra al azar de la lista como en
+    simulacion.PoliticaAdivinanza). probabilidades(I, C) ->
+    (p_ganan_impostores, p_ganan_tripulantes) en esta fase.
+    """
+    def __init__(self, prob_intento: float = 0.5, palabras: int = 5, prob_acierto: Optional[float] = None):
+        self.prob_intento = prob_intento
+        self.prob_acierto = 1.0 / palabras if prob_acierto is None else prob_acierto
+
+    def probabilidades(self, impostores: int, tripulantes: int) -> Tuple[float, float]:
+        fallo = 1.0 - self.prob_intento * self.prob_acierto
+        return 1.0 - fallo ** impostores, 0.0
+
+    def clave(self) -> str:
+        return f"adivinanza(prob_intento={self.prob_intento!r}, prob_acierto={self.prob_acierto!r})"
+
+
+class SinAdivinanza(ModeloAdivinanza):
+    """Nadie adivina: la partida solo se decide votando."""
+    def __init__(self):
+        super().__init__(0.0, prob_acierto=0.0)
+
+
+# ================ Solucionador ================
+# Cabecera de las tablas: magia, versión, filas (I), columnas (C), longitud de la clave
+_CABECERA = struct.Struct("<4sHIIH")
+_MAGIA = b"IMPP"
+_VERSION = 1
+
+
+class Probabilidades:
+    """
+    P(ganan impostores) y P(ganan tripulantes) para cada estado (I, C).
+
+    La tabla se guarda por filas (una array('d') por número de impostores) y se
+    amplía al consultar estados fuera de ella, así que las consultas siguientes
+    dentro del mismo rango son una indexación. guardar()/cargar() la vuelcan a un
+    fichero binario que se lee sin recalcular nada.
+
+    En cada ronda: adivinanza (ga, gt), y si nadie gana, votación (pi, pc, p0):
+        V(I, C) = ga*(1,0) + gt*(0,1) + r*(pi*V(I-1, C) + pc*V(I, C-1) + p0*V(I, C)),
+    con r = 1 - ga - gt; se despeja V(I, C). Los estados terminales siguen a
+    Partida.check_win: I = 0 -> tripulantes; I >= C -> impostores. Si una ronda no
+    puede cambiar nada (p0 = 1 y nadie adivina) la partida no acaba y ambas son 0.
+    """
+    def __init__(self, voto: Optional[ModeloVoto] = None, adivinanza: Optional[ModeloAdivinanza] = None):
+        self.voto = voto or ModeloVotoUniforme()
+        self.adivinanza = adivinanza or SinAdivinanza()
+        self._imp: List[array] = []
+        self._trip: List[array] = []
+        self._columnas = 0
+
+    def clave(self) -> str:
+        return f"{self.voto.clave()};{self.adivinanza.clave()}"
+
+    @property
+    def dimensiones(self) -> Tuple[int, int]:
+        """(máximo I, máximo C) calculados."""
+        return len(self._imp) - 1, self._columnas - 1
+
+    def _estado(self, i: int, c: int) -> Tuple[float, float]:
+        if i == 0:
+            return 0.0, 1.0
+        if i >= c:
+            return 1.0, 0.0
+        ga, gt = self.adivinanza.probabilidades(i, c)
+        pi, pc = self.voto.probabilidades(i, c)
+        resto = 1.0 - ga - gt
+        p0 = 1.0 - pi - pc
+        den = 1.0 - resto * p0
+        if den <= 0.0:
+            return 0.0, 0.0
+        # V(I-1, C) ya está en la fila anterior y V(I, C-1) en esta misma fila
+        imp_i1, trip_i1 = self._imp[i - 1][c], self._trip[i - 1][c]
+        imp_c1, trip_c1 = self._imp[i][c - 1], self._trip[i][c - 1]
+        return ((ga + resto * (pi * imp_i1 + pc * imp_c1)) / den,
+                (gt + resto * (pi * trip_i1 + pc * trip_c1)) / den)
+
+    def _ampliar(self, max_i: int, max_c: int):
+        """Calcula los estados que falten hasta (max_i, max_c)."""
+        columnas = max(self._columnas, max_c + 1)
+        filas = max(len(self._imp), max_i + 1)
+        self.voto.preparar(filas + columnas - 2)
+        for i in range(filas):
+            if i == len(self._imp):
+                self._imp.append(array("d"))
+                self._trip.append(array("d"))
+            fila_imp, fila_trip = self._imp[i], self._trip[i]
+            for c in range(len(fila_imp), columnas):
+                # Las filas anteriores ya tienen `columnas` columnas
+                fila_imp.append(0.0)
+                fila_trip.append(0.0)
+                fila_imp[c], fila_trip[c] = self._estado(i, c)
+        self._columnas = columnas
+
+    def probabilidades(self, impostores: int, tripulantes: int) -> Tuple[float, float]:
+        """(P(ganan impostores), P(ganan tripulantes)) con I impostores y C tripulantes vivos."""
+        if impostores < 0 or tripulantes < 0:
+            raise ValueError("El número de jugadores vivos no puede ser negativo.")
+        if impostores >= len(self._imp) or tripulantes >= self._columnas:
+            self._ampliar(impostores, tripulantes)
+        return self._imp[impostores][tripulantes], self._trip[impostores][tripulantes]
+
+    def prob_impostores(self, num_players: int, num_impostors: int = 1) -> float:
+        """P(ganan impostores) al empezar una partida de num_players con num_impostors."""
+        return self.probabilidades(num_impostors, num_players - num_impostors)[0]
+
+    def de_partida(self, partida: Partida) -> Tuple[float, float]:
+        """Probabilidades en el estado actual de la partida (para mostrar en el juego)."""
+        if partida.over:
+            return (1.0, 0.0) if partida.winner == "impostores" else (0.0, 1.0)
+        return self.probabilidades(partida._impostores_vivos, partida._tripulantes_vivos)
+
+    # ---- Tablas precalculadas ----
+    def precalcular(self, max_jugadores: int):
+        """Calcula todos los estados de partidas de hasta max_jugadores."""
+        self._ampliar(max_jugadores // 2, max_jugadores)
+
+    def guardar(self, ruta: str):
+        """Vuelca la tabla (y la clave de los modelos) a `ruta` de forma atómica."""
+        clave = self.clave().encode("utf-8")
+        tmp = ruta + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_CABECERA.pack(_MAGIA, _VERSION, len(self._imp), self._columnas, len(clave)))
+            f.write(clave)
+            for fila in self._imp:
+                fila.tofile(f)
+            for fila in self._trip:
+                fila.tofile(f)
+        os.replace(tmp, ruta)
+
+    def cargar(self, ruta: str):
+        """
+        Sustituye la tabla por la de `ruta`. Lanza ValueError si el fichero no es
+        una tabla o se calculó con otros modelos (otra clave).
+        """
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        if len(datos) < _CABECERA.size:
+            raise ValueError(f"{ruta}: no es una tabla de probabilidades.")
+        magia, version, filas, columnas, n = _CABECERA.unpack_from(datos)
+        if magia != _MAGIA or version != _VERSION:
+            raise ValueError(f"{ruta}: no es una tabla de probabilidades.")
+        inicio = _CABECERA.size + n
+        clave = datos[_CABECERA.size:inicio].decode("utf-8")
+        if clave != self.clave():
+            raise ValueError(f"{ruta}: tabla calculada con otros modelos ({clave}).")
+        tam = columnas * 8
+        if len(datos) != inicio + 2 * filas * tam:
+            raise ValueError(f"{ruta}: tabla truncada.")
+        if sys.byteorder != "little":
+            raise ValueError("Las tablas se guardan en little-endian.")
+        tablas = []
+        for k in range(2 * filas):
+            fila = array("d")
+            fila.frombytes(datos[inicio + k * tam:inicio + (k + 1) * tam])
+            tablas.append(fila)
+        self._imp, self._trip = tablas[:filas], tablas[filas:]
+        self._columnas = columnas
+
+
+def verificar(num_players: int, num_impostors: int, partidas: int = 100000,
+              abstencion: float = 0.0, prob_intento: float = 0.0, palabras: int = 5,
+              seed: int = 0, z: float = 4.0) -> Tuple[float, float, Tuple[float, float]]:
+    """
+    Compara la probabilidad exacta (ModeloVotoAleatorio + ModeloAdivinanza) con
+    una simulación de `partidas` partidas en un PartidaBatch con las mismas reglas.
+    Devuelve (exacta, simulada, intervalo de Wilson con `z`); ValueError si la
+    exacta queda fuera del intervalo.
+    """
+    import lote
+    from simulacion import intervalo_wilson
+
+    adivinanza = ModeloAdivinanza(prob_intento, palabras)
+    exacta = Probabilidades(ModeloVotoAleatorio(abstencion), adivinanza).prob_impostores(num_players, num_impostors)
+    rng = np.random.default_rng(seed)
+    b = lote.PartidaBatch(partidas, num_players, num_impostors, seed=seed)
+    while not b.over.all():
+        activas = ~b.over
+        # Adivinanza de los impostores vivos de cada partida activa
+        p_adivina = 1.0 - (1.0 - adivinanza.prob_intento * adivinanza.prob_acierto) ** b.impostores_vivos
+        gana = activas & (rng.random(partidas) < p_adivina)
+        b.over[gana] = True
+        b.winner[gana] = lote.IMPOSTORES
+        votos = b.votos_aleatorios(rng, abstencion)
+        votos[b.over] = -1
+        b.vote_many(votos, perform_eject=True)
+    victorias = int((b.winner == lote.IMPOSTORES).sum())
+    bajo, alto = intervalo_wilson(victorias, partidas, z)
+    if not bajo <= exacta <= alto:
+        raise ValueError(f"La probabilidad exacta {exacta:.6f} queda fuera del intervalo "
+                         f"[{bajo:.6f}, {alto:.6f}] de la simulación ({victorias / partidas:.6f}).")
+    return exacta, victorias / partidas, (bajo, alto)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Probabilidades exactas de victoria de El Impostor.")
+    ap.add_argument("--jugadores", type=int, default=10)
+    ap.add_argument("--impostores", type=int, default=1)
+    ap.add_argument("--modelo", default="aleatorio", help="aleatorio (exacto) o uniforme")
+    ap.add_argument("--abstencion", type=float, default=0.0, help="modelo aleatorio")
+    ap.add_argument("--empate", type=float, default=0.0, help="modelo uniforme: probabilidad de no expulsar")
+    ap.add_argument("--prob-intento", type=float, default=0.0)
+    ap.add_argument("--palabras", type=int, default=5)
+    ap.add_argument("--tabla", help="fichero de tabla precalculada (se crea si no existe)")
+    ap.add_argument("--verificar", type=int, default=0, help="comparar con N partidas simuladas")
+    args = ap.parse_args(argv)
+
+    if args.modelo == "aleatorio":
+        if not _HAS_NUMPY:
+            print("NumPy no está disponible.", file=sys.stderr)
+            return 1
+        voto = ModeloVotoAleatorio(args.abstencion)
+    elif args.modelo == "uniforme":
+        voto = ModeloVotoUniforme(args.empate)
+    else:
+        ap.error(f"modelo desconocido: {args.modelo}")
+    sol = Probabilidades(voto, ModeloAdivinanza(args.prob_intento, args.palabras))
+
+    t0 = time.perf_counter()
+    if args.tabla and os.path.exists(args.tabla):
+        sol.cargar(args.tabla)
+        print(f"Tabla {args.tabla} cargada ({sol.dimensiones}) en {(time.perf_counter() - t0) * 1e3:.2f} ms")
+        t0 = time.perf_counter()
+    p_imp, p_trip = sol.probabilidades(args.impostores, args.jugadores - args.impostores)
+    dt = time.perf_counter() - t0
+    print(f"{args.jugadores} jugadores, {args.impostores} impostores: "
+          f"P(impostores) = {p_imp:.6f} | P(tripulantes) = {p_trip:.6f} ({dt * 1e3:.2f} ms)")
+    if args.tabla and not os.path.exists(args.tabla):
+        sol.guardar(args.tabla)
+        print(f"Tabla guardada en {args.tabla} ({sol.dimensiones})")
+    if args.verificar:
+        if not _HAS_NUMPY:
+            print("NumPy no está disponible.", file=sys.stderr)
+            return 1
+        exacta, simulada, (bajo, alto) = verificar(args.jugadores, args.impostores, args.verificar,
+                                                   args.abstencion, args.prob_intento, args.palabras)
+        print(f"Simulación: {simulada:.6f} [{bajo:.6f}, {alto:.6f}] | exacta {exacta:.6f}: ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
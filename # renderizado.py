@@ -0,0 +1,207 @@
+# renderizado.py
+# Renderizado sin Tk ni display: compone la sala entera (fondo, avatares, nombres y
+# estado vivo/eliminado) en una imagen de Pillow, con las mismas reglas visuales que
+# la ventana de juego. Pensado para espectadores, repeticiones y miniaturas.
+#
+# Uso:
+#   python renderizado.py --jugadores 12 --salida frames/      # partida de prueba -> PNGs
+#   python renderizado.py --jugadores 12 --medir 500           # frames por segundo
+
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import graficos
+from graficos import Graficos
+from partida import Partida
+
+# Aspecto de las tarjetas (equivalente a la tarjeta ttk "ridge" de la ventana de juego)
+COLOR_TARJETA = "#f0f0f0"
+COLOR_BORDE_TARJETA = "#a0a0a0"
+COLOR_VIVO = "green"
+COLOR_ELIMINADO = "red"
+ALTO_CABECERA = 32
+
+
+class RenderizadorSala:
+    """
+    Compone partidas en imágenes RGB de width x height.
+
+    - El fondo escalado se calcula una vez por tamaño (de la imagen de fondo del
+      Graficos o su color bg).
+    - Cada tarjeta (avatar + nombre + estado) se rasteriza una vez y se guarda en
+      una caché LRU por (jugador, nombre, vivo); los avatares se comparten entre
+      jugadores con los mismos rasgos.
+    Así, un frame nuevo es una copia del fondo más un pegado por tarjeta visible.
+    """
+    def __init__(self,
+                 width: int = 1280,
+                 height: int = 720,
+                 g: Optional[Graficos] = None,
+                 card_w: int = 150,
+                 card_h: int = 200,
+                 avatar_size: int = 100,
+                 max_tarjetas: int = 4096):
+        if not graficos._pil():
+            raise RuntimeError("El renderizado necesita Pillow (PIL).")
+        from PIL import ImageFont
+        self.width = width
+        self.height = height
+        self.g = g if g is not None else Graficos()
+        self.card_w = card_w
+        self.card_h = card_h
+        self.avatar_size = avatar_size
+        self.max_tarjetas = max_tarjetas
+        self.cols = max(1, width // card_w)
+        self.filas = max(1, (height - ALTO_CABECERA) // card_h)
+        try:
+            self._fuente = ImageFont.load_default(size=14)
+        except TypeError:
+            # Pillow < 10.1: fuente bitmap sin tamaño
+            self._fuente = ImageFont.load_default()
+        self._fondo = None          # (clave, imagen RGB)
+        self._avatares = {}         # (color, boca, tamaño, borde) -> RGBA
+        self._tarjetas: "OrderedDict[tuple, object]" = OrderedDict()
+
+    @property
+    def por_pagina(self) -> int:
+        return self.cols * self.filas
+
+    # ---- Recursos cacheados ----
+    def _imagen_fondo(self):
+        clave = (self.g.version_fondo, self.g.bg)
+        if self._fondo is None or self._fondo[0] != clave:
+            img = self.g.fondo_pil(self.width, self.height)
+            if img is None:
+                img = graficos.Image.new("RGB", (self.width, self.height), self.g.bg)
+            self._fondo = (clave, img)
+        return self._fondo[1]
+
+    def _avatar(self, pid: int):
+        color, boca = self.g.rasgos_avatar(pid)
+        clave = (color, boca, self.avatar_size, self.g.default_with_border)
+        img = self._avatares.get(clave)
+        if img is None:
+            img = self._avatares[clave] = self.g.rasterizar_avatar(color, boca, self.avatar_size)
+        return img
+
+    def _tarjeta(self, pid: int, nombre: str, vivo: bool):
+        clave = (pid, nombre, vivo)
+        img = self._tarjetas.get(clave)
+        if img is not None:
+            self._tarjetas.move_to_end(clave)
+            return img
+        w, h = self.card_w - 12, self.card_h - 12
+        img = graficos.Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        d = graficos.ImageDraw.Draw(img)
+        d.rectangle((0, 0, w - 1, h - 1), fill=COLOR_TARJETA, outline=COLOR_BORDE_TARJETA, width=2)
+        avatar = self._avatar(pid)
+        ax = (w - self.avatar_size) // 2
+        img.alpha_composite(avatar, (ax, 8))
+        y = 8 + self.avatar_size + 8
+        d.text((w / 2, y), nombre, fill="black", font=self._fuente, anchor="ma")
+        d.text((w / 2, y + 22), "Vivo" if vivo else "Eliminado",
+               fill=COLOR_VIVO if vivo else COLOR_ELIMINADO, font=self._fuente, anchor="ma")
+        self._tarjetas[clave] = img
+        while len(self._tarjetas) > self.max_tarjetas:
+            self._tarjetas.popitem(last=False)
+        return img
+
+    # ---- Frames ----
+    def cabecera(self, partida: Partida, desde: int = 0) -> str:
+        """Texto de estado (igual que la ventana de juego) más el rango mostrado."""
+        texto = f"Jugadores: {partida.num_players} | Vivos: {partida.alive.count(1)}"
+        if partida.winner == "impostores":
+            texto += " | Ganan los IMPOSTORES"
+        elif partida.winner == "tripulantes":
+            texto += " | Ganan los TRIPULANTES"
+        hasta = min(partida.num_players, desde + self.por_pagina)
+        if desde > 0 or hasta < partida.num_players:
+            texto += f" | Mostrando {desde}-{hasta - 1}"
+        return texto
+
+    def render(self, partida: Partida, desde: int = 0):
+        """Imagen RGB de la sala mostrando los jugadores desde `desde` (los que quepan)."""
+        frame = self._imagen_fondo().copy()
+        d = graficos.ImageDraw.Draw(frame)
+        d.rectangle((0, 0, self.width, ALTO_CABECERA - 4), fill=COLOR_TARJETA)
+        d.text((10, (ALTO_CABECERA - 4) / 2), self.cabecera(partida, desde), fill="black",
+               font=self._fuente, anchor="lm")
+        hasta = min(partida.num_players, desde + self.por_pagina)
+        alive = partida.alive
+        for i, pid in enumerate(range(desde, hasta)):
+            tarjeta = self._tarjeta(pid, partida.get_player_name(pid), bool(alive[pid]))
+            x = (i % self.cols) * self.card_w + 6
+            y = ALTO_CABECERA + (i // self.cols) * self.card_h + 6
+            frame.paste(tarjeta, (x, y), tarjeta)
+        return frame
+
+    def guardar(self, partida: Partida, ruta: str, desde: int = 0):
+        """Guarda el frame (el formato sale de la extensión: .png, .jpg, .webp...)."""
+        self.render(partida, desde).save(ruta)
+
+    def miniatura(self, partida: Partida, ancho: int = 320):
+        """Frame reducido para archivos y listados."""
+        frame = self.render(partida)
+        alto = max(1, round(self.height * ancho / self.width))
+        return frame.reduce(max(1, self.width // ancho)).resize((ancho, alto), graficos.Image.BILINEAR)
+
+    def frames(self, estados: Iterable[Partida], desde: int = 0) -> Iterator:
+        """Un frame por estado (p. ej. la misma partida tras cada expulsión)."""
+        for partida in estados:
+            yield self.render(partida, desde)
+
+
+def _partida_de_prueba(jugadores: int, seed: int) -> Iterator[Partida]:
+    """Juega una partida aleatoria y devuelve la misma Partida tras cada votación."""
+    rng = random.Random(seed)
+    p = Partida(num_players=jugadores, num_impostors=max(1, jugadores // 6), seed=seed)
+    yield p
+    while not p.is_over():
+        vivos = [i for i in range(p.num_players) if p.alive[i]]
+        p.vote({v: rng.choice(vivos) for v in vivos}, perform_eject=True)
+        yield p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Renderizado de salas sin display")
+    parser.add_argument("--jugadores", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tamano", default="1280x720", help="ANCHOxALTO del frame")
+    parser.add_argument("--fondo", help="imagen de fondo")
+    parser.add_argument("--salida", help="directorio donde escribir un PNG por ronda")
+    parser.add_argument("--medir", type=int, default=0, help="renderizar N frames y mostrar frames por segundo")
+    args = parser.parse_args(argv)
+
+    ancho, alto = (int(v) for v in args.tamano.lower().split("x"))
+    g = Graficos(max_background_size=(ancho, alto))
+    if args.fondo and not g.set_background(args.fondo):
+        print(f"No se pudo cargar el fondo {args.fondo}", file=sys.stderr)
+    r = RenderizadorSala(ancho, alto, g)
+
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        for i, frame in enumerate(r.frames(_partida_de_prueba(args.jugadores, args.seed))):
+            frame.save(os.path.join(args.salida, f"ronda{i:03d}.png"))
+        print(f"{i + 1} frames en {args.salida}")
+    if args.medir:
+        estados = []
+        for p in _partida_de_prueba(args.jugadores, args.seed):
+            estados.append(Partida.from_dict(p.to_dict()))
+        r.render(estados[0])
+        t0 = time.perf_counter()
+        for i in range(args.medir):
+            r.render(estados[i % len(estados)])
+        dt = time.perf_counter() - t0
+        print(f"{args.medir} frames de {ancho}x{alto} con {args.jugadores} jugadores: "
+              f"{args.medir / dt:.0f} frames/s ({dt / args.medir * 1e3:.2f} ms/frame)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
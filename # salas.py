@@ -0,0 +1,288 @@
+# salas.py
+# Registro de salas (Partida por id) con límite de memoria, expulsión LRU/TTL y volcado a disco.
+
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional
+
+from partida import Partida, PartidaConcurrente
+
+# Clases que se pueden recargar de disco (por nombre, tal como se vuelcan)
+CLASES = {cls.__name__: cls for cls in (Partida, PartidaConcurrente)}
+# Nombres de fichero: "r" + id en base32 (sin distinguir mayúsculas) si cabe; si no,
+# "h" + sha1 del id, y el id se lee del fichero al indexar
+_MAX_NOMBRE = 200
+
+
+def _con_oyentes(partida: Partida) -> bool:
+    return bool(partida._oyentes)
+
+
+def estimar_bytes(partida: Partida) -> int:
+    """Estimación de la memoria ocupada por una partida (objeto, bytearrays y nombres)."""
+    total = sys.getsizeof(partida) + sys.getsizeof(partida.alive) + sys.getsizeof(partida._roles)
+    if partida._names is not None:
+        total += sys.getsizeof(partida._names) + sum(sys.getsizeof(n) for n in partida._names)
+    return total
+
+
+class RegistroSalas:
+    """
+    Guarda partidas por id de sala con un tope de memoria.
+
+    - Las salas en memoria se mantienen en orden LRU (OrderedDict).
+    - Si se supera max_salas o max_bytes, se expulsan las menos usadas.
+    - Las salas sin uso durante `ttl` segundos (o `ttl_terminadas` si la partida
+      ya terminó) se expulsan al barrer, que se hace en cada acceso.
+    - Si hay `directorio`, las salas expulsadas se vuelcan a disco en JSON (con su
+      clase, Partida o PartidaConcurrente) y se recargan al pedirlas; si no, se
+      descartan.
+    - Las salas con suscriptores (Bitacora, FeedCambios, VistaPartida...) no se
+      expulsan: los oyentes no sobreviven al volcado. volcar_todo() sí las vuelca;
+      `al_recargar(room, partida)` permite volver a enganchar los oyentes al
+      recargar una sala de disco.
+    - `al_expulsar(room, partida)` se llama al sacar una sala de memoria (volcada
+      o descartada), p. ej. para soltar lo que apunta a esa instancia.
+
+    Se usa como un dict: registro[id], registro.get(id), id in registro, registro.pop(id).
+    descartar(id) la elimina sin recargarla.
+    """
+    def __init__(self,
+                 max_salas: int = 10000,
+                 max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 ttl_terminadas: Optional[float] = None,
+                 directorio: Optional[str] = None,
+                 reloj: Callable[[], float] = time.monotonic,
+                 al_recargar: Optional[Callable[[str, Partida], None]] = None,
+                 al_expulsar: Optional[Callable[[str, Partida], None]] = None):
+        self.max_salas = max_salas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttl_terminadas = ttl_terminadas if ttl_terminadas is not None else ttl
+        self.directorio = directorio
+        self.reloj = reloj
+        self.al_recargar = al_recargar
+        self.al_expulsar = al_expulsar
+        # id -> [partida, ultimo_uso, bytes_estimados]; el primero es el menos usado
+        self._memoria: "OrderedDict[str, list]" = OrderedDict()
+        self._en_disco = set()
+        self._bytes = 0
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+            self._indexar_disco()
+
+        # Contadores
+        self.aciertos = 0        # sala encontrada en memoria
+        self.fallos = 0          # sala inexistente
+        self.recargas = 0        # sala recargada desde disco
+        self.expulsiones = 0     # salas sacadas de memoria
+        self.volcados = 0        # salas escritas a disco
+
+    # ================ Interfaz tipo dict ================
+    def get(self, room: str, default=None) -> Optional[Partida]:
+        """Devuelve la partida de la sala (recargándola de disco si hace falta) o `default`."""
+        self.barrer()
+        entrada = self._memoria.get(room)
+        if entrada is not None:
+            self.aciertos += 1
+            entrada[1] = self.reloj()
+            self._memoria.move_to_end(room)
+            return entrada[0]
+        if room in self._en_disco:
+            partida = self._cargar(room)
+            self.recargas += 1
+            self._insertar(room, partida)
+            if self.al_recargar is not None:
+                self.al_recargar(room, partida)
+            return partida
+        self.fallos += 1
+        return default
+
+    def __getitem__(self, room: str) -> Partida:
+        partida = self.get(room)
+        if partida is None:
+            raise KeyError(room)
+        return partida
+
+    def __setitem__(self, room: str, partida: Partida):
+        self.barrer()
+        self._quitar_de_memoria(room)
+        self._borrar_de_disco(room)
+        self._insertar(room, partida)
+
+    def __contains__(self, room: str) -> bool:
+        return room in self._memoria or room in self._en_disco
+
+    def __len__(self) -> int:
+        return len(self._memoria) + len(self._en_disco)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._memoria)
+        yield from list(self._en_disco)
+
+    def pop(self, room: str, default=None) -> Optional[Partida]:
+        """
+        Elimina la sala (de memoria y de disco) y devuelve su partida o `default`.
+        Una sala volcada se lee del fichero sin volver a memoria: no cuenta como
+        recarga ni llama a al_recargar.
+        """
+        partida = self._quitar_de_memoria(room)
+        if partida is None and room in self._en_disco:
+            partida = self._cargar(room)
+        return default if partida is None else partida
+
+    def descartar(self, room: str) -> bool:
+        """Elimina la sala sin leerla (el volcado se borra sin abrirlo). True si existía."""
+        existia = self._quitar_de_memoria(room) is not None or room in self._en_disco
+        self._borrar_de_disco(room)
+        return existia
+
+    # ================ Expulsión ================
+    def barrer(self):
+        """
+        Expulsa las salas inactivas según TTL. Solo mira la cabeza LRU: el coste es
+        el número de salas caducadas que encuentra allí. Las que tienen suscriptores
+        no se expulsan sino que pasan al final como recién usadas, así que cada una
+        se vuelve a mirar como mucho una vez por ttl (en cada llamada si ttl es 0).
+        """
+        if self.ttl is None and self.ttl_terminadas is None:
+            return
+        ahora = self.reloj()
+        # Con ttl_terminadas < ttl, una partida terminada puede caducar sin estar en cabeza;
+        # se detectará cuando llegue a ella (el orden LRU es el de último uso).
+        for _ in range(len(self._memoria)):
+            room, entrada = next(iter(self._memoria.items()))
+            partida, ultimo, _ = entrada
+            ttl = self.ttl_terminadas if partida.is_over() else self.ttl
+            if ttl is None or ahora - ultimo < ttl:
+                break
+            if _con_oyentes(partida):
+                # Alguien la sigue: cuenta como uso
+                entrada[1] = ahora
+                self._memoria.move_to_end(room)
+                continue
+            self._expulsar(room)
+
+    def _insertar(self, room: str, partida: Partida):
+        nbytes = estimar_bytes(partida)
+        self._memoria[room] = [partida, self.reloj(), nbytes]
+        self._bytes += nbytes
+        while len(self._memoria) > 1 and (
+                len(self._memoria) > self.max_salas or
+                (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            # La menos usada sin suscriptores (si todas tienen, se supera el tope)
+            victima = next((r for r, e in self._memoria.items() if r != room and not _con_oyentes(e[0])), None)
+            if victima is None:
+                break
+            self._expulsar(victima)
+
+    def _expulsar(self, room: str):
+        partida = self._quitar_de_memoria(room)
+        if partida is None:
+            return
+        self.expulsiones += 1
+        if self.directorio:
+            self._volcar(room, partida)
+        if self.al_expulsar is not None:
+            self.al_expulsar(room, partida)
+
+    def _quitar_de_memoria(self, room: str) -> Optional[Partida]:
+        entrada = self._memoria.pop(room, None)
+        if entrada is None:
+            return None
+        self._bytes -= entrada[2]
+        return entrada[0]
+
+    # ================ Disco ================
+    def _ruta(self, room: str) -> str:
+        crudo = room.encode("utf-8")
+        nombre = "r" + base64.b32encode(crudo).decode("ascii").rstrip("=").lower()
+        if len(nombre) > _MAX_NOMBRE:
+            nombre = "h" + hashlib.sha1(crudo).hexdigest()
+        return os.path.join(self.directorio, f"{nombre}.json")
+
+    @staticmethod
+    def _room_de_nombre(nombre: str) -> Optional[str]:
+        """Id de sala codificado en un nombre "r...", o None si hay que leer el fichero."""
+        if not nombre.startswith("r"):
+            return None
+        codigo = nombre[1:].upper()
+        try:
+            return base64.b32decode(codigo + "=" * (-len(codigo) % 8)).decode("utf-8")
+        except ValueError:
+            return None
+
+    def _volcar(self, room: str, partida: Partida):
+        ruta = self._ruta(room)
+        tmp = ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"room": room, "clase": type(partida).__name__, "partida": partida.to_dict()},
+                      f, ensure_ascii=False)
+        os.replace(tmp, ruta)
+        self._en_disco.add(room)
+        self.volcados += 1
+
+    def _cargar(self, room: str) -> Partida:
+        ruta = self._ruta(room)
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        clase = CLASES.get(datos.get("clase", "Partida"))
+        if clase is None:
+            raise ValueError(f"Sala {room!r}: clase desconocida {datos['clase']!r}.")
+        partida = clase.from_dict(datos["partida"])
+        os.remove(ruta)
+        self._en_disco.discard(room)
+        return partida
+
+    def _borrar_de_disco(self, room: str):
+        if room in self._en_disco:
+            self._en_disco.discard(room)
+            try:
+                os.remove(self._ruta(room))
+            except OSError:
+                pass
+
+    def _indexar_disco(self):
+        """Registra las salas volcadas por una ejecución anterior (por el nombre del fichero)."""
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(".json"):
+                continue
+            room = self._room_de_nombre(nombre[:-len(".json")])
+            if room is not None:
+                self._en_disco.add(room)
+                continue
+            # Solo los ids demasiado largos para el nombre necesitan leer el fichero
+            try:
+                with open(os.path.join(self.directorio, nombre), encoding="utf-8") as f:
+                    self._en_disco.add(json.load(f)["room"])
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def volcar_todo(self):
+        """
+        Vuelca a disco todas las salas en memoria (p. ej. antes de apagar el proceso),
+        también las que tienen suscriptores: sus oyentes se pierden.
+        """
+        if not self.directorio:
+            return
+        for room in list(self._memoria):
+            self._expulsar(room)
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Contadores de uso y ocupación actual."""
+        return {
+            "en_memoria": len(self._memoria),
+            "en_disco": len(self._en_disco),
+            "bytes_estimados": self._bytes,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "recargas": self.recargas,
+            "expulsiones": self.expulsiones,
+            "volcados": self.volcados,
+        }
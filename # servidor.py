@@ -0,0 +1,390 @@
+# servidor.py
+# Servidor asyncio multi-sala que expone la API de Partida con un protocolo JSON por líneas.
+# Uso: python servidor.py [--host 127.0.0.1 --port 8765 | --unix /tmp/impostor.sock] [--demo]
+#
+# Cada petición es una línea JSON: {"id": 1, "op": "create", ...}
+# Cada respuesta es una línea JSON: {"id": 1, "ok": true, "result": {...}}
+#                               o:  {"id": 1, "ok": false, "error": "mensaje"}
+# Operaciones:
+#  - create  {num_players | player_names, num_impostors?, words?, seed?, matching?} -> {room, seed, num_players}
+#            (matching: opciones de coincidencia.Coincidencia, p. ej. {"max_distancia": 1};
+#             max_distancia como mucho coincidencia.MAX_DISTANCIA)
+#  - role    {room, player}                 -> {role, word}
+#  - guess   {room, player, word}           -> resultado de Partida.guess
+#  - vote    {room, votes: {voter: voted}, eject?} -> resultado de Partida.vote
+#  - vote_open  {room}                     -> abre una votación incremental en la sala
+#  - vote_cast  {room, votes: {voter: voted}} -> {rejected: {voter: motivo}, leader, votes, tie}
+#  - vote_close {room, eject?}             -> resultado de Partida.vote
+#  - eject   {room, player}                 -> resultado de Partida.eject
+#  - state   {room}                         -> {summary, alive, over, winner}
+#  - delete  {room}                         -> {deleted}
+#  - stats   {}                             -> contadores del registro de salas
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from typing import Any, Dict, Optional
+
+from coincidencia import Coincidencia, entradas_indice
+from partida import DEFAULT_WORDS, Partida, SesionVotacion
+from salas import RegistroSalas
+
+# Tamaño máximo de una línea de petición (las más largas cierran la conexión)
+MAX_LINEA = 64 * 1024
+# Por encima de este volumen pendiente de envío se espera a que el cliente lea
+LIMITE_ESCRITURA = 256 * 1024
+# Tamaño máximo de una sala creada por un cliente (jugadores y palabras)
+MAX_JUGADORES = 1000
+MAX_PALABRAS = 10000
+# Longitud máxima de una palabra de la lista o de una adivinanza
+MAX_LONGITUD_PALABRA = 32
+# Entradas máximas del índice de vecindad de una sala con matching.solo_conocidas
+# (se construye dentro del bucle de eventos: 200000 entradas son unas décimas de segundo)
+MAX_ENTRADAS_INDICE = 200000
+
+
+class ErrorProtocolo(Exception):
+    """Petición inválida: se responde con ok=false sin cerrar la conexión."""
+
+
+class ServidorPartidas:
+    """
+    Aloja muchas salas (Partida) en un único bucle de eventos.
+
+    Las operaciones de Partida son síncronas y acotadas, así que cada petición
+    se resuelve sin ceder el bucle; la latencia por petición no depende del
+    número de salas. Cada conexión procesa sus peticiones en orden y no lee la
+    siguiente hasta haber podido encolar la respuesta (contrapresión).
+    """
+    def __init__(self, max_salas: int = 100000, registro: Optional[RegistroSalas] = None,
+                 max_jugadores: int = MAX_JUGADORES, max_palabras: int = MAX_PALABRAS):
+        self.max_salas = max_salas
+        self.max_jugadores = max_jugadores
+        self.max_palabras = max_palabras
+        # Las salas inactivas o terminadas las gestiona el registro (LRU/TTL/disco)
+        self.salas = registro if registro is not None else RegistroSalas()
+        # Votaciones incrementales abiertas por sala
+        self.votaciones: Dict[str, SesionVotacion] = {}
+        self._al_expulsar_registro = self.salas.al_expulsar
+        self.salas.al_expulsar = self._al_expulsar
+        self._ids = itertools.count(1)
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    # ================ Despacho ================
+    def despachar(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """Ejecuta una petición ya decodificada y devuelve el dict de respuesta."""
+        resp: Dict[str, Any] = {"id": msg.get("id")}
+        try:
+            op = msg.get("op")
+            metodo = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+            if metodo is None:
+                raise ErrorProtocolo(f"Operación desconocida: {op!r}")
+            resp["ok"] = True
+            resp["result"] = metodo(msg)
+        except (ErrorProtocolo, ValueError, TypeError, AttributeError) as e:
+            resp["ok"] = False
+            resp["error"] = str(e)
+        except Exception as e:
+            # Un fallo inesperado en una petición no debe tumbar la conexión ni el bucle
+            resp["ok"] = False
+            resp["error"] = f"Error interno: {type(e).__name__}"
+        return resp
+
+    def _al_expulsar(self, room: str, partida: Partida):
+        # La sesión apunta a la instancia expulsada: al recargar la sala sería otra
+        self.votaciones.pop(room, None)
+        if self._al_expulsar_registro is not None:
+            self._al_expulsar_registro(room, partida)
+
+    def _sala(self, msg: Dict[str, Any]) -> Partida:
+        partida = self.salas.get(str(msg.get("room")))
+        if partida is None:
+            raise ErrorProtocolo(f"Sala inexistente: {msg.get('room')!r}")
+        return partida
+
+    @staticmethod
+    def _jugador(partida: Partida, valor: Any) -> int:
+        if not isinstance(valor, int) or isinstance(valor, bool) or not 0 <= valor < partida.num_players:
+            raise ErrorProtocolo(f"Jugador inválido: {valor!r}")
+        return valor
+
+    def _limitar(self, msg: Dict[str, Any]) -> None:
+        """Rechaza salas más grandes de lo configurado antes de construirlas."""
+        n = msg.get("num_players")
+        if isinstance(n, (int, float)) and n > self.max_jugadores:
+            raise ErrorProtocolo(f"Demasiados jugadores: {n} (máximo {self.max_jugadores}).")
+        nombres = msg.get("player_names")
+        if isinstance(nombres, (list, tuple)) and len(nombres) > self.max_jugadores:
+            raise ErrorProtocolo(f"Demasiados jugadores: {len(nombres)} (máximo {self.max_jugadores}).")
+        palabras = msg.get("words")
+        if isinstance(palabras, (list, tuple)):
+            if len(palabras) > self.max_palabras:
+                raise ErrorProtocolo(f"Demasiadas palabras: {len(palabras)} (máximo {self.max_palabras}).")
+            if any(isinstance(w, str) and len(w) > MAX_LONGITUD_PALABRA for w in palabras):
+                raise ErrorProtocolo(f"Palabra demasiado larga (máximo {MAX_LONGITUD_PALABRA} letras).")
+
+    @staticmethod
+    def _coincidencia(msg: Dict[str, Any]) -> Coincidencia:
+        """Valida las opciones de coincidencia del cliente y acota el índice que harían construir."""
+        try:
+            coincidencia = Coincidencia.desde_dict(msg.get("matching"))
+        except ValueError as e:
+            raise ErrorProtocolo(str(e))
+        if coincidencia.solo_conocidas and coincidencia.max_distancia > 0:
+            palabras = msg.get("words")
+            if not isinstance(palabras, (list, tuple)):
+                palabras = DEFAULT_WORDS
+            palabras = [w for w in palabras if isinstance(w, str)]
+            if entradas_indice(palabras, coincidencia.max_distancia) > MAX_ENTRADAS_INDICE:
+                raise ErrorProtocolo("Lista de palabras demasiado grande para solo_conocidas con "
+                                     f"max_distancia={coincidencia.max_distancia}.")
+        return coincidencia
+
+    def _nuevo_id(self) -> str:
+        """Id generado que no pisa salas existentes (incluidas las elegidas por clientes)."""
+        room = f"s{next(self._ids)}"
+        while room in self.salas:
+            room = f"s{next(self._ids)}"
+        return room
+
+    def _op_create(self, msg):
+        if len(self.salas) >= self.max_salas:
+            raise ErrorProtocolo("Límite de salas alcanzado.")
+        self._limitar(msg)
+        coincidencia = self._coincidencia(msg)
+        partida = Partida(num_players=msg.get("num_players"),
+                          player_names=msg.get("player_names"),
+                          num_impostors=msg.get("num_impostors"),
+                          words=msg.get("words"),
+                          seed=msg.get("seed"),
+                          coincidencia=coincidencia)
+        room = str(msg.get("room") or self._nuevo_id())
+        if room in self.salas:
+            raise ErrorProtocolo(f"La sala {room!r} ya existe.")
+        self.salas[room] = partida
+        return {"room": room, "seed": partida.seed, "num_players": partida.num_players}
+
+    def _op_role(self, msg):
+        partida = self._sala(msg)
+        pid = self._jugador(partida, msg.get("player"))
+        return {"role": partida.get_player_role(pid), "word": partida.get_player_word(pid)}
+
+    def _op_guess(self, msg):
+        partida = self._sala(msg)
+        pid = self._jugador(partida, msg.get("player"))
+        palabra = msg.get("word")
+        if not isinstance(palabra, str):
+            raise ErrorProtocolo("Falta la palabra.")
+        if len(palabra) > MAX_LONGITUD_PALABRA:
+            raise ErrorProtocolo(f"Palabra demasiado larga (máximo {MAX_LONGITUD_PALABRA} letras).")
+        if partida.is_over():
+            raise ErrorProtocolo("La partida ya terminó.")
+        return partida.guess(pid, palabra)
+
+    def _op_vote(self, msg):
+        partida = self._sala(msg)
+        votos = msg.get("votes")
+        if not isinstance(votos, dict):
+            raise ErrorProtocolo("votes debe ser un objeto {votante: votado}.")
+        if partida.is_over():
+            raise ErrorProtocolo("La partida ya terminó.")
+        # Las claves JSON son cadenas: convertir a índices de jugador
+        try:
+            votos = {self._jugador(partida, int(k)): self._jugador(partida, v) for k, v in votos.items()}
+        except ValueError:
+            raise ErrorProtocolo("Votante inválido.")
+        return partida.vote(votos, perform_eject=bool(msg.get("eject", False)))
+
+    def _op_vote_open(self, msg):
+        partida = self._sala(msg)
+        if partida.is_over():
+            raise ErrorProtocolo("La partida ya terminó.")
+        self.votaciones[str(msg.get("room"))] = partida.abrir_votacion()
+        return {"open": True}
+
+    def _sesion(self, msg) -> SesionVotacion:
+        room = str(msg.get("room"))
+        sesion = self.votaciones.get(room)
+        if sesion is None:
+            raise ErrorProtocolo(f"No hay votación abierta en la sala {room!r}.")
+        # Si la sala se volcó a disco y se recargó, la sesión apunta a otra instancia
+        if self._sala(msg) is not sesion.partida:
+            del self.votaciones[room]
+            raise ErrorProtocolo("La sala se recargó y la votación se ha cancelado.")
+        return sesion
+
+    def _op_vote_cast(self, msg):
+        sesion = self._sesion(msg)
+        votos = msg.get("votes")
+        if not isinstance(votos, dict):
+            raise ErrorProtocolo("votes debe ser un objeto {votante: votado}.")
+        try:
+            votos = {int(k): v for k, v in votos.items()}
+        except ValueError:
+            raise ErrorProtocolo("Votante inválido.")
+        rechazados = sesion.votar_lote(votos)
+        lider, max_votos = sesion.lider()
+        return {"rejected": rechazados, "leader": lider, "votes": max_votos, "tie": sesion.hay_empate()}
+
+    def _op_vote_close(self, msg):
+        sesion = self._sesion(msg)
+        del self.votaciones[str(msg.get("room"))]
+        return sesion.cerrar(perform_eject=bool(msg.get("eject", False)))
+
+    def _op_eject(self, msg):
+        partida = self._sala(msg)
+        return partida.eject(self._jugador(partida, msg.get("player")))
+
+    def _op_state(self, msg):
+        partida = self._sala(msg)
+        return {"summary": partida.summary(), "alive": [bool(a) for a in partida.alive],
+                "over": partida.over, "winner": partida.winner}
+
+    def _op_delete(self, msg):
+        self.votaciones.pop(str(msg.get("room")), None)
+        return {"deleted": self.salas.descartar(str(msg.get("room")))}
+
+    def _op_stats(self, msg):
+        return self.salas.estadisticas()
+
+    # ================ Red ================
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.transport.set_write_buffer_limits(high=LIMITE_ESCRITURA)
+        try:
+            while True:
+                try:
+                    linea = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    resp = {"id": None, "ok": False, "error": "Línea demasiado larga."}
+                    writer.write(json.dumps(resp, ensure_ascii=False).encode() + b"\n")
+                    break
+                if not linea:
+                    break
+                try:
+                    msg = json.loads(linea)
+                    if not isinstance(msg, dict):
+                        raise ValueError
+                except ValueError:
+                    resp = {"id": None, "ok": False, "error": "JSON inválido."}
+                else:
+                    resp = self.despachar(msg)
+                writer.write(json.dumps(resp, ensure_ascii=False).encode() + b"\n")
+                # Solo bloquea si el cliente no está leyendo (buffer por encima del límite)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Escucha en TCP. Devuelve el servidor asyncio (port=0 elige uno libre)."""
+        self._servidor = await asyncio.start_server(self._atender, host, port, limit=MAX_LINEA)
+        return self._servidor
+
+    async def iniciar_unix(self, path: str) -> asyncio.AbstractServer:
+        """Escucha en un socket Unix."""
+        self._servidor = await asyncio.start_unix_server(self._atender, path, limit=MAX_LINEA)
+        return self._servidor
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+
+class ClienteLocal:
+    """Cliente asyncio mínimo para el protocolo del servidor (pruebas y scripts locales)."""
+    def __init__(self):
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    async def conectar(self, host: str = "127.0.0.1", port: int = 8765, unix: Optional[str] = None):
+        if unix:
+            self._reader, self._writer = await asyncio.open_unix_connection(unix, limit=MAX_LINEA)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(host, port, limit=MAX_LINEA)
+        return self
+
+    async def peticion(self, op: str, **datos) -> Dict[str, Any]:
+        """Envía una petición y devuelve `result`. Lanza RuntimeError si el servidor responde error."""
+        async with self._lock:
+            msg = {"id": next(self._ids), "op": op, **datos}
+            self._writer.write(json.dumps(msg, ensure_ascii=False).encode() + b"\n")
+            await self._writer.drain()
+            linea = await self._reader.readline()
+        if not linea:
+            raise ConnectionError("El servidor cerró la conexión.")
+        resp = json.loads(linea)
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error"))
+        return resp["result"]
+
+    async def cerrar(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+async def _demo() -> int:
+    """Levanta un servidor en un puerto libre y juega una partida completa contra él."""
+    servidor = ServidorPartidas()
+    srv = await servidor.iniciar("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    cliente = await ClienteLocal().conectar(port=port)
+    try:
+        sala = await cliente.peticion("create", num_players=6, num_impostors=1, seed=42)
+        room = sala["room"]
+        roles = [await cliente.peticion("role", room=room, player=i) for i in range(6)]
+        impostor = next(i for i, r in enumerate(roles) if r["role"] == "impostor")
+        print(f"Sala {room} (semilla {sala['seed']}): el impostor es el jugador {impostor}")
+        votos = {str(i): impostor for i in range(6) if i != impostor}
+        res = await cliente.peticion("vote", room=room, votes=votos, eject=True)
+        print(f"Votación: elegido {res['elected']} -> {res['eject_info']['reason']}")
+        estado = await cliente.peticion("state", room=room)
+        print(estado["summary"], f"Ganador: {estado['winner']}", sep="")
+    finally:
+        await cliente.cerrar()
+        await servidor.cerrar()
+    return 0
+
+
+async def _servir(args) -> int:
+    servidor = ServidorPartidas(registro=RegistroSalas(max_salas=args.salas_memoria, ttl=args.ttl,
+                                                       directorio=args.directorio),
+                                max_jugadores=args.max_jugadores, max_palabras=args.max_palabras)
+    if args.unix:
+        srv = await servidor.iniciar_unix(args.unix)
+    else:
+        srv = await servidor.iniciar(args.host, args.port)
+    print(f"Escuchando en {args.unix or srv.sockets[0].getsockname()}")
+    async with srv:
+        await srv.serve_forever()
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Servidor multi-sala de El Impostor (JSON por líneas).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--unix", default=None, help="ruta de socket Unix en lugar de TCP")
+    ap.add_argument("--salas-memoria", type=int, default=10000, help="salas máximas en memoria")
+    ap.add_argument("--ttl", type=float, default=None, help="segundos de inactividad antes de expulsar una sala")
+    ap.add_argument("--directorio", default=None, help="directorio donde volcar las salas expulsadas")
+    ap.add_argument("--max-jugadores", type=int, default=MAX_JUGADORES, help="jugadores máximos por sala")
+    ap.add_argument("--max-palabras", type=int, default=MAX_PALABRAS, help="palabras máximas por sala")
+    ap.add_argument("--demo", action="store_true", help="jugar una partida de prueba sin red externa")
+    args = ap.parse_args(argv)
+    try:
+        return asyncio.run(_demo() if args.demo else _servir(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+# simulacion.py
+# Motor de simulación Monte Carlo (sin interfaz) para equilibrar configuraciones de partida.
+# No importa tkinter: solo depende de partida.py (y de NumPy si está disponible).
+# Uso: python simulacion.py --jugadores 10 --impostores 2 --palabras 50 --partidas 1000000
+
+import argparse
+import bisect
+import math
+import random
+import sys
+from typing import Dict, Iterator, List, Optional
+
+from partida import Partida
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+# A partir de este número de votantes compensa generar los votos con NumPy
+_UMBRAL_NUMPY = 64
+
+# Valor z para intervalos de confianza del 95%
+Z_95 = 1.959963984540054
+
+
+# ================ Políticas ================
+class PoliticaVoto:
+    """
+    Decide a quién vota cada votante.
+    elegir(partida, votantes, vivos, rng, np_rng) -> lista de votados (misma longitud que votantes).
+    `vivos` es la lista ordenada de jugadores vivos (posibles votados).
+    """
+    def elegir(self, partida: Partida, votantes: List[int], vivos: List[int],
+               rng: random.Random, np_rng=None) -> List[int]:
+        raise NotImplementedError
+
+
+class VotoAleatorio(PoliticaVoto):
+    """Cada votante elige uniformemente a otro jugador vivo."""
+    def elegir(self, partida, votantes, vivos, rng, np_rng=None):
+        m = len(vivos)
+        if np_rng is not None and len(votantes) >= _UMBRAL_NUMPY:
+            # Índice en [0, m-1) saltando la propia posición del votante
+            vivos_arr = np.asarray(vivos)
+            propia = np.searchsorted(vivos_arr, votantes)
+            idx = np_rng.integers(0, m - 1, size=len(votantes))
+            idx += idx >= propia
+            return vivos_arr[idx].tolist()
+        elegidos = []
+        for pid in votantes:
+            j = rng.randrange(m - 1)
+            elegidos.append(vivos[j + 1 if j >= bisect.bisect_left(vivos, pid) else j])
+        return elegidos
+
+
+class VotoInformado(PoliticaVoto):
+    """
+    Los tripulantes votan a un impostor vivo con probabilidad `precision` (y al
+    azar en otro caso); los impostores votan siempre a un tripulante vivo.
+    """
+    def __init__(self, precision: float = 0.3):
+        self.precision = precision
+
+    def elegir(self, partida, votantes, vivos, rng, np_rng=None):
+        impostores = [i for i in vivos if partida.get_player_role(i) == "impostor"]
+        tripulantes = [i for i in vivos if partida.get_player_role(i) != "impostor"]
+        m = len(votantes)
+        if np_rng is not None and m >= _UMBRAL_NUMPY:
+            es_impostor = np.isin(votantes, impostores)
+            acierta = np_rng.random(m) < self.precision
+            a_impostor = np.asarray(impostores)[np_rng.integers(0, len(impostores), size=m)]
+            a_tripulante = np.asarray(tripulantes)[np_rng.integers(0, len(tripulantes), size=m)]
+            azar = np.asarray(VotoAleatorio().elegir(partida, votantes, vivos, rng, np_rng))
+            votos = np.where(es_impostor, a_tripulante, np.where(acierta, a_impostor, azar))
+            return votos.tolist()
+        elegidos = []
+        for pid in votantes:
+            if partida.get_player_role(pid) == "impostor":
+                elegidos.append(rng.choice(tripulantes))
+            elif rng.random() < self.precision:
+                elegidos.append(rng.choice(impostores))
+            else:
+                j = rng.randrange(len(vivos) - 1)
+                elegidos.append(vivos[j + 1 if j >= bisect.bisect_left(vivos, pid) else j])
+        return elegidos
+
+
+class PoliticaAbstencion:
+    """
+    Decide qué votantes se abstienen.
+    abstenciones(votantes, rng, np_rng) -> lista de bools (True = se abstiene).
+    """
+    def __init__(self, prob: float = 0.0):
+        self.prob = prob
+
+    def abstenciones(self, votantes: List[int], rng: random.Random, np_rng=None) -> List[bool]:
+        if self.prob <= 0:
+            return [False] * len(votantes)
+        if np_rng is not None and len(votantes) >= _UMBRAL_NUMPY:
+            return (np_rng.random(len(votantes)) < self.prob).tolist()
+        return [rng.random() < self.prob for _ in votantes]
+
+
+class PoliticaAdivinanza:
+    """
+    Decide si un impostor vivo intenta adivinar en una ronda y qué palabra dice.
+    Por defecto intenta con probabilidad `prob_intento` y elige una palabra al
+    azar de la lista de candidatas de la partida.
+    """
+    def __init__(self, prob_intento: float = 0.5):
+        self.prob_intento = prob_intento
+
+    def intenta(self, partida: Partida, player_id: int, rng: random.Random) -> Optional[str]:
+        if rng.random() >= self.prob_intento:
+            return None
+        return rng.choice(partida.words)
+
+
+# ================ Resultados ================
+def intervalo_wilson(exitos: int, n: int, z: float = Z_95):
+    """Intervalo de confianza de Wilson para una proporción. Devuelve (bajo, alto)."""
+    if n == 0:
+        return (0.0, 1.0)
+    p = exitos / n
+    den = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / den
+    margen = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return (max(0.0, centro - margen), min(1.0, centro + margen))
+
+
+class Resultados:
+    """
+    Acumuladores de una simulación. Todos son enteros, así que fusionar
+    resultados parciales es exacto e independiente del orden.
+    """
+    __slots__ = ("partidas", "victorias_impostores", "victorias_tripulantes",
+                 "sin_final", "suma_rondas", "suma_rondas2")
+
+    def __init__(self):
+        self.partidas = 0
+        self.victorias_impostores = 0
+        self.victorias_tripulantes = 0
+        self.sin_final = 0      # partidas cortadas por max_rondas
+        self.suma_rondas = 0
+        self.suma_rondas2 = 0
+
+    def registrar(self, winner: Optional[str], rondas: int):
+        """Añade el resultado de una partida."""
+        self.partidas += 1
+        if winner == "impostores":
+            self.victorias_impostores += 1
+        elif winner == "tripulantes":
+            self.victorias_tripulantes += 1
+        else:
+            self.sin_final += 1
+        self.suma_rondas += rondas
+        self.suma_rondas2 += rondas * rondas
+
+    def fusionar(self, otro: "Resultados") -> "Resultados":
+        """Suma los acumuladores de `otro` a este objeto y lo devuelve."""
+        for campo in Resultados.__slots__:
+            setattr(self, campo, getattr(self, campo) + getattr(otro, campo))
+        return self
+
+    def tasa_impostores(self) -> float:
+        return self.victorias_impostores / self.partidas if self.partidas else 0.0
+
+    def intervalo_impostores(self, z: float = Z_95):
+        return intervalo_wilson(self.victorias_impostores, self.partidas, z)
+
+    def media_rondas(self) -> float:
+        return self.suma_rondas / self.partidas if self.partidas else 0.0
+
+    def intervalo_rondas(self, z: float = Z_95):
+        """Intervalo normal para la duración media de la partida (en rondas)."""
+        n = self.partidas
+        if n < 2:
+            return (0.0, math.inf)
+        media = self.suma_rondas / n
+        var = max(0.0, (self.suma_rondas2 - n * media * media) / (n - 1))
+        margen = z * math.sqrt(var / n)
+        return (media - margen, media + margen)
+
+    def precision_alcanzada(self, tolerancia: float, z: float = Z_95) -> bool:
+        """True si la semianchura del intervalo de la tasa de impostores es <= tolerancia."""
+        bajo, alto = self.intervalo_impostores(z)
+        return self.partidas > 0 and (alto - bajo) / 2 <= tolerancia
+
+    def como_dict(self) -> Dict[str, float]:
+        bajo, alto = self.intervalo_impostores()
+        r_bajo, r_alto = self.intervalo_rondas()
+        return {
+            "partidas": self.partidas,
+            "victorias_impostores": self.victorias_impostores,
+            "victorias_tripulantes": self.victorias_tripulantes,
+            "sin_final": self.sin_final,
+            "tasa_impostores": self.tasa_impostores(),
+            "ic_impostores": (bajo, alto),
+            "media_rondas": self.media_rondas(),
+            "ic_rondas": (r_bajo, r_alto),
+        }
+
+    def __str__(self) -> str:
+        bajo, alto = self.intervalo_impostores()
+        r_bajo, r_alto = self.intervalo_rondas()
+        return (f"{self.partidas} partidas | impostores {self.tasa_impostores():.4f} "
+                f"[{bajo:.4f}, {alto:.4f}] | rondas {self.media_rondas():.3f} "
+                f"[{r_bajo:.3f}, {r_alto:.3f}] | sin final {self.sin_final}")
+
+
+# ================ Simulador ================
+class Simulador:
+    """
+    Juega partidas completas sobre Partida sin interfaz gráfica.
+
+    Cada ronda: los impostores vivos pueden intentar adivinar la palabra
+    (PoliticaAdivinanza); si nadie gana, votan todos los vivos que no se
+    abstienen y se expulsa al más votado (Partida.vote con perform_eject=True).
+    """
+    def __init__(self,
+                 num_players: int,
+                 num_impostors: int = 1,
+                 words: Optional[List[str]] = None,
+                 voto: Optional[PoliticaVoto] = None,
+                 abstencion: Optional[PoliticaAbstencion] = None,
+                 adivinanza: Optional[PoliticaAdivinanza] = None,
+                 seed: Optional[int] = None,
+                 max_rondas: int = 10000):
+        self.num_players = num_players
+        self.num_impostors = num_impostors
+        self.words = words
+        self.voto = voto or VotoAleatorio()
+        self.abstencion = abstencion or PoliticaAbstencion()
+        self.adivinanza = adivinanza or PoliticaAdivinanza()
+        self.max_rondas = max_rondas
+        self.ultimas_rondas = 0
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed) if _HAS_NUMPY else None
+
+    def jugar(self) -> Partida:
+        """Juega una partida completa y devuelve la Partida (número de rondas en self.ultimas_rondas)."""
+        p = Partida(num_players=self.num_players, num_impostors=self.num_impostors,
+                    words=self.words, rng=self.rng)
+        rng = self.rng
+        rondas = 0
+        while not p.over and rondas < self.max_rondas:
+            rondas += 1
+            vivos = [i for i in range(p.num_players) if p.alive[i]]
+
+            # Fase de adivinanza (solo tiene sentido para los impostores)
+            for pid in vivos:
+                if p.get_player_role(pid) != "impostor":
+                    continue
+                intento = self.adivinanza.intenta(p, pid, rng)
+                if intento is not None and p.guess(pid, intento)["game_over"]:
+                    break
+            if p.over:
+                break
+
+            # Fase de votación
+            abstenciones = self.abstencion.abstenciones(vivos, rng, self.np_rng)
+            votantes = [pid for pid, se_abstiene in zip(vivos, abstenciones) if not se_abstiene]
+            if not votantes:
+                continue
+            votados = self.voto.elegir(p, votantes, vivos, rng, self.np_rng)
+            p.vote(dict(zip(votantes, votados)), perform_eject=True)
+        self.ultimas_rondas = rondas
+        return p
+
+    def simular_lote(self, partidas: int) -> Resultados:
+        """Juega `partidas` partidas y devuelve sus resultados."""
+        res = Resultados()
+        for _ in range(partidas):
+            p = self.jugar()
+            res.registrar(p.winner, self.ultimas_rondas)
+        return res
+
+    def flujo(self, total: int, lote: int = 10000, tolerancia: Optional[float] = None) -> Iterator[Resultados]:
+        """
+        Simula hasta `total` partidas en lotes de `lote` y produce los resultados
+        acumulados tras cada lote. Si se indica `tolerancia`, se detiene en cuanto
+        la semianchura del IC de la tasa de impostores baja de ese valor.
+        """
+        acumulado = Resultados()
+        while acumulado.partidas < total:
+            acumulado.fusionar(self.simular_lote(min(lote, total - acumulado.partidas)))
+            yield acumulado
+            if tolerancia is not None and acumulado.precision_alcanzada(tolerancia):
+                return
+
+
+def palabras_sinteticas(n: int) -> List[str]:
+    """Lista de `n` palabras distintas para simular tamaños de lista de palabras."""
+    return [f"palabra{i}" for i in range(n)]
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Parser de línea de comandos común a la simulación secuencial y la paralela."""
+    ap = argparse.ArgumentParser(description="Simulación Monte Carlo de partidas de El Impostor.")
+    ap.add_argument("--jugadores", type=int, default=8)
+    ap.add_argument("--impostores", type=int, default=1)
+    ap.add_argument("--palabras", type=int, default=5, help="tamaño de la lista de palabras")
+    ap.add_argument("--partidas", type=int, default=100000)
+    ap.add_argument("--lote", type=int, default=10000)
+    ap.add_argument("--tolerancia", type=float, default=None,
+                    help="parar cuando la semianchura del IC (95%%) de la tasa de impostores sea menor")
+    ap.add_argument("--precision", type=float, default=None,
+                    help="usar VotoInformado con esta precisión (por defecto voto aleatorio)")
+    ap.add_argument("--abstencion", type=float, default=0.0)
+    ap.add_argument("--prob-intento", type=float, default=0.5)
+    ap.add_argument("--semilla", type=int, default=None)
+    return ap
+
+
+def config_desde_args(args) -> Dict[str, object]:
+    """Argumentos de Simulador (salvo la semilla) a partir de la línea de comandos."""
+    return {
+        "num_players": args.jugadores,
+        "num_impostors": args.impostores,
+        "words": palabras_sinteticas(args.palabras),
+        "voto": VotoInformado(args.precision) if args.precision is not None else VotoAleatorio(),
+        "abstencion": PoliticaAbstencion(args.abstencion),
+        "adivinanza": PoliticaAdivinanza(args.prob_intento),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = crear_parser().parse_args(argv)
+    sim = Simulador(seed=args.semilla, **config_desde_args(args))
+    try:
+        for res in sim.flujo(args.partidas, args.lote, args.tolerancia):
+            print(res, flush=True)
+    except KeyboardInterrupt:
+        # Interrumpir una ejecución larga conserva la última línea impresa
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# test_banco_palabras.py
+# Pruebas del banco de palabras en disco (banco_palabras.py).
+#
+# Uso:
+#   python -m unittest test_banco_palabras
+
+import os
+import tempfile
+import unittest
+
+from banco_palabras import BancoPalabras, construir_banco
+
+
+class TestBancoPalabras(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self._tmp.name, "banco.idx")
+        construir_banco(self.ruta, {"es/animales": ["gato", " perro ", "", "ñandú"], "es/comida": ["pan"]})
+        with open(self.ruta, "rb") as f:
+            self.datos = f.read()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _escribir(self, datos: bytes) -> str:
+        ruta = os.path.join(self._tmp.name, "roto.idx")
+        with open(ruta, "wb") as f:
+            f.write(datos)
+        return ruta
+
+    def test_lee_categorias(self):
+        with BancoPalabras(self.ruta) as banco:
+            self.assertEqual(banco.categorias(), ["es/animales", "es/comida"])
+            self.assertEqual(list(banco.categoria("es/animales")), ["gato", "perro", "ñandú"])
+            self.assertEqual(len(banco), 4)
+
+    def test_fichero_truncado(self):
+        for largo in range(1, len(self.datos)):
+            with self.assertRaises(ValueError, msg=largo):
+                BancoPalabras(self._escribir(self.datos[:largo]))
+
+    def test_fichero_corrupto(self):
+        # n_palabras enorme: la tabla de offsets no cabe en el fichero
+        datos = bytearray(self.datos)
+        datos[12:20] = (1 << 40).to_bytes(8, "little")
+        with self.assertRaises(ValueError):
+            BancoPalabras(self._escribir(bytes(datos)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# test_bitacora.py
+# Pruebas del registro binario de eventos (bitacora.py).
+#
+# Uso:
+#   python -m unittest test_bitacora
+
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import bitacora
+from bitacora import CREAR, REGISTRO, SNAPSHOT, Bitacora, LectorBitacora
+from partida import Partida
+
+PALABRAS = [f"palabra{i}" for i in range(200)]
+
+
+class TestBitacora(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self._tmp.name, "registro")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _jugar(self, cada_snapshot: int = 2):
+        rng = random.Random(1)
+        partidas = [Partida(num_players=12, num_impostors=2, words=PALABRAS, seed=s) for s in range(3)]
+        historia = {}
+        with Bitacora(self.base, cada_snapshot=cada_snapshot) as b:
+            ids = [b.registrar(p) for p in partidas]
+            while not all(p.over for p in partidas):
+                for pid, p in zip(ids, partidas):
+                    if p.over:
+                        continue
+                    p.guess(rng.randrange(12), rng.choice(PALABRAS[:5]))
+                    vivos = [i for i in range(12) if p.alive[i]]
+                    p.vote({v: rng.choice(vivos) for v in vivos}, perform_eject=True)
+                    b.flush()
+                    historia.setdefault(pid, []).append((os.path.getsize(self.base + ".ev") // REGISTRO.size - 1,
+                                                         p.to_dict()))
+        return ids, partidas, historia
+
+    def test_reconstruir_en_cada_punto(self):
+        ids, partidas, historia = self._jugar()
+        lector = LectorBitacora(self.base)
+        try:
+            for pid, p in zip(ids, partidas):
+                self.assertEqual(lector.reconstruir(pid).to_dict(), p.to_dict())
+                for hasta, esperado in historia[pid]:
+                    self.assertEqual(lector.reconstruir(pid, hasta).to_dict(), esperado)
+        finally:
+            lector.cerrar()
+
+    def test_palabras_solo_en_crear(self):
+        self._jugar()
+        lector = LectorBitacora(self.base)
+        try:
+            tipos = [r[1] for r in lector]
+            self.assertIn(SNAPSHOT, tipos)
+            for _, tipo, _, _, _, cadena in lector:
+                if tipo == CREAR:
+                    self.assertEqual(json.loads(lector.cadena(cadena))["words"], PALABRAS)
+                elif tipo == SNAPSHOT:
+                    self.assertIsNone(json.loads(lector.cadena(cadena))["words"])
+        finally:
+            lector.cerrar()
+
+    def test_hasta_anterior_a_crear(self):
+        ids, _, _ = self._jugar()
+        lector = LectorBitacora(self.base)
+        try:
+            with self.assertRaises(ValueError):
+                lector.reconstruir(ids[-1], hasta=0)
+            with self.assertRaises(KeyError):
+                lector.reconstruir(999)
+        finally:
+            lector.cerrar()
+
+    def test_sin_numpy_mismos_registros(self):
+        ids, partidas, _ = self._jugar()
+        lector = LectorBitacora(self.base)
+        try:
+            con = (lector.partidas(), [lector.eventos(pid) for pid in ids])
+            with mock.patch.object(bitacora, "_HAS_NUMPY", False):
+                sin = (lector.partidas(), [lector.eventos(pid) for pid in ids])
+                self.assertEqual(lector.reconstruir(ids[0]).to_dict(), partidas[0].to_dict())
+            self.assertEqual(con, sin)
+            self.assertEqual(lector.eventos(-1), [])
+        finally:
+            lector.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# test_coincidencia.py
+# Pruebas de la comparación de adivinanzas (coincidencia.py).
+#
+# Uso:
+#   python -m unittest test_coincidencia
+
+import threading
+import unittest
+
+import coincidencia
+from coincidencia import (Coincidencia, COINCIDENCIA_POR_DEFECTO, IndiceVecindad, _borrados,
+                          distancia_acotada, entradas_indice, indice_para, normalizar)
+
+
+class TestNormalizar(unittest.TestCase):
+    def test_acentos_y_mayusculas(self):
+        self.assertEqual(normalizar(" Avión "), "avion")
+        self.assertEqual(normalizar("CANCIÓN", acentos=False), "canción")
+        self.assertEqual(normalizar("Pingüino", mayusculas=False), "Pinguino")
+
+    def test_conserva_la_enie(self):
+        self.assertEqual(normalizar("AÑO"), "año")
+        self.assertNotEqual(normalizar("año"), normalizar("ano"))
+        self.assertEqual(normalizar("Ñandú", mayusculas=False), "Ñandu")
+        # También si llega descompuesta (n + tilde combinante)
+        self.assertEqual(normalizar("an\u0303o"), "año")
+
+
+class TestDistancia(unittest.TestCase):
+    def test_operaciones(self):
+        self.assertEqual(distancia_acotada("gato", "gato", 2), 0)
+        self.assertEqual(distancia_acotada("gato", "pato", 2), 1)
+        self.assertEqual(distancia_acotada("gato", "agto", 2), 1)
+        self.assertEqual(distancia_acotada("gato", "gat", 2), 1)
+        self.assertEqual(distancia_acotada("gato", "perro", 2), 3)
+
+    def test_indice_vecindad(self):
+        indice = IndiceVecindad(["gato", "perro", "casa"], max_d=1)
+        self.assertEqual(indice.cercanas("gatp"), ["gato"])
+        self.assertTrue(indice.contiene_cercana("csa"))
+        self.assertFalse(indice.contiene_cercana("pájaro"))
+
+    def test_borrados_acotados_por_la_longitud(self):
+        self.assertEqual(_borrados("ab", 30_000_000), {"ab", "a", "b", ""})
+        self.assertEqual(len(_borrados("gato", 2)), entradas_indice(["gato"], 2))
+        # Una consulta mucho más larga que las palabras del índice no genera borrados
+        self.assertEqual(IndiceVecindad(["gato"], max_d=2).cercanas("x" * 100000), [])
+
+
+class TestDesdeDict(unittest.TestCase):
+    def test_ida_y_vuelta(self):
+        c = Coincidencia(acentos=False, max_distancia=2, solo_conocidas=True)
+        self.assertEqual(Coincidencia.desde_dict(c.como_dict()).como_dict(), c.como_dict())
+        self.assertIs(Coincidencia.desde_dict(None), COINCIDENCIA_POR_DEFECTO)
+
+    def test_rechaza_datos_invalidos(self):
+        for datos in ({"max_distancia": 3e7}, {"max_distancia": 12}, {"max_distancia": -1},
+                      {"max_distancia": True}, {"acentos": 1}, {"min_longitud": -2},
+                      {"otra": 1}, ["max_distancia"]):
+            with self.assertRaises(ValueError, msg=datos):
+                Coincidencia.desde_dict(datos)
+
+
+class TestIndicePara(unittest.TestCase):
+    def test_compartido_por_lista(self):
+        palabras = ["gato", "perro"]
+        c = Coincidencia(max_distancia=1)
+        self.assertIs(indice_para(palabras, c), indice_para(palabras, c))
+        # Mismo contenido, mismo índice; la lista no queda retenida por la caché
+        self.assertIs(indice_para(list(palabras), c), indice_para(palabras, c))
+
+    def test_lista_editada_no_usa_el_indice_viejo(self):
+        palabras = ["gato", "perro"]
+        c = Coincidencia(max_distancia=1)
+        self.assertTrue(c.es_conocida("gato", palabras))
+        palabras[0] = "loro"
+        self.assertFalse(c.es_conocida("gato", palabras))
+        self.assertTrue(c.es_conocida("loro", palabras))
+
+    def test_entre_hilos(self):
+        listas = [[f"palabra{i}_{j}" for j in range(50)] for i in range(3 * coincidencia._MAX_INDICES)]
+        c = Coincidencia(max_distancia=1)
+        errores = []
+        barrera = threading.Barrier(8)
+
+        def trabajo(desfase):
+            barrera.wait()
+            try:
+                for k in range(200):
+                    palabras = listas[(k + desfase) % len(listas)]
+                    indice = indice_para(palabras, c)
+                    if palabras[0] not in indice:
+                        errores.append(palabras[0])
+            except Exception as e:
+                errores.append(e)
+
+        hilos = [threading.Thread(target=trabajo, args=(i,)) for i in range(8)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.assertEqual(errores, [])
+        self.assertLessEqual(len(coincidencia._indices), coincidencia._MAX_INDICES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+# test_difusion.py
+# Pruebas del feed de cambios y del reparto a espectadores (difusion.py).
+#
+# Uso:
+#   python -m unittest test_difusion
+
+import random
+import sys
+import threading
+import unittest
+
+from difusion import Difusor, EstadoEspectador, FeedCambios, _SumideroMemoria
+from partida import Partida, PartidaConcurrente
+
+
+def _expulsar_en_hilos(p: Partida, hilos: int, seed: int):
+    """Expulsa a todos los jugadores repartidos entre `hilos` hilos que arrancan a la vez."""
+    orden = list(range(p.num_players))
+    random.Random(seed).shuffle(orden)
+    barrera = threading.Barrier(hilos)
+    errores = []
+
+    def trabajo(ids):
+        barrera.wait()
+        try:
+            for pid in ids:
+                p.eject(pid)
+        except Exception as e:
+            errores.append(e)
+
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        ts = [threading.Thread(target=trabajo, args=(orden[i::hilos],)) for i in range(hilos)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+    finally:
+        sys.setswitchinterval(anterior)
+    return errores
+
+
+class TestFeedConcurrente(unittest.TestCase):
+    def test_oyentes_reciben_seq_en_orden(self):
+        for ensayo in range(20):
+            p = PartidaConcurrente(num_players=400, num_impostors=40, seed=ensayo)
+            feed = FeedCambios(p)
+            vistas = []
+            estado = EstadoEspectador()
+            estado.alimentar(feed.instantanea()[1])
+            feed.escuchar(lambda seq, mensaje: vistas.append(seq))
+            feed.escuchar(lambda seq, mensaje: estado.alimentar(mensaje))
+            errores = _expulsar_en_hilos(p, 8, ensayo)
+            self.assertEqual(errores, [])
+            self.assertEqual(vistas, list(range(1, feed.seq + 1)))
+            self.assertEqual(feed.errores, 0)
+            self.assertEqual(estado.alive, p.alive)
+            self.assertEqual(estado.seq, feed.seq)
+
+    def test_excepcion_de_oyente_no_llega_a_la_partida(self):
+        p = Partida(num_players=6, num_impostors=1, seed=1)
+        feed = FeedCambios(p)
+        vistas = []
+
+        def roto(seq, mensaje):
+            raise RuntimeError("oyente roto")
+
+        feed.escuchar(roto)
+        feed.escuchar(lambda seq, mensaje: vistas.append(seq))
+        p.eject(0)
+        self.assertEqual(feed.errores, 1)
+        self.assertEqual(vistas[0], 1)
+
+
+class TestEstadoEspectador(unittest.TestCase):
+    def test_salto_de_seq_consume_el_mensaje(self):
+        p = Partida(num_players=8, num_impostors=1, seed=2)
+        feed = FeedCambios(p)
+        mensajes = []
+        feed.escuchar(lambda seq, mensaje: mensajes.append(mensaje))
+        estado = EstadoEspectador()
+        estado.alimentar(feed.instantanea()[1])
+        crew = [i for i in range(8) if not p._roles[i]]
+        p.eject(crew[0])
+        p.eject(crew[1])
+        p.eject(crew[2])
+        # Se pierde el primer cambio: el segundo falla pero no se queda en el buffer
+        with self.assertRaises(ValueError):
+            estado.alimentar(mensajes[1])
+        self.assertEqual(bytes(estado._buffer), b"")
+        estado.alimentar(feed.instantanea()[1])
+        estado.alimentar(mensajes[2])
+        self.assertEqual(estado.alive, p.alive)
+
+    def test_mensajes_partidos(self):
+        p = Partida(num_players=10, num_impostors=1, seed=3)
+        feed = FeedCambios(p)
+        datos = bytearray(feed.instantanea()[1])
+        feed.escuchar(lambda seq, mensaje: datos.extend(mensaje))
+        p.eject(next(i for i in range(10) if not p._roles[i]))
+        estado = EstadoEspectador()
+        for i in range(len(datos)):
+            estado.alimentar(bytes(datos[i:i + 1]))
+        self.assertEqual((estado.alive, estado.seq), (p.alive, feed.seq))
+
+    def test_cambios_ya_incluidos_en_la_instantanea_se_ignoran(self):
+        p = Partida(num_players=8, num_impostors=1, seed=4)
+        feed = FeedCambios(p)
+        mensajes = []
+        feed.escuchar(lambda seq, mensaje: mensajes.append(mensaje))
+        p.eject(next(i for i in range(8) if not p._roles[i]))
+        estado = EstadoEspectador()
+        estado.alimentar(feed.instantanea()[1])
+        estado.alimentar(mensajes[0])
+        self.assertEqual((estado.alive, estado.seq), (p.alive, 1))
+
+
+class TestDifusor(unittest.TestCase):
+    def _jugar(self, p: Partida, rng: random.Random):
+        vivos = [i for i in range(p.num_players) if p.alive[i]]
+        p.vote({v: rng.choice(vivos) for v in vivos}, perform_eject=True)
+
+    def test_llegada_tarde_y_reconexion(self):
+        rng = random.Random(5)
+        p = Partida(num_players=60, num_impostors=6, seed=5)
+        d = Difusor()
+        feed = d.seguir("sala", p, historial=2)
+        directo, tarde, reconectado, perdido = (_SumideroMemoria() for _ in range(4))
+        d.suscribir("sala", directo)
+        s_reconectado = d.suscribir("sala", reconectado)
+        s_perdido = d.suscribir("sala", perdido)
+        self._jugar(p, rng)
+        d.desuscribir(s_reconectado)
+        d.desuscribir(s_perdido)
+        self._jugar(p, rng)
+        d.suscribir("sala", tarde)
+        # Vuelve enseguida: recibe solo lo que se perdió (sigue en el historial)
+        antes = reconectado.bytes
+        d.suscribir("sala", reconectado, seq=reconectado.estado.seq)
+        self.assertLess(reconectado.bytes - antes, len(feed.instantanea()[1]) + 1)
+        for _ in range(20):
+            if p.over:
+                break
+            self._jugar(p, rng)
+        # El otro vuelve más tarde: instantánea si sus cambios ya salieron del historial
+        d.suscribir("sala", perdido, seq=perdido.estado.seq)
+        for s in (directo, tarde, reconectado, perdido):
+            e = s.estado
+            self.assertEqual((e.alive, e.over, e.winner, e.seq), (p.alive, p.over, p.winner, feed.seq))
+
+    def test_volver_a_seguir_la_sala(self):
+        rng = random.Random(7)
+        p1 = Partida(num_players=30, num_impostors=3, seed=7)
+        p2 = Partida(num_players=20, num_impostors=2, seed=8)
+        d = Difusor()
+        d.seguir("s", p1)
+        suscrito, reconecta = _SumideroMemoria(), _SumideroMemoria()
+        d.suscribir("s", suscrito)
+        s_reconecta = d.suscribir("s", reconecta)
+        for _ in range(3):
+            self._jugar(p1, rng)
+        d.desuscribir(s_reconecta)
+        feed = d.seguir("s", p2)
+        self.assertGreater(feed.seq, reconecta.estado.seq)
+        self._jugar(p2, rng)
+        self._jugar(p2, rng)
+        # El que sigue suscrito pasa a la partida nueva; el que reconecta con su seq vieja recibe la instantánea
+        d.suscribir("s", reconecta, seq=reconecta.estado.seq)
+        for s in (suscrito, reconecta):
+            e = s.estado
+            self.assertEqual((e.num_players, e.alive, e.seq), (p2.num_players, p2.alive, feed.seq))
+
+    def test_comparacion_de_demostracion(self):
+        from difusion import _comparar
+        import contextlib
+        import io
+        with contextlib.redirect_stdout(io.StringIO()):
+            _comparar(50, 40, seed=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
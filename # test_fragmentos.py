@@ -0,0 +1,59 @@
+# test_fragmentos.py
+# Pruebas del reparto de salas entre procesos trabajadores (fragmentos.py).
+#
+# Uso:
+#   python -m unittest test_fragmentos
+
+import unittest
+
+from fragmentos import Fragmentador
+
+
+class _FragmentadorRoto(Fragmentador):
+    """Fragmentador cuyas importaciones de las salas de `rotas` llegan corruptas al destino."""
+    rotas = set()
+
+    def _ejecutar(self, pares):
+        pares = [(nombre, {**msg, "partida": {}} if msg.get("op") == "frag_import" and msg["room"] in self.rotas
+                  else msg) for nombre, msg in pares]
+        return super()._ejecutar(pares)
+
+
+class TestTraslado(unittest.TestCase):
+    SALAS = 60
+
+    def _estados(self, f):
+        return f.despachar_lote([{"op": "state", "room": f"r{i}"} for i in range(self.SALAS)])
+
+    def test_importacion_fallida_no_pierde_salas(self):
+        with _FragmentadorRoto(2) as f:
+            f.despachar_lote([{"op": "create", "room": f"r{i}", "num_players": 6, "seed": i}
+                              for i in range(self.SALAS)])
+            antes = self._estados(f)
+            rooms = f._interna("t0", "rooms")
+            f.rotas = {rooms[0], rooms[1]}
+            with self.assertRaises(RuntimeError) as ctx:
+                f.quitar_trabajador("t0")
+            self.assertIn(rooms[0], str(ctx.exception))
+            # t0 sigue en marcha con las dos salas y se le siguen enrutando
+            self.assertIn("t0", f.trabajadores)
+            self.assertEqual(sorted(f._interna("t0", "rooms")), sorted(f.rotas))
+            self.assertEqual(self._estados(f), antes)
+            # Reintento sin fallos: se trasladan y el trabajador se para
+            f.rotas = set()
+            f.quitar_trabajador("t0")
+            self.assertNotIn("t0", f.trabajadores)
+            self.assertEqual(self._estados(f), antes)
+            self.assertEqual(sum(s["salas"] for s in f.estadisticas().values()), self.SALAS)
+
+
+class TestDespacho(unittest.TestCase):
+    def test_peticion_que_no_es_dict(self):
+        with Fragmentador(1) as f:
+            resps = f.despachar_lote([["op", "state"], {"id": 2, "op": "create", "num_players": 5}, None])
+        self.assertEqual([r["ok"] for r in resps], [False, True, False])
+        self.assertEqual(resps[1]["id"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
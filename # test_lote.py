@@ -0,0 +1,63 @@
+# test_lote.py
+# Pruebas del motor por lotes (lote.py) contra la clase escalar Partida.
+#
+# Uso:
+#   python -m unittest test_lote
+
+import unittest
+
+from coincidencia import Coincidencia
+from partida import Partida
+
+try:
+    import numpy as np
+    from lote import IMPOSTORES, NINGUNO, TRIPULANTES, PartidaBatch, verificar_equivalencia
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+
+@unittest.skipUnless(_HAS_NUMPY, "NumPy no está disponible.")
+class TestPartidaBatch(unittest.TestCase):
+    def test_equivalencia_con_partida(self):
+        self.assertTrue(verificar_equivalencia(juegos=60, seed=1))
+
+    def test_roles_y_contadores_iniciales(self):
+        lote = PartidaBatch(200, 9, 2, seed=2)
+        self.assertTrue((lote.impostor.sum(axis=1) == 2).all())
+        self.assertTrue((lote.impostores_vivos == 2).all())
+        self.assertTrue((lote.tripulantes_vivos == 7).all())
+
+    def test_empate_no_elige_a_nadie(self):
+        lote = PartidaBatch(1, 4, 1, seed=3)
+        res = lote.vote_many([[1, 1, 2, 2]], perform_eject=True)
+        self.assertEqual(int(res["elected"][0]), -1)
+        self.assertTrue(lote.alive.all())
+
+    def test_victoria_por_expulsion(self):
+        lote = PartidaBatch(2, 5, 1, seed=4)
+        impostor = lote.impostor.argmax(axis=1)
+        tripulante = (~lote.impostor).argmax(axis=1)
+        lote.eject_many([impostor[0], tripulante[1]])
+        self.assertEqual(lote.winner.tolist(), [TRIPULANTES, NINGUNO])
+        lote.eject_many([-1, (~lote.impostor[1] & lote.alive[1]).argmax()])
+        lote.eject_many([-1, (~lote.impostor[1] & lote.alive[1]).argmax()])
+        self.assertEqual(int(lote.winner[1]), IMPOSTORES)
+
+    def test_ids_fuera_de_rango(self):
+        lote = PartidaBatch(2, 5, 1, seed=5)
+        with self.assertRaises(ValueError):
+            lote.eject_many([0, 5])
+
+    def test_from_partidas_conserva_coincidencia(self):
+        estricta = Coincidencia(acentos=False)
+        partidas = [Partida(num_players=6, num_impostors=1, seed=s, coincidencia=estricta if s % 2 else None)
+                    for s in range(4)]
+        vuelta = PartidaBatch.from_partidas(partidas).to_partidas()
+        for original, copia in zip(partidas, vuelta):
+            self.assertEqual(copia.to_dict(), original.to_dict())
+        self.assertEqual(vuelta[1].coincidencia.como_dict(), estricta.como_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
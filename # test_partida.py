@@ -0,0 +1,172 @@
+# test_partida.py
+# Pruebas de la lógica de la partida (partida.py).
+#
+# Uso:
+#   python -m unittest test_partida
+
+import random
+import sys
+import threading
+import unittest
+
+import metricas
+from partida import DEFAULT_WORDS, Partida, PartidaConcurrente, _limpiar_palabras, crear_partidas
+
+
+def _en_hilos(hilos: int, trabajo):
+    """Lanza trabajo(i) en `hilos` hilos que arrancan a la vez, con cambios de hilo muy frecuentes."""
+    barrera = threading.Barrier(hilos)
+    errores = []
+
+    def envoltura(i):
+        barrera.wait()
+        try:
+            trabajo(i)
+        except Exception as e:
+            errores.append(e)
+
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        ths = [threading.Thread(target=envoltura, args=(i,)) for i in range(hilos)]
+        for t in ths:
+            t.start()
+        for t in ths:
+            t.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+    return errores
+
+
+class TestPalabras(unittest.TestCase):
+    def test_lista_limpia_se_comparte(self):
+        palabras = [f"palabra{i}" for i in range(100)]
+        a = Partida(num_players=5, words=palabras, seed=1)
+        b = Partida(num_players=5, words=palabras, seed=2)
+        self.assertIs(a.words, palabras)
+        self.assertIs(b.words, palabras)
+
+    def test_lista_sucia_se_limpia(self):
+        sucia = ["  gato ", "", "perro", "   "]
+        limpia = _limpiar_palabras(sucia)
+        self.assertEqual(limpia, ["gato", "perro"])
+        self.assertIs(_limpiar_palabras(limpia), limpia)
+        partidas = crear_partidas(3, seed=0, num_players=4, words=sucia)
+        self.assertTrue(all(p.words == limpia for p in partidas))
+        self.assertTrue(all(p.words is partidas[0].words for p in partidas))
+
+    def test_lista_editada_se_vuelve_a_limpiar(self):
+        palabras = [" gato ", "perro"]
+        self.assertEqual(Partida(num_players=4, words=palabras, seed=1).words, ["gato", "perro"])
+        palabras[1] = " loro "
+        self.assertEqual(Partida(num_players=4, words=palabras, seed=1).words, ["gato", "loro"])
+
+    def test_sin_palabras_usa_las_de_defecto(self):
+        self.assertIs(_limpiar_palabras(None), DEFAULT_WORDS)
+        self.assertIs(_limpiar_palabras(["", "  "]), DEFAULT_WORDS)
+
+
+class TestVotacion(unittest.TestCase):
+    def test_elegido_fuera_de_rango_no_es_impostor(self):
+        p = Partida(num_players=5, num_impostors=1, seed=3)
+        for elegido in (99, -1, "x"):
+            res = p.vote({0: elegido})
+            self.assertEqual(res["elected"], elegido)
+            self.assertFalse(res["is_impostor"])
+        self.assertEqual(p.recontar_vivos(), (1, 4))
+
+    def test_empate_no_expulsa(self):
+        p = Partida(num_players=4, num_impostors=1, seed=4)
+        res = p.vote({0: 1, 1: 0}, perform_eject=True)
+        self.assertIsNone(res["elected"])
+        self.assertEqual(sum(p.alive), 4)
+
+    def test_expulsar_al_impostor_gana_la_tripulacion(self):
+        p = Partida(num_players=5, num_impostors=1, seed=5)
+        impostor = next(iter(p.impostors))
+        res = p.vote({v: impostor for v in range(5)}, perform_eject=True)
+        self.assertTrue(res["is_impostor"])
+        self.assertTrue(res["eject_info"]["game_over"])
+        self.assertEqual(p.winner, "tripulantes")
+
+
+class TestPartidaConcurrente(unittest.TestCase):
+    def test_estres_64_hilos(self):
+        # debug=True: cada check_win compara los contadores con un recuento completo
+        p = PartidaConcurrente(num_players=3000, num_impostors=300, seed=1, debug=True)
+        n = p.num_players
+        expulsados = []
+
+        def trabajo(i):
+            rng = random.Random(i)
+            for _ in range(40):
+                x = rng.random()
+                if x < 0.4:
+                    info = p.eject(rng.randrange(n))
+                elif x < 0.7:
+                    info = p.vote({rng.randrange(n): rng.randrange(n) for _ in range(3)},
+                                  perform_eject=True)["eject_info"]
+                elif x < 0.85:
+                    p.check_win()
+                    continue
+                else:
+                    p.get_player_role(rng.randrange(n))
+                    continue
+                if info is not None and info["was_alive"]:
+                    expulsados.append(info["player_id"])
+
+        self.assertEqual(_en_hilos(64, trabajo), [])
+        self.assertFalse(p.over)
+        self.assertEqual(len(expulsados), len(set(expulsados)))
+        self.assertEqual(len(expulsados), n - p.alive.count(1))
+        impostores = len(p.impostors)
+        self.assertEqual(p.recontar_vivos(), (impostores, p.alive.count(1) - impostores))
+        self.assertEqual(p.check_win()["over"], False)
+        # Los contadores deciden el final igual que en una copia recién contada
+        copia = Partida.from_dict(p.to_dict())
+        for pid in [i for i in range(n) if p.alive[i]]:
+            info = p.eject(pid)
+            self.assertEqual(info, copia.eject(pid))
+            if info["game_over"]:
+                break
+        self.assertEqual((p.over, p.winner), (copia.over, copia.winner))
+
+    def test_un_solo_ganador(self):
+        for ensayo in range(10):
+            p = PartidaConcurrente(num_players=40, num_impostors=5, seed=ensayo)
+            fines = []
+            p.suscribir(lambda partida, evento, datos: fines.append(datos["winner"]) if evento == "fin" else None)
+            impostores = sorted(p.impostors)
+            resultados = []
+
+            def trabajo(i):
+                if i % 2:
+                    # Adivinanzas correctas: ganan los impostores
+                    resultados.append(p.guess(impostores[i % len(impostores)], p.word))
+                else:
+                    # Expulsar a todos los impostores: gana la tripulación
+                    for pid in impostores:
+                        resultados.append(p.eject(pid))
+
+            self.assertEqual(_en_hilos(16, trabajo), [])
+            self.assertTrue(p.over)
+            self.assertEqual(fines, [p.winner])
+            ganadores = {r["winner"] for r in resultados if r.get("game_over")}
+            self.assertEqual(ganadores, {p.winner})
+
+    def test_metricas_instrumentan_las_sustituciones(self):
+        registro = metricas.Metricas()
+        metricas.activar(registro)
+        try:
+            p = PartidaConcurrente(num_players=5, seed=1)
+            p.eject(0)
+            p.check_win()
+        finally:
+            metricas.desactivar()
+        texto = registro.prometheus()
+        self.assertIn("PartidaConcurrente.eject", texto)
+        self.assertIn("PartidaConcurrente.check_win", texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# test_probabilidades.py
+# Pruebas del solucionador exacto de probabilidades de victoria (probabilidades.py).
+#
+# Uso:
+#   python -m unittest test_probabilidades
+
+import itertools
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from partida import Partida
+from probabilidades import (ModeloAdivinanza, ModeloVotoUniforme, Probabilidades, SinAdivinanza,
+                            _HAS_NUMPY)
+
+if _HAS_NUMPY:
+    from probabilidades import ModeloVotoAleatorio, verificar
+
+
+def _unico_por_enumeracion(n: int, abstencion: float) -> float:
+    """P(máximo único) con n vivos enumerando todos los votos posibles (-1 = abstención)."""
+    total = 0.0
+    for votos in itertools.product(range(-1, n), repeat=n):
+        prob = 1.0
+        for v in votos:
+            prob *= abstencion if v < 0 else (1.0 - abstencion) / n
+        cuentas = Counter(v for v in votos if v >= 0).most_common(2)
+        if cuentas and (len(cuentas) == 1 or cuentas[0][1] > cuentas[1][1]):
+            total += prob
+    return total
+
+
+class TestModeloUniforme(unittest.TestCase):
+    def test_un_impostor_sin_empates(self):
+        # V(1, C) = C / (C + 1) * V(1, C - 1) con V(1, 1) = 1
+        sol = Probabilidades(ModeloVotoUniforme(), SinAdivinanza())
+        for n, esperada in ((3, 2 / 3), (4, 1 / 2), (5, 2 / 5), (6, 1 / 3)):
+            self.assertAlmostEqual(sol.prob_impostores(n, 1), esperada, places=12)
+
+    def test_los_empates_no_cambian_el_reparto(self):
+        # Con prob_nadie solo se repite la ronda: mismas probabilidades
+        a = Probabilidades(ModeloVotoUniforme()).probabilidades(3, 12)
+        b = Probabilidades(ModeloVotoUniforme(0.4)).probabilidades(3, 12)
+        self.assertAlmostEqual(a[0], b[0], places=12)
+        self.assertAlmostEqual(a[1], b[1], places=12)
+
+    def test_estados_terminales(self):
+        sol = Probabilidades()
+        self.assertEqual(sol.probabilidades(0, 4), (0.0, 1.0))
+        self.assertEqual(sol.probabilidades(3, 3), (1.0, 0.0))
+
+    def test_adivinar_favorece_a_los_impostores(self):
+        base = Probabilidades(ModeloVotoUniforme(0.2)).prob_impostores(12, 2)
+        con = Probabilidades(ModeloVotoUniforme(0.2), ModeloAdivinanza(0.5, 4)).prob_impostores(12, 2)
+        self.assertGreater(con, base)
+
+    def test_de_partida(self):
+        p = Partida(num_players=8, num_impostors=2, seed=1)
+        sol = Probabilidades()
+        self.assertEqual(sol.de_partida(p), sol.probabilidades(2, 6))
+        p.eject(next(i for i in range(8) if p.get_player_role(i) == "impostor"))
+        self.assertEqual(sol.de_partida(p), sol.probabilidades(1, 6))
+
+    def test_tabla_guardada_y_cargada(self):
+        sol = Probabilidades(ModeloVotoUniforme(0.1), ModeloAdivinanza(0.3, 6))
+        sol.precalcular(40)
+        with tempfile.TemporaryDirectory() as d:
+            ruta = os.path.join(d, "odds.tab")
+            sol.guardar(ruta)
+            otra = Probabilidades(ModeloVotoUniforme(0.1), ModeloAdivinanza(0.3, 6))
+            otra.cargar(ruta)
+            self.assertEqual(otra.dimensiones, sol.dimensiones)
+            self.assertEqual(otra.probabilidades(4, 30), sol.probabilidades(4, 30))
+            with self.assertRaises(ValueError):
+                Probabilidades(ModeloVotoUniforme(0.2)).cargar(ruta)
+
+
+@unittest.skipUnless(_HAS_NUMPY, "NumPy no está disponible.")
+class TestModeloAleatorio(unittest.TestCase):
+    def test_coincide_con_la_enumeracion(self):
+        for abstencion in (0.0, 0.25):
+            modelo = ModeloVotoAleatorio(abstencion)
+            for n in range(1, 6):
+                pi, pc = modelo.probabilidades(1, n - 1)
+                self.assertAlmostEqual(pi + pc, _unico_por_enumeracion(n, abstencion), places=12)
+
+    def test_salas_grandes_acotadas(self):
+        # Con la cota de votos por jugador, 200 jugadores se calculan sin el coste O(n^4)
+        modelo = ModeloVotoAleatorio(0.1)
+        modelo.preparar(200)
+        self.assertEqual(len(modelo._unico), 201)
+        self.assertTrue(all(0.0 <= u <= 1.0 for u in modelo._unico))
+
+    def test_contra_monte_carlo(self):
+        exacta, simulada, (bajo, alto) = verificar(8, 2, partidas=20000, abstencion=0.2,
+                                                   prob_intento=0.3, palabras=5, seed=3)
+        self.assertLessEqual(bajo, exacta)
+        self.assertLessEqual(exacta, alto)
+
+
+if __name__ == "__main__":
+    unittest.main()
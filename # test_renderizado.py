@@ -0,0 +1,74 @@
+# test_renderizado.py
+# Pruebas del renderizado sin display (renderizado.py) y de la API Pillow de Graficos.
+#
+# Uso:
+#   python -m unittest test_renderizado
+
+import os
+import tempfile
+import unittest
+
+import graficos
+from graficos import Graficos
+from partida import Partida
+
+_HAS_PIL = graficos._pil()
+if _HAS_PIL:
+    from PIL import Image
+    from renderizado import RenderizadorSala
+
+
+@unittest.skipUnless(_HAS_PIL, "Pillow no está disponible.")
+class TestRenderizado(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fondo(self, nombre: str, color: str) -> str:
+        ruta = os.path.join(self._tmp.name, nombre)
+        Image.new("RGB", (400, 300), color).save(ruta)
+        return ruta
+
+    def test_cambio_de_fondo_invalida_la_cache(self):
+        g = Graficos(bg="white")
+        r = RenderizadorSala(320, 260, g=g)
+        p = Partida(num_players=4, seed=1)
+        esquina = (1, 250)
+        self.assertEqual(r.render(p).getpixel(esquina), (255, 255, 255))
+        g.set_background(self._fondo("azul.png", "blue"))
+        self.assertEqual(r.render(p).getpixel(esquina), (0, 0, 255))
+        g.set_background(self._fondo("rojo.png", "red"))
+        self.assertEqual(r.render(p).getpixel(esquina), (255, 0, 0))
+        g.clear_background()
+        self.assertEqual(r.render(p).getpixel(esquina), (255, 255, 255))
+
+    def test_api_pillow_de_graficos(self):
+        g = Graficos()
+        self.assertIsNone(g.fondo_pil(100, 50))
+        version = g.version_fondo
+        g.set_background(self._fondo("verde.png", "green"))
+        self.assertNotEqual(g.version_fondo, version)
+        fondo = g.fondo_pil(100, 50)
+        self.assertEqual((fondo.size, fondo.mode), ((100, 50), "RGB"))
+        color, boca = g.rasgos_avatar(7)
+        self.assertEqual(g.rasgos_avatar(7), (color, boca))
+        avatar = g.rasterizar_avatar(color, boca, 40)
+        self.assertEqual((avatar.size, avatar.mode), ((40, 40), "RGBA"))
+        self.assertEqual(avatar.tobytes(), g.render_avatar(40, seed=7).tobytes())
+
+    def test_cambia_solo_la_tarjeta_del_expulsado(self):
+        r = RenderizadorSala(640, 480)
+        p = Partida(num_players=6, seed=2)
+        antes = r.render(p)
+        p.eject(0)
+        despues = r.render(p)
+        self.assertNotEqual(antes.tobytes(), despues.tobytes())
+        # La tarjeta de otro jugador no cambia
+        caja = (r.card_w + 6, 40, 2 * r.card_w - 6, 40 + r.card_h - 12)
+        self.assertEqual(antes.crop(caja).tobytes(), despues.crop(caja).tobytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# test_salas.py
+# Pruebas del registro de salas con expulsión y volcado a disco (salas.py).
+#
+# Uso:
+#   python -m unittest test_salas
+
+import os
+import tempfile
+import unittest
+
+from partida import Partida, PartidaConcurrente
+from salas import RegistroSalas
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class TestRegistroSalas(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directorio = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_lru_vuelca_y_recarga(self):
+        r = RegistroSalas(max_salas=2, directorio=self.directorio)
+        partidas = {f"sala {i}": Partida(num_players=5, seed=i) for i in range(4)}
+        for room, p in partidas.items():
+            r[room] = p
+        self.assertEqual(r.estadisticas()["en_memoria"], 2)
+        self.assertEqual(r.estadisticas()["en_disco"], 2)
+        self.assertEqual(r["sala 0"].to_dict(), partidas["sala 0"].to_dict())
+        self.assertEqual(len(r), 4)
+
+    def test_conserva_la_clase(self):
+        r = RegistroSalas(max_salas=1, directorio=self.directorio)
+        r["a"] = PartidaConcurrente(num_players=6, seed=1)
+        r["b"] = Partida(num_players=6, seed=2)
+        self.assertIsInstance(r["a"], PartidaConcurrente)
+        self.assertIs(type(r["b"]), Partida)
+
+    def test_no_expulsa_salas_con_suscriptores(self):
+        reloj = _Reloj()
+        r = RegistroSalas(max_salas=1, ttl=10, directorio=self.directorio, reloj=reloj)
+        seguida = Partida(num_players=5, seed=1)
+        eventos = []
+        seguida.suscribir(lambda p, evento, datos: eventos.append(evento))
+        r["seguida"] = seguida
+        r["otra"] = Partida(num_players=5, seed=2)
+        r["otra2"] = Partida(num_players=5, seed=3)
+        self.assertIs(r.get("seguida"), seguida)
+        reloj.t = 100
+        r.barrer()
+        self.assertIs(r.get("seguida"), seguida)
+        seguida.eject(0)
+        self.assertEqual(eventos[0], "eject")
+
+    def test_al_recargar_reengancha(self):
+        recargadas = []
+        r = RegistroSalas(max_salas=1, directorio=self.directorio,
+                          al_recargar=lambda room, p: recargadas.append(room))
+        r["a"] = Partida(num_players=5, seed=1)
+        r["b"] = Partida(num_players=5, seed=2)
+        r.get("a")
+        self.assertEqual(recargadas, ["a"])
+
+    def test_pop_y_descartar_no_recargan(self):
+        recargadas, expulsadas = [], []
+        r = RegistroSalas(max_salas=1, directorio=self.directorio,
+                          al_recargar=lambda room, p: recargadas.append(room),
+                          al_expulsar=lambda room, p: expulsadas.append(room))
+        r["a"] = Partida(num_players=5, seed=1)
+        r["b"] = Partida(num_players=5, seed=2)
+        r["c"] = Partida(num_players=5, seed=3)
+        self.assertEqual(expulsadas, ["a", "b"])
+        self.assertEqual(r.pop("a").seed, 1)
+        self.assertTrue(r.descartar("b"))
+        self.assertFalse(r.descartar("b"))
+        self.assertIsNone(r.pop("b"))
+        self.assertEqual((recargadas, r.estadisticas()["recargas"]), ([], 0))
+        self.assertEqual(os.listdir(self.directorio), [])
+        self.assertEqual(list(r), ["c"])
+
+    def test_indexa_por_nombre_de_fichero(self):
+        r = RegistroSalas(directorio=self.directorio)
+        largo = "x" * 500
+        for room in ("sala", "Sala", "ñandú/1", largo):
+            r[room] = Partida(num_players=5, seed=len(room))
+        r.volcar_todo()
+        nombres = os.listdir(self.directorio)
+        self.assertEqual(len(nombres), 4)
+        otro = RegistroSalas(directorio=self.directorio)
+        self.assertEqual(sorted(otro), sorted(["sala", "Sala", "ñandú/1", largo]))
+        self.assertEqual(otro["ñandú/1"].seed, len("ñandú/1"))
+        self.assertEqual(otro[largo].seed, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# test_servidor.py
+# Pruebas del despacho de peticiones del servidor (servidor.py), sin red.
+#
+# Uso:
+#   python -m unittest test_servidor
+
+import time
+import unittest
+
+from salas import RegistroSalas
+from servidor import MAX_LONGITUD_PALABRA, ServidorPartidas
+
+
+class TestDespacho(unittest.TestCase):
+    def setUp(self):
+        self.servidor = ServidorPartidas()
+
+    def _pedir(self, **msg):
+        return self.servidor.despachar(msg)
+
+    def test_matching_invalido_se_rechaza(self):
+        largas = ["abcdefghijklmnopqrst" + str(i) for i in range(1000)]
+        for extra in ({"matching": {"max_distancia": 3e7, "solo_conocidas": True}},
+                      {"matching": {"max_distancia": 12, "solo_conocidas": True}, "words": largas},
+                      {"matching": {"desconocida": True}},
+                      {"matching": "max_distancia"},
+                      {"words": ["x" * (MAX_LONGITUD_PALABRA + 1)]}):
+            resp = self._pedir(op="create", num_players=5, **extra)
+            self.assertFalse(resp["ok"], extra)
+        self.assertEqual(len(self.servidor.salas), 0)
+
+    def test_indice_demasiado_grande_se_rechaza(self):
+        palabras = [f"{i:012d}" for i in range(10000)]
+        resp = self._pedir(op="create", num_players=5, words=palabras,
+                           matching={"max_distancia": 2, "solo_conocidas": True})
+        self.assertFalse(resp["ok"])
+        resp = self._pedir(op="create", num_players=5, words=palabras, matching={"max_distancia": 2})
+        self.assertTrue(resp["ok"])
+
+    def test_adivinanza_larga_no_bloquea(self):
+        resp = self._pedir(op="create", room="a", num_players=5, seed=1,
+                           matching={"max_distancia": 2, "solo_conocidas": True})
+        self.assertTrue(resp["ok"])
+        t0 = time.perf_counter()
+        resp = self._pedir(op="guess", room="a", player=0, word="x" * 60000)
+        self.assertFalse(resp["ok"])
+        resp = self._pedir(op="guess", room="a", player=0, word="x" * MAX_LONGITUD_PALABRA)
+        self.assertTrue(resp["ok"])
+        self.assertLess(time.perf_counter() - t0, 1.0)
+
+    def test_expulsar_la_sala_cierra_su_votacion(self):
+        self.servidor = ServidorPartidas(registro=RegistroSalas(max_salas=1))
+        self.assertTrue(self._pedir(op="create", room="a", num_players=5, seed=1)["ok"])
+        self.assertTrue(self._pedir(op="vote_open", room="a")["ok"])
+        self.assertIn("a", self.servidor.votaciones)
+        self.assertTrue(self._pedir(op="create", room="b", num_players=5, seed=2)["ok"])
+        self.assertNotIn("a", self.servidor.votaciones)
+        self.assertFalse(self._pedir(op="vote_cast", room="a", votes={"0": 1})["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()